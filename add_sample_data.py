@@ -36,15 +36,21 @@ teams_data = [
     {"name": "Yellow Lions", "tournament_id": tournament_id, "group": "B"}
 ]
 
+# One request for the whole list; results come back per item, in order
+response = requests.post(f"{BASE_URL}/teams/bulk", json=teams_data)
 teams = []
-for team_data in teams_data:
-    response = requests.post(f"{BASE_URL}/teams/", json=team_data)
-    if response.status_code in [200, 201]:
-        team = response.json()
-        teams.append(team)
-        print(f"✅ Team created: {team['name']} (ID: {team['id']})")
-    else:
-        print(f"❌ Failed to create team {team_data['name']}: {response.status_code}")
+if response.status_code == 200:
+    for team_data, result in zip(teams_data, response.json()["results"]):
+        if result["status"] == "error":
+            print(f"❌ Failed to create team {team_data['name']}: {result['error']}")
+        else:
+            team = result["data"]
+            teams.append(team)
+            print(f"✅ Team created: {team['name']} (ID: {team['id']})")
+else:
+    print(f"❌ Failed to create teams: {response.status_code}")
+    print(response.text)
+    exit(1)
 
 # 3. Create players for first team
 print("\n3. Creating players for Red Dragons...")
@@ -55,13 +61,16 @@ players_data = [
     {"name": "Chris Striker", "team_id": teams[0]['id'], "position": "FWD", "shirt_number": 9}
 ]
 
-for player_data in players_data:
-    response = requests.post(f"{BASE_URL}/players/", json=player_data)
-    if response.status_code in [200, 201]:
-        player = response.json()
-        print(f"✅ Player created: {player['name']} #{player['shirt_number']}")
-    else:
-        print(f"❌ Failed to create player {player_data['name']}: {response.status_code}")
+response = requests.post(f"{BASE_URL}/players/bulk", json=players_data)
+if response.status_code == 200:
+    for player_data, result in zip(players_data, response.json()["results"]):
+        if result["status"] == "error":
+            print(f"❌ Failed to create player {player_data['name']}: {result['error']}")
+        else:
+            player = result["data"]
+            print(f"✅ Player created: {player['name']} #{player['shirt_number']}")
+else:
+    print(f"❌ Failed to create players: {response.status_code}")
 
 # 4. Create a match
 print("\n4. Creating a match...")
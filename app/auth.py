@@ -0,0 +1,151 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+
+
+class InvalidToken(Exception):
+    """The token is malformed, forged, expired or can't be checked."""
+
+
+class Forbidden(Exception):
+    """The token is valid but its role may not write."""
+
+
+Claims = Dict[str, Any]
+
+
+class TokenVerifier:
+    """Verifies Supabase access tokens without calling the auth server.
+
+    HS256 tokens are checked against the project's JWT secret and asymmetric
+    ones (RS256/ES256) against its JWKS, which PyJWT fetches once and caches.
+    Tokens that passed are kept in an LRU until they expire (or for ``ttl``
+    seconds at most), so repeated writes with the same token cost a dict lookup.
+    When ``remote_fallback`` is set, tokens that can't be verified locally (no
+    secret configured, unknown key) are checked with ``auth.get_user`` instead;
+    left as None, it is set exactly when there is no secret.
+    """
+
+    def __init__(
+        self,
+        secret: str = settings.SUPABASE_JWT_SECRET,
+        jwks_url: str = settings.AUTH_JWKS_URL,
+        roles: Tuple[str, ...] = tuple(settings.AUTH_ADMIN_ROLES),
+        audience: str = settings.AUTH_AUDIENCE,
+        max_entries: int = settings.AUTH_CACHE_MAX_ENTRIES,
+        ttl: float = settings.AUTH_CACHE_TTL,
+        remote_fallback: Optional[bool] = settings.AUTH_REMOTE_FALLBACK,
+    ):
+        self.secret = secret
+        self.roles = roles
+        self.audience = audience
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.remote_fallback = not secret if remote_fallback is None else remote_fallback
+        self._jwks = jwt.PyJWKClient(jwks_url) if jwks_url else None
+        self._entries: "OrderedDict[str, Tuple[float, Claims]]" = OrderedDict()
+        # Metrics: cache hit rate and time spent verifying on misses
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.remote_calls = 0
+        self.verify_seconds = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "failures": self.failures,
+            "remote_calls": self.remote_calls,
+            "verify_seconds_total": self.verify_seconds,
+            "verify_seconds_avg": self.verify_seconds / self.misses if self.misses else 0.0,
+            "cached": len(self._entries),
+        }
+
+    async def verify(self, token: str, remote=None) -> Claims:
+        """Claims of a valid admin token; ``remote`` is an async
+        ``token -> claims`` callable used by the fallback."""
+        key = hashlib.sha256(token.encode()).hexdigest()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.time():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        started = time.perf_counter()
+        try:
+            claims = await self._verify(token, remote)
+        except (InvalidToken, Forbidden):
+            self.failures += 1
+            raise
+        finally:
+            self.verify_seconds += time.perf_counter() - started
+
+        expires_at = time.time() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        self._entries[key] = (expires_at, claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return claims
+
+    async def _verify(self, token: str, remote) -> Claims:
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise InvalidToken(str(e)) from e
+
+        key = None
+        algorithm = header.get("alg")
+        if algorithm == "HS256" and self.secret:
+            key = self.secret
+        elif algorithm in ("RS256", "ES256") and self._jwks is not None:
+            try:
+                # Only hits the network when the key set isn't cached yet or the kid is new
+                key = (await run_in_threadpool(self._jwks.get_signing_key_from_jwt, token)).key
+            except jwt.PyJWKClientError:
+                key = None
+
+        if key is None:
+            if self.remote_fallback and remote is not None:
+                self.remote_calls += 1
+                claims = await remote(token)
+            else:
+                raise InvalidToken(f"No key to verify {algorithm} tokens locally")
+        else:
+            try:
+                claims = jwt.decode(
+                    token,
+                    key,
+                    algorithms=[algorithm],
+                    audience=self.audience or None,
+                    options={"require": ["exp"], "verify_aud": bool(self.audience)},
+                )
+            except jwt.PyJWTError as e:
+                raise InvalidToken(str(e)) from e
+
+        if claims.get("role") not in self.roles:
+            raise Forbidden(f"Role {claims.get('role')!r} may not modify data")
+        return claims
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def _jwks_url() -> str:
+    if settings.AUTH_JWKS_URL:
+        return settings.AUTH_JWKS_URL
+    return f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json" if settings.SUPABASE_URL else ""
+
+
+token_verifier = TokenVerifier(jwks_url=_jwks_url())
@@ -0,0 +1,79 @@
+from typing import Any, Dict, Iterable, List
+
+from fastapi import HTTPException
+
+from app.repositories import BackendError, Repository
+
+
+async def fetch_by_id(repository: Repository, ids: Iterable[Any], *columns: str) -> Dict[str, Dict[str, Any]]:
+    """Every referenced row in one ``id in (...)`` query, keyed by id."""
+    ids = {str(i) for i in ids if i is not None}
+    if not ids:
+        return {}
+    rows = await repository.list({"id": sorted(ids)}, order=[], columns=["id", *columns])
+    return {row["id"]: row for row in rows}
+
+
+async def bulk_create(
+    repository: Repository, items: List[Dict[str, Any]], errors: Dict[int, str], upsert: bool = False
+) -> Dict[str, Any]:
+    """Writes the items not rejected in ``errors`` (index -> reason) in a single
+    upstream write and returns a per-item result for every item, in request order.
+
+    With ``upsert``, the rows already holding an item's natural key are looked
+    up first; the item then updates that row by id and is reported as updated.
+    """
+    if upsert and not repository.natural_key:
+        raise HTTPException(status_code=400, detail=f"{repository.table} cannot be upserted")
+    errors = dict(errors)
+
+    if upsert:
+        # Postgres refuses to update the same row twice in one statement
+        seen: Dict[tuple, int] = {}
+        for index, item in enumerate(items):
+            key = tuple(str(item.get(c)) for c in repository.natural_key)
+            if index in errors or any(item.get(c) is None for c in repository.natural_key):
+                continue
+            if key in seen:
+                errors[index] = f"Duplicate of item {seen[key]}"
+            else:
+                seen[key] = index
+
+    existing: Dict[int, str] = {}
+    if upsert:
+        pending = [i for i in range(len(items)) if i not in errors]
+        for index, ids in zip(pending, await repository.find_natural([items[i] for i in pending])):
+            if len(ids) > 1:
+                errors[index] = f"Matches {len(ids)} existing rows"
+            elif ids:
+                existing[index] = ids[0]
+
+    accepted = [i for i in range(len(items)) if i not in errors]
+    written: Dict[int, Dict[str, Any]] = {}
+    try:
+        rows = await repository.create_many(
+            [{**items[i], "id": existing[i]} if i in existing else items[i] for i in accepted], upsert=upsert
+        )
+    except BackendError as e:
+        # The batch is one statement, so none of it was written
+        errors.update({i: f"Batch rejected by the database: {e}" for i in accepted})
+    else:
+        written = dict(zip(accepted, rows))
+
+    results = []
+    for index in range(len(items)):
+        if index in written:
+            status = "updated" if index in existing else "created"
+            results.append({"index": index, "status": status, "data": written[index]})
+        else:
+            results.append({"index": index, "status": "error", "error": errors[index]})
+    return {
+        "created": sum(r["status"] == "created" for r in results),
+        "updated": sum(r["status"] == "updated" for r in results),
+        "failed": len(errors),
+        "results": results,
+    }
+
+
+def written_rows(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [r["data"] for r in result["results"] if r["status"] != "error"]
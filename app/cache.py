@@ -0,0 +1,326 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple, Union
+
+from fastapi import Request
+
+from app.coalesce import SingleFlight
+from app.config import settings
+from app.repositories.base import RELATIONS
+
+logger = logging.getLogger(__name__)
+
+# Returned by cache backends on a miss, since None is a valid cached value
+MISSING = object()
+
+Tags = Union[Iterable[str], Callable[[Any], Iterable[str]]]
+
+
+def cache_key(request: Request) -> str:
+    """Route plus query parameters, with parameter order normalised."""
+    params = sorted(request.query_params.multi_items())
+    return request.url.path + ("?" + "&".join(f"{k}={v}" for k, v in params) if params else "")
+
+
+class MemoryCache:
+    """Per-worker LRU with a TTL and a bounded number of entries.
+
+    Every entry carries tags; invalidating a tag drops every entry carrying it.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value, _ = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, tags: Iterable[str], ttl: Optional[float] = None) -> None:
+        if key in self._entries:
+            self._remove(key)
+        tags = tuple(tags)
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl), value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    async def invalidate(self, tags: Iterable[str]) -> int:
+        keys = set()
+        for tag in tags:
+            keys |= self._tags.pop(tag, set())
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisCache:
+    """Shared cache for multi-worker deployments (requires the ``redis`` package).
+
+    Values are stored as JSON with a TTL; each tag is a Redis set of the keys
+    carrying it, so invalidations from one worker are seen by all of them.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "kickoff:cache:"):
+        try:
+            from redis import asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from exc
+        self.client = redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Any:
+        raw = await self.client.get(self.prefix + key)
+        return MISSING if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: Any, tags: Iterable[str], ttl: Optional[float] = None) -> None:
+        ttl = int(ttl or self.ttl)
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, json.dumps(value), ex=ttl)
+        for tag in tags:
+            pipe.sadd(self.prefix + "tag:" + tag, self.prefix + key)
+            pipe.expire(self.prefix + "tag:" + tag, ttl)
+        await pipe.execute()
+
+    async def invalidate(self, tags: Iterable[str]) -> int:
+        tag_keys = [self.prefix + "tag:" + tag for tag in tags]
+        keys = set()
+        for tag_key in tag_keys:
+            keys |= await self.client.smembers(tag_key)
+        if keys or tag_keys:
+            await self.client.delete(*keys, *tag_keys)
+        return len(keys)
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+
+class ResponseCache:
+    """Read-through cache for GET routes, invalidated by tags from the write handlers.
+
+    Concurrent misses for the same key share one load (single flight). Entries
+    past their TTL are still served for ``stale_ttl`` seconds while one
+    background load refreshes them; invalidated entries are never served.
+    """
+
+    def __init__(
+        self,
+        backend,
+        enabled: bool = True,
+        bodies: Optional[MemoryCache] = None,
+        stale_ttl: float = 0.0,
+        coalesce: bool = True,
+    ):
+        self.backend = backend
+        self.enabled = enabled
+        self.stale_ttl = stale_ttl
+        self.coalesce = coalesce
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.flights = SingleFlight()
+        self._refreshes: Set["asyncio.Future[Any]"] = set()
+        # Compressed bodies of the cached responses (app/compression.py); they are
+        # bytes and cheap to rebuild, so they stay in the worker even with Redis
+        self.bodies = bodies or MemoryCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL)
+        self.body_hits = 0
+        self.body_misses = 0
+        # Bumped by every invalidation; a load that overlapped one is not stored,
+        # otherwise a slow read could put back data that a write just replaced.
+        # Requests arriving after a write don't join loads started before it either.
+        self._epoch = 0
+
+    async def get_or_load(self, key: str, tags: Tags, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Returns the cached value for ``key`` or loads and caches it.
+
+        ``tags`` is either a list of tags or a function computing them from the
+        loaded value, for entries whose parents are only known after loading.
+        """
+        if not self.enabled:
+            return await self._coalesced(key, loader)
+
+        entry = await self.backend.get(key)
+        if entry is not MISSING:
+            # Stored with the wall-clock time it stays fresh until, shared by Redis workers
+            value, fresh_until = entry
+            if fresh_until >= time.time():
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._refresh(key, tags, loader)
+            return value
+
+        self.misses += 1
+        return await self._coalesced(key, lambda: self._load(key, tags, loader))
+
+    async def _coalesced(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.coalesce:
+            return await load()
+        return await self.flights.do((key, self._epoch), load)
+
+    async def _load(self, key: str, tags: Tags, loader: Callable[[], Awaitable[Any]]) -> Any:
+        epoch = self._epoch
+        value = await loader()
+        # Not-found results are not cached
+        if value is not None and epoch == self._epoch:
+            ttl = self.backend.ttl
+            entry = [value, time.time() + ttl]
+            await self.backend.set(key, entry, tags(value) if callable(tags) else tags, ttl=ttl + self.stale_ttl)
+        return value
+
+    def _refresh(self, key: str, tags: Tags, loader: Callable[[], Awaitable[Any]]) -> None:
+        """Reloads a stale entry in the background, once however many requests see it."""
+        if (key, self._epoch) in self.flights:
+            return
+
+        async def refresh():
+            try:
+                await self._coalesced(key, lambda: self._load(key, tags, loader))
+            except Exception:
+                # The stale entry runs out on its own and the next miss loads again
+                logger.exception("Refreshing cache entry %s failed", key)
+
+        task = asyncio.ensure_future(refresh())
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def encoded(self, key: str, encode: Callable[[], bytes]) -> bytes:
+        """The body cached under ``key``, encoding and storing it on a miss.
+        Keys include the response's ETag, so they need no invalidation."""
+        if not self.enabled:
+            return encode()
+        body = await self.bodies.get(key)
+        if body is not MISSING:
+            self.body_hits += 1
+            return body
+        self.body_misses += 1
+        body = encode()
+        await self.bodies.set(key, body, ())
+        return body
+
+    async def invalidate(self, *tags: str) -> int:
+        self._epoch += 1
+        return await self.backend.invalidate(tags)
+
+    async def clear(self) -> None:
+        self._epoch += 1
+        await self.backend.clear()
+        await self.bodies.clear()
+
+
+# Invalidation tags written by each entity. List entries are tagged with their
+# filter ("teams:list:<tournament_id>", or ":*" when unfiltered) and detail
+# entries with their id and parent ("players:of:<team_id>") so that cascading
+# deletes can evict children without touching anything else.
+
+def tournament_tags(tournament_id) -> Tuple[str, ...]:
+    return (f"tournament:{tournament_id}", "tournaments:list")
+
+
+def team_tags(team: Dict[str, Any]) -> Tuple[str, ...]:
+    return (f"team:{team['id']}", f"teams:list:{team['tournament_id']}", "teams:list:*")
+
+
+def player_tags(player: Dict[str, Any]) -> Tuple[str, ...]:
+    return (f"player:{player['id']}", f"players:list:{player['team_id']}", "players:list:*")
+
+
+def match_tags(match: Dict[str, Any]) -> Tuple[str, ...]:
+    return (f"match:{match['id']}", f"matches:list:{match['tournament_id']}", "matches:list:*")
+
+
+def event_tags(event: Dict[str, Any]) -> Tuple[str, ...]:
+    return (f"events:list:{event['match_id']}",)
+
+
+def team_subtree_tags(team_id) -> Tuple[str, ...]:
+    """Entries that disappear with a team through ``on delete cascade``."""
+    return (f"players:of:{team_id}", f"players:list:{team_id}", "players:list:*")
+
+
+# Tag an embedded row the way its own routes' entries are tagged, so that a
+# write to the embedded entity also evicts the entries embedding it
+_EMBED_TAGS = {
+    "tournaments": lambda row: (f"tournament:{row['id']}",),
+    "teams": lambda row: (f"team:{row['id']}",),
+    "players": lambda row: (f"player:{row['id']}",),
+    "matches": lambda row: (f"match:{row['id']}",),
+    "match_events": lambda row: (),
+}
+_EMBED_LIST_TAGS = {
+    "teams": "teams:list:{}",
+    "players": "players:list:{}",
+    "matches": "matches:list:{}",
+    "match_events": "events:list:{}",
+}
+
+
+def embedded_tags(table: str, data: Any, embed: Optional[Dict[str, Any]]) -> Set[str]:
+    """Tags for the relations nested into ``data`` by ``include=``."""
+    tags: Set[str] = set()
+    rows = data if isinstance(data, list) else [data]
+    for name, children in (embed or {}).items():
+        relation = RELATIONS[table][name]
+        nested = []
+        for row in rows:
+            value = row.get(name)
+            if relation.many:
+                # A child added later is only caught by the parent-filtered list tag
+                tags.add(_EMBED_LIST_TAGS[relation.table].format(row["id"]))
+                nested.extend(value or [])
+            elif value:
+                nested.append(value)
+        for target in nested:
+            tags.update(_EMBED_TAGS[relation.table](target))
+        if children and nested:
+            tags |= embedded_tags(relation.table, nested, children)
+    return tags
+
+
+def build_cache() -> ResponseCache:
+    if settings.CACHE_BACKEND == "redis":
+        backend = RedisCache(settings.CACHE_REDIS_URL, settings.CACHE_TTL)
+    else:
+        backend = MemoryCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL)
+    return ResponseCache(
+        backend,
+        enabled=settings.CACHE_ENABLED,
+        stale_ttl=settings.CACHE_STALE_WHILE_REVALIDATE,
+        coalesce=settings.CACHE_COALESCE,
+    )
+
+
+response_cache = build_cache()
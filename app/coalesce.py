@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key
+    wait for that call and all receive its result (or its exception).
+
+    The call runs in its own task, so a caller that goes away (client
+    disconnect) doesn't cancel the work the others are waiting for.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        # Metrics: calls that ran, and callers served by another caller's call
+        self.leaders = 0
+        self.followers = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def stats(self) -> Dict[str, Any]:
+        return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._calls)}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = self._calls[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Marks the exception as retrieved when every caller has gone away
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,130 @@
+import gzip
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.cache import cache_key, response_cache
+from app.config import settings
+
+# brotli and zstandard are optional: without them only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _codecs() -> Dict[str, Callable[[bytes], bytes]]:
+    codecs: Dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL)
+        codecs["zstd"] = compressor.compress
+    if brotli is not None:
+        codecs["br"] = lambda body: brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    codecs["gzip"] = lambda body: gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+    return codecs
+
+
+def negotiate(accept_encoding: str, available: List[str]) -> Optional[str]:
+    """The encoding to use for an Accept-Encoding header: highest q-value first,
+    then the order of ``available`` (our preference). None means identity."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """Compresses JSON and text responses of at least ``min_size`` bytes with
+    zstd, brotli or gzip, as the client accepts.
+
+    Only complete bodies are compressed; streamed responses (the live SSE
+    stream) pass through untouched. Bodies of cacheable GET responses (those
+    with an ETag) are kept in the response cache per encoding, so a hot
+    response is compressed once rather than on every hit. Compressed responses
+    get a weak ETag, which If-None-Match still matches.
+    """
+
+    def __init__(self, app: ASGIApp, min_size: int = settings.COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+        self.codecs = _codecs()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding", ""), list(self.codecs))
+        start: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            response_start, start = start, None
+            headers = MutableHeaders(raw=response_start["headers"])
+            body = message.get("body", b"")
+            if message.get("more_body") or not self._compressible(headers, len(body)):
+                if response_start["status"] == 304 and f"W/{headers.get('etag')}" in request_headers.get("if-none-match", ""):
+                    # Revalidating a compressed copy: answer with the ETag it was served with
+                    self._weaken_etag(headers)
+                await send(response_start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None:
+                body = await self._encode(scope, headers, body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                self._weaken_etag(headers)
+            await send(response_start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compressible(self, headers: MutableHeaders, size: int) -> bool:
+        content_type = headers.get("content-type", "")
+        return (
+            size >= self.min_size
+            and "content-encoding" not in headers
+            and (content_type.startswith("application/json") or content_type.startswith("text/"))
+            and not content_type.startswith("text/event-stream")
+        )
+
+    async def _encode(self, scope: Scope, headers: MutableHeaders, body: bytes, encoding: str) -> bytes:
+        etag = headers.get("etag")
+        if scope["method"] != "GET" or etag is None:
+            return self.codecs[encoding](body)
+        # The ETag pins the content, so the key never serves an outdated body
+        key = f"{cache_key(Request(scope))}|{etag}|{encoding}"
+        return await response_cache.encoded(key, lambda: self.codecs[encoding](body))
+
+    @staticmethod
+    def _weaken_etag(headers: MutableHeaders) -> None:
+        etag = headers.get("etag")
+        if etag is not None and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
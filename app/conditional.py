@@ -0,0 +1,110 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from fastapi import Request, Response
+
+Rows = Union[Dict[str, Any], List[Dict[str, Any]]]
+
+
+def _rows(data: Rows) -> List[Dict[str, Any]]:
+    return data if isinstance(data, list) else [data]
+
+
+def _fingerprint(row: Dict[str, Any]) -> str:
+    # Rows with an id and updated_at are identified by those alone (plus any
+    # relations embedded into them); derived rows such as standings have
+    # neither, so their content is hashed instead
+    if "id" in row and row.get("updated_at"):
+        parts = [f"{row['id']}@{row['updated_at']}"]
+        for key, value in row.items():
+            if isinstance(value, dict):
+                parts.append(f"{key}={_fingerprint(value)}")
+            elif isinstance(value, list):
+                parts.append(f"{key}=[{';'.join(_fingerprint(v) for v in value if isinstance(v, dict))}]")
+        return "|".join(parts)
+    return json.dumps(row, sort_keys=True, default=str)
+
+
+def compute_etag(request: Request, data: Rows) -> str:
+    """Strong ETag from the rows' ids and updated_at, plus the query string
+    (which selects the representation, e.g. filters or projections)."""
+    digest = hashlib.sha1(request.url.query.encode())
+    for row in _rows(data):
+        digest.update(b"\0")
+        digest.update(_fingerprint(row).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def last_modified(data: Rows) -> Optional[datetime]:
+    stamps = [_parse_timestamp(row.get("updated_at") or row.get("created_at")) for row in _rows(data)]
+    stamps = [s for s in stamps if s is not None]
+    # HTTP dates have second precision
+    return max(stamps).replace(microsecond=0) if stamps else None
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates: Iterable[str] = (c.strip() for c in header.split(","))
+    # If-None-Match uses the weak comparison
+    return any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def _not_modified_since(header: str, modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return modified <= since
+
+
+def revalidate(request: Request, response: Response, data: Rows, max_age: int) -> Union[Rows, Response]:
+    """Sets ETag, Last-Modified and Cache-Control on ``response`` and returns ``data``,
+    or returns a bare 304 when the client's copy is still current."""
+    etag = compute_etag(request, data)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    modified = last_modified(data)
+    if modified is not None:
+        headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    elif modified is not None and not isinstance(data, list):
+        # Only trusted for single resources: a deletion from a list doesn't move its newest updated_at
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and _not_modified_since(if_modified_since, modified):
+            return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return data
+
+
+def versioned(request: Request, etag: str, max_age: int) -> Tuple[Dict[str, str], Optional[Response]]:
+    """Caching headers for a resource whose ETag is known without reading its
+    content (e.g. a version number), and the 304 to send if the client's copy
+    is current, else None."""
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return headers, Response(status_code=304, headers=headers)
+    return headers, None
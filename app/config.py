@@ -1,9 +1,116 @@
 import os
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
-    SUPABASE_URL: str
-    SUPABASE_KEY: str
+    SUPABASE_URL: str = ""
+    SUPABASE_KEY: str = ""
+
+    # Admin tokens are verified locally: HS256 ones with the project's JWT secret,
+    # asymmetric ones with its JWKS (derived from SUPABASE_URL unless set)
+    SUPABASE_JWT_SECRET: str = ""
+    AUTH_JWKS_URL: str = ""
+    AUTH_ADMIN_ROLES: List[str] = ["authenticated", "service_role"]
+    AUTH_AUDIENCE: str = ""
+    # Verified tokens are cached until they expire, for at most AUTH_CACHE_TTL seconds
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_CACHE_TTL: float = 300.0
+    # Ask the auth server (auth.get_user) about tokens that can't be verified locally.
+    # Unset, it is on when SUPABASE_JWT_SECRET is empty, as HS256 tokens would all fail
+    AUTH_REMOTE_FALLBACK: Optional[bool] = None
+
+    # "supabase" or "local" (in-process SQLite with schema.sql semantics)
+    DATA_BACKEND: str = "supabase"
+    LOCAL_DATABASE_PATH: str = ":memory:"
+
+    # Upstream HTTP connection pool shared by every request in a worker
+    SUPABASE_TIMEOUT: float = 10.0
+    SUPABASE_CONNECT_TIMEOUT: float = 5.0
+    SUPABASE_POOL_MAX_CONNECTIONS: int = 200
+    SUPABASE_POOL_MAX_KEEPALIVE: int = 50
+    SUPABASE_POOL_KEEPALIVE_EXPIRY: float = 30.0
+    SUPABASE_HTTP2: bool = True
+
+    # Materialized standings are rebuilt from the database after this many seconds
+    # (0 disables the age limit and relies on write deltas alone)
+    STANDINGS_MAX_AGE: float = 300.0
+    # Tournaments accepted by one GET /standings/ batch request
+    STANDINGS_BATCH_MAX: int = 50
+    # Same for the per-player leaderboards, kept current by event writes
+    LEADERBOARDS_MAX_AGE: float = 300.0
+    LEADERBOARDS_DEFAULT_LIMIT: int = 10
+    # Match center documents (GET /matches/{id}/center), patched by match and
+    # event writes; at most MATCH_CENTER_MAX_ENTRIES are kept per worker
+    MATCH_CENTER_MAX_AGE: float = 300.0
+    MATCH_CENTER_MAX_ENTRIES: int = 5000
+    # Aggregate standings in the database via the tournament_standings function
+    # (migrations/002_tournament_standings.sql). Until it is applied, tables are
+    # computed in Python after one failed call per worker
+    STANDINGS_RPC: bool = True
+    # Record events and update the match score in one transactional call
+    # (migrations/005_event_ingestion.sql); without it, the several-request
+    # fallback in app/repositories/ingest.py is used
+    EVENTS_RPC: bool = True
+
+    # Write-behind event ingestion: POST /events/ acknowledges with 202 once the
+    # event is spooled, and events are recorded in batches of EVENTS_FLUSH_ROWS
+    # at least every EVENTS_FLUSH_INTERVAL_MS (needs migrations/006). An empty
+    # EVENTS_SPOOL_PATH keeps the queue in memory only.
+    EVENTS_WRITE_BEHIND: bool = False
+    EVENTS_QUEUE_MAX: int = 10000
+    EVENTS_FLUSH_ROWS: int = 200
+    EVENTS_FLUSH_INTERVAL_MS: int = 50
+    EVENTS_SPOOL_PATH: str = "event-spool.jsonl"
+    EVENTS_SPOOL_FSYNC: bool = True
+
+    # Read-through cache for GET routes ("memory" per worker, or "redis" shared)
+    CACHE_ENABLED: bool = True
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL: float = 30.0
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    # Concurrent identical GETs share one upstream load, and entries past their
+    # TTL are served for this many more seconds while one request refreshes them
+    CACHE_COALESCE: bool = True
+    CACHE_STALE_WHILE_REVALIDATE: float = 2.0
+
+    # Cache-Control max-age (seconds) for rarely changing resources (tournaments,
+    # teams, players) and for live ones (matches, events, standings)
+    HTTP_MAX_AGE_STATIC: int = 60
+    HTTP_MAX_AGE_LIVE: int = 5
+    # Serve GET rows as the backend returned them, projected onto the response
+    # model and encoded with orjson, instead of validating every row again
+    RESPONSE_TRUST_UPSTREAM: bool = False
+
+    # Compress JSON responses of at least COMPRESSION_MIN_SIZE bytes. zstd and
+    # brotli are offered when the 'zstandard' / 'brotli' packages are installed,
+    # gzip always
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # Prometheus metrics at /metrics, and a Server-Timing header on every response
+    METRICS_ENABLED: bool = True
+    METRICS_SERVER_TIMING: bool = True
+
+    # Keyset pagination of list routes
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 500
+
+    # Largest array accepted by the POST /{resource}/bulk routes
+    BULK_MAX_ITEMS: int = 1000
+
+    # Live match streams: messages kept per match for Last-Event-ID resumes,
+    # messages buffered per client before it has to catch up from that history,
+    # and seconds between keep-alives on idle streams. LIVE_HISTORY_TTL is how
+    # long the history of a match nobody watches is kept (not at all once the
+    # match is finished)
+    LIVE_HISTORY: int = 500
+    LIVE_HISTORY_TTL: float = 300.0
+    LIVE_QUEUE_SIZE: int = 100
+    LIVE_HEARTBEAT: float = 15.0
 
     class Config:
         env_file = ".env"
@@ -1,4 +1,101 @@
-from supabase import create_client, Client
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, Client, acreate_client, create_client
 from app.config import settings
+from app.repositories import Backend
+from app.repositories.local import LocalBackend
+from app.repositories.supabase import SupabaseBackend
+from app.metrics import InstrumentedBackend
+
+# One async client per worker, sharing a single keep-alive connection pool.
+_http_client: Optional[httpx.AsyncClient] = None
+_client: Optional[AsyncClient] = None
+_backend: Optional[Backend] = None
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.SUPABASE_TIMEOUT, connect=settings.SUPABASE_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SUPABASE_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_EXPIRY,
+        ),
+        http2=settings.SUPABASE_HTTP2,
+        follow_redirects=True,
+    )
+
+
+async def connect() -> AsyncClient:
+    global _http_client, _client
+    if _client is None:
+        _http_client = _build_http_client()
+        options = AsyncClientOptions(
+            httpx_client=_http_client,
+            # The API is stateless: never keep or refresh a user session server-side
+            auto_refresh_token=False,
+            persist_session=False,
+        )
+        _client = await acreate_client(settings.SUPABASE_URL, settings.SUPABASE_KEY, options)
+    return _client
+
+
+async def disconnect() -> None:
+    global _http_client, _client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _client = None
+
+
+async def get_db() -> AsyncClient:
+    # Connect lazily so the app still works when the lifespan is not run (e.g. bare TestClient)
+    if _client is None:
+        return await connect()
+    return _client
+
+
+def is_connected() -> bool:
+    return _backend is not None or _client is not None
+
+
+async def open_backend() -> Backend:
+    global _backend
+    if _backend is None:
+        if settings.DATA_BACKEND == "local":
+            _backend = LocalBackend(settings.LOCAL_DATABASE_PATH)
+        else:
+            _backend = SupabaseBackend(await connect())
+        if settings.METRICS_ENABLED:
+            _backend = InstrumentedBackend(_backend)
+    return _backend
+
+
+async def close_backend() -> None:
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+    _backend = None
+    await disconnect()
+
+
+async def get_backend() -> Backend:
+    if _backend is None:
+        return await open_backend()
+    return _backend
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await open_backend()
+    try:
+        yield
+    finally:
+        await close_backend()
+
 
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+def create_sync_client() -> Client:
+    """Blocking client for standalone scripts such as populate_db.py."""
+    return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
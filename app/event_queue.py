@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.repositories import BackendError, MatchEventRepository
+
+logger = logging.getLogger(__name__)
+
+Written = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class QueueFull(Exception):
+    pass
+
+
+class EventQueue:
+    """Write-behind buffer for event creates (EVENTS_WRITE_BEHIND).
+
+    ``put`` appends the event to a local spool file and acknowledges it; a
+    background task then records the queued events in batches of up to
+    ``flush_rows``, at least every ``flush_interval`` seconds, each batch with
+    one record_match_events call. Events are flushed in arrival order, so every
+    match sees its events in order.
+
+    Every queued event carries an idempotency key, so replaying the spool after
+    a crash between a flush and the spool rewrite doesn't record anything twice.
+    A batch the database rejects is retried one event at a time. Events it
+    still rejects, and events of matches that no longer exist (which
+    record_match_events skips), are moved to ``<spool>.rejected``; any other
+    failure keeps the batch queued and retries it with backoff.
+
+    Spool writes and fsyncs run in a worker thread, under a lock that keeps
+    the spool in queue order.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.EVENTS_QUEUE_MAX,
+        flush_rows: int = settings.EVENTS_FLUSH_ROWS,
+        flush_interval: float = settings.EVENTS_FLUSH_INTERVAL_MS / 1000,
+        spool_path: str = settings.EVENTS_SPOOL_PATH,
+        fsync: bool = settings.EVENTS_SPOOL_FSYNC,
+    ):
+        self.max_size = max_size
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+        self.fsync = fsync
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._spool = None
+        self._wake: Optional[asyncio.Event] = None
+        self._spool_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._repository: Optional[MatchEventRepository] = None
+        self._on_written: Optional[Written] = None
+        # Metrics
+        self.accepted = 0
+        self.flushed = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.flush_seconds = 0.0
+        self.last_flush_seconds = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "accepted": self.accepted,
+            "flushed": self.flushed,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "flush_seconds_total": self.flush_seconds,
+            "flush_seconds_avg": self.flush_seconds / self.flushes if self.flushes else 0.0,
+            "last_flush_seconds": self.last_flush_seconds,
+        }
+
+    async def start(self, repository: MatchEventRepository, on_written: Written) -> None:
+        self._repository = repository
+        self._on_written = on_written
+        self._wake = asyncio.Event()
+        self._spool_lock = asyncio.Lock()
+        self._stopping = False
+        if self.spool_path:
+            # Whatever was acknowledged but not flushed before the last stop
+            if os.path.exists(self.spool_path):
+                with open(self.spool_path) as spool:
+                    self._pending.extend(json.loads(line) for line in spool if line.strip())
+            self._spool = open(self.spool_path, "a")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # Not cancelled: a flush cut short in its spool rewrite would race the final one
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        try:
+            await self.flush()
+        finally:
+            # Anything left stays in the spool for the next start
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+
+    async def put(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        if len(self._pending) >= self.max_size:
+            raise QueueFull()
+        event = {**event, "idempotency_key": event.get("idempotency_key") or uuid.uuid4().hex}
+        if self._spool is not None:
+            async with self._spool_lock:
+                await asyncio.to_thread(self._append, json.dumps(event, default=str) + "\n")
+                self._pending.append(event)
+        else:
+            self._pending.append(event)
+        self.accepted += 1
+        if len(self._pending) >= self.flush_rows and self._wake is not None:
+            self._wake.set()
+        return event
+
+    async def _run(self) -> None:
+        backoff = self.flush_interval
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+                backoff = self.flush_interval
+            except Exception:
+                self.flush_errors += 1
+                logger.exception("Flushing %d queued events failed, retrying", self.depth)
+                backoff = min(max(backoff, 0.1) * 2, 5.0)
+
+    async def flush(self) -> None:
+        """Records everything queued, oldest first."""
+        while self._pending and self._repository is not None:
+            batch = [self._pending[i] for i in range(min(self.flush_rows, len(self._pending)))]
+            started = time.perf_counter()
+            errors: Dict[str, str] = {}
+            try:
+                results = await self._repository.record_many(batch, rpc=settings.EVENTS_RPC)
+            except BackendError:
+                results, errors = await self._record_one_by_one(batch)
+            self.last_flush_seconds = time.perf_counter() - started
+            self.flush_seconds += self.last_flush_seconds
+            self.flushes += 1
+
+            # Results are matched by idempotency key; whatever has none wasn't recorded
+            recorded = {str(result["event"]["idempotency_key"]) for result in results}
+            rejected = []
+            for event in batch:
+                key = event["idempotency_key"]
+                if key not in recorded:
+                    error = errors.get(key, "Match not found")
+                    logger.error("Dropping queued event (%s): %s", error, event)
+                    rejected.append(json.dumps({"event": event, "error": error}, default=str) + "\n")
+            self.rejected += len(rejected)
+
+            for _ in batch:
+                self._pending.popleft()
+            if self._spool is not None:
+                async with self._spool_lock:
+                    lines = [json.dumps(event, default=str) + "\n" for event in self._pending]
+                    await asyncio.to_thread(self._rewrite_spool, lines, rejected)
+            self.flushed += len(batch) - len(rejected)
+            for result in results:
+                if result["created"]:
+                    await self._on_written("event.created", result)
+
+    async def _record_one_by_one(self, batch: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """Results of the events the database accepts, and the errors of the others by idempotency key."""
+        results, errors = [], {}
+        for event in batch:
+            try:
+                results.extend(await self._repository.record_many([event], rpc=settings.EVENTS_RPC))
+            except BackendError as e:
+                errors[event["idempotency_key"]] = str(e)
+        return results, errors
+
+    # Called in a worker thread, with the spool lock held
+
+    def _append(self, line: str) -> None:
+        self._spool.write(line)
+        self._spool.flush()
+        if self.fsync:
+            os.fsync(self._spool.fileno())
+
+    def _rewrite_spool(self, lines: List[str], rejected: List[str]) -> None:
+        if rejected:
+            with open(self.spool_path + ".rejected", "a") as dead_letters:
+                dead_letters.writelines(rejected)
+        self._spool.close()
+        temporary = self.spool_path + ".tmp"
+        with open(temporary, "w") as spool:
+            spool.writelines(lines)
+            spool.flush()
+            if self.fsync:
+                os.fsync(spool.fileno())
+        os.replace(temporary, self.spool_path)
+        self._spool = open(self.spool_path, "a")
+
+
+event_queue = EventQueue()
@@ -0,0 +1,93 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel, create_model
+
+from app.config import settings
+from app.serialization import json_response
+
+
+def fields_query(model: Type[BaseModel]) -> Callable[..., Optional[List[str]]]:
+    """Dependency parsing ``fields=a,b`` into a validated list of ``model``'s fields."""
+    allowed = list(model.model_fields)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(allowed)}"),
+    ) -> Optional[List[str]]:
+        if not fields:
+            return None
+        requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in requested if f not in model.model_fields]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+            )
+        return requested
+
+    return dependency
+
+
+def include_query(allowed: Iterable[str]) -> Callable[..., Optional[Dict[str, Any]]]:
+    """Dependency parsing ``include=home_team,events.player`` into an embed tree,
+    restricted to the ``allowed`` relation paths of the route."""
+    allowed = list(allowed)
+
+    def dependency(
+        include: Optional[str] = Query(None, description=f"Comma-separated relations to embed: {', '.join(allowed)}"),
+    ) -> Optional[Dict[str, Any]]:
+        if not include:
+            return None
+        paths = [p.strip() for p in include.split(",") if p.strip()]
+        unknown = [p for p in paths if p not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown relation(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+            )
+        tree: Dict[str, Any] = {}
+        for path in paths:
+            node = tree
+            for name in path.split("."):
+                node = node.setdefault(name, {})
+        return tree
+
+    return dependency
+
+
+def select_columns(fields: Optional[List[str]], *required: str) -> Optional[List[str]]:
+    """Columns to fetch for ``fields``, plus the ones the route itself needs
+    (cache tags, keys). None means every column."""
+    if fields is None:
+        return None
+    return list(dict.fromkeys([*fields, *required]))
+
+
+@lru_cache(maxsize=None)
+def trimmed_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    definitions = {
+        name: (model.model_fields[name].annotation, model.model_fields[name])
+        for name in fields
+    }
+    return create_model(f"{model.__name__}Fields", **definitions)
+
+
+def render(
+    response: Response,
+    data: Any,
+    model: Type[BaseModel],
+    fields: Optional[List[str]],
+    include: Optional[Dict[str, Any]] = None,
+    exclude_unset: bool = False,
+) -> Any:
+    """Serializes ``data`` against ``model``, or against the trimmed model when
+    a fieldset was requested (which keeps the embedded relations). The response
+    is built here, so FastAPI doesn't validate and encode the rows a second time."""
+    if isinstance(data, Response):
+        return data
+    if fields is not None:
+        model = trimmed_model(model, tuple([*fields, *(include or {})]))
+    # Carry over the validators and pagination headers set on the injected response
+    headers = {k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")}
+    return json_response(data, model, settings.RESPONSE_TRUST_UPSTREAM, exclude_unset, headers)
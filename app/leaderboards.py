@@ -0,0 +1,147 @@
+import bisect
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+
+# Event types counted per player, and the statistic each one feeds
+EVENT_STATS = {"goal": "goals", "yellow_card": "yellow_cards", "red_card": "red_cards"}
+# A player subbed on or off played in that match
+APPEARANCE_EVENTS = ("substitution_in", "substitution_out")
+STATS = ("goals", "yellow_cards", "red_cards", "appearances")
+
+
+class Leaderboard:
+    """Per-player event counts of one tournament.
+
+    Every statistic keeps its players in a list sorted by ``(-value, player_id)``,
+    patched with bisect on each change, so the top N is a slice of that list.
+    Appearances are distinct matches, counted from the substitution events each
+    player has in each match.
+    """
+
+    def __init__(self):
+        self.values: Dict[str, Dict[str, int]] = {stat: {} for stat in STATS}
+        self.index: Dict[str, List[Tuple[int, str]]] = {stat: [] for stat in STATS}
+        self.teams: Dict[str, str] = {}
+        self.names: Dict[str, str] = {}
+        self._substitutions: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.built_at = time.monotonic()
+
+    def _add(self, stat: str, player_id: str, delta: int) -> None:
+        values, index = self.values[stat], self.index[stat]
+        old = values.get(player_id, 0)
+        new = max(old + delta, 0)
+        if old == new:
+            return
+        if old:
+            del index[bisect.bisect_left(index, (-old, player_id))]
+        if new:
+            bisect.insort(index, (-new, player_id))
+            values[player_id] = new
+        else:
+            values.pop(player_id, None)
+
+    def apply(self, event: Dict[str, Any], sign: int = 1) -> None:
+        """Adds (sign=1) or removes (sign=-1) one event's contribution."""
+        if event.get("player_id") is None:
+            return
+        player_id = str(event["player_id"])
+        if sign > 0:
+            self.teams[player_id] = str(event["team_id"])
+        stat = EVENT_STATS.get(event["type"])
+        if stat is not None:
+            self._add(stat, player_id, sign)
+        elif event["type"] in APPEARANCE_EVENTS:
+            key = (player_id, str(event["match_id"]))
+            before = self._substitutions[key]
+            self._substitutions[key] = max(before + sign, 0)
+            if not self._substitutions[key]:
+                del self._substitutions[key]
+            if bool(before) != bool(self._substitutions.get(key)):
+                self._add("appearances", player_id, sign)
+
+    def top(self, stat: str, limit: int) -> List[Dict[str, Any]]:
+        rows = []
+        rank = 0
+        for position, (value, player_id) in enumerate(self.index[stat][:limit], start=1):
+            # Tied players share a rank (1, 2, 2, 4)
+            if not rows or rows[-1]["value"] != -value:
+                rank = position
+            rows.append({
+                "rank": rank,
+                "player_id": player_id,
+                "player_name": self.names.get(player_id),
+                "team_id": self.teams.get(player_id),
+                "value": -value,
+            })
+        return rows
+
+
+def build_leaderboard(events: Iterable[Dict[str, Any]]) -> Leaderboard:
+    board = Leaderboard()
+    for event in events:
+        board.apply(event)
+    return board
+
+
+class LeaderboardStore:
+    """Per-worker leaderboards, kept current by event write deltas.
+
+    Works like StandingsStore: built on first read, patched by ``event_changed``
+    for every event written through this worker and rebuilt once older than
+    ``max_age`` seconds to pick up writes made elsewhere.
+    """
+
+    def __init__(self, max_age: float = settings.LEADERBOARDS_MAX_AGE):
+        self.max_age = max_age
+        self._boards: Dict[str, Leaderboard] = {}
+        self._generations: Dict[str, int] = {}
+
+    def get(self, tournament_id: str) -> Optional[Leaderboard]:
+        board = self._boards.get(str(tournament_id))
+        if board is None:
+            return None
+        if self.max_age and time.monotonic() - board.built_at > self.max_age:
+            self._boards.pop(str(tournament_id), None)
+            return None
+        return board
+
+    def generation(self, tournament_id: str) -> int:
+        return self._generations.get(str(tournament_id), 0)
+
+    def store(self, tournament_id: str, board: Leaderboard, generation: int) -> Leaderboard:
+        """Keeps a freshly built board unless an event was written since ``generation``."""
+        if self.generation(tournament_id) == generation:
+            self._boards[str(tournament_id)] = board
+        return board
+
+    def invalidate(self, tournament_id: str) -> None:
+        tournament_id = str(tournament_id)
+        self._generations[tournament_id] = self.generation(tournament_id) + 1
+        self._boards.pop(tournament_id, None)
+
+    def event_changed(self, tournament_id: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        """Applies an event going from ``old`` to ``new`` (either may be None)."""
+        tournament_id = str(tournament_id)
+        self._generations[tournament_id] = self.generation(tournament_id) + 1
+        board = self._boards.get(tournament_id)
+        if board is None:
+            return
+        if old is not None:
+            board.apply(old, -1)
+        if new is not None:
+            board.apply(new)
+
+    def player_changed(self, player_id: str) -> None:
+        # Names are looked up again on the next read
+        for board in self._boards.values():
+            board.names.pop(str(player_id), None)
+
+    def clear(self) -> None:
+        self._boards.clear()
+        self._generations.clear()
+
+
+leaderboard_store = LeaderboardStore()
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+
+
+@dataclass
+class LiveMessage:
+    seq: int
+    type: str
+    # Serialized once per publish, however many subscribers it is fanned out to
+    data: str
+
+
+class Subscription:
+    """One client's view of a match channel.
+
+    Messages are delivered through a bounded queue. A consumer that lets it fill
+    up is switched to catching up from the channel history instead, so a slow
+    client costs at most ``LIVE_QUEUE_SIZE`` messages of memory and never
+    blocks the writers.
+    """
+
+    def __init__(self, channel: "MatchChannel", last_seq: int, queue_size: int):
+        self.channel = channel
+        self.last_seq = last_seq
+        self.queue: "asyncio.Queue[LiveMessage]" = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+        self.closed = asyncio.Event()
+
+    def offer(self, message: LiveMessage) -> None:
+        if self.lagged:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Drop what is queued; the consumer replays it from history
+            self.lagged = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(LAGGED)
+
+    async def messages(self, heartbeat: Optional[float] = None) -> AsyncIterator[LiveMessage]:
+        """Yields messages in sequence order until the subscription is closed.
+
+        Yields ``RESET`` when messages were lost (the client fell further behind
+        than the history reaches), after which the client should refetch the
+        match, and ``HEARTBEAT`` after ``heartbeat`` idle seconds.
+        """
+        while True:
+            if self.closed.is_set() and self.queue.empty():
+                return
+            getter = asyncio.ensure_future(self.queue.get())
+            closer = asyncio.ensure_future(self.closed.wait())
+            try:
+                done, _ = await asyncio.wait({getter, closer}, timeout=heartbeat, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                closer.cancel()
+                if not getter.done():
+                    getter.cancel()
+            if getter not in done:
+                if closer in done:
+                    return
+                yield HEARTBEAT
+                continue
+            message = getter.result()
+
+            if message is LAGGED:
+                self.lagged = False
+                backlog = self.channel.since(self.last_seq)
+                if backlog is None:
+                    yield RESET
+                    self.last_seq = self.channel.seq
+                    continue
+                for queued in backlog:
+                    self.last_seq = queued.seq
+                    yield queued
+                continue
+            # Anything published while replaying history is both there and queued
+            if message.seq <= self.last_seq:
+                continue
+            self.last_seq = message.seq
+            yield message
+
+    def close(self) -> None:
+        self.closed.set()
+
+
+class MatchChannel:
+    def __init__(self, history: int):
+        self.seq = 0
+        self.history: Deque[LiveMessage] = deque(maxlen=history)
+        self.subscribers: Set[Subscription] = set()
+        # Set by match updates; the history of a finished match isn't kept once unwatched
+        self.finished = False
+
+    def since(self, seq: int) -> Optional[List[LiveMessage]]:
+        """Messages after ``seq``, or None if some of them are no longer kept."""
+        if seq >= self.seq:
+            return []
+        if not self.history or self.history[0].seq > seq + 1:
+            return None
+        return [message for message in self.history if message.seq > seq]
+
+
+# Markers passed through subscription queues and iterators
+LAGGED = LiveMessage(seq=-1, type="lagged", data="null")
+RESET = LiveMessage(seq=-1, type="reset", data="null")
+HEARTBEAT = LiveMessage(seq=-1, type="heartbeat", data="null")
+
+
+class LiveHub:
+    """Per-worker fan-out of match writes to the stream subscribers of that match.
+
+    Fed by the match and event write routes, so with several workers a client
+    only sees writes made through the worker it is connected to. Message ids
+    are ``<hub id>-<seq>``: a Last-Event-ID from before a restart doesn't match
+    the hub id and the client is told to reset instead of silently missing
+    messages.
+    """
+
+    def __init__(
+        self,
+        history: int = settings.LIVE_HISTORY,
+        queue_size: int = settings.LIVE_QUEUE_SIZE,
+        history_ttl: float = settings.LIVE_HISTORY_TTL,
+    ):
+        self.history = history
+        self.queue_size = queue_size
+        self.history_ttl = history_ttl
+        self.id = uuid.uuid4().hex[:8]
+        self._channels: Dict[str, MatchChannel] = {}
+        # Channels without subscribers -> when the last one left, oldest first
+        self._idle: Dict[str, float] = {}
+
+    def _expire(self) -> None:
+        """Drops the channels that have had no subscribers for ``history_ttl`` seconds."""
+        now = time.monotonic()
+        while self._idle:
+            match_id, since = next(iter(self._idle.items()))
+            if now - since < self.history_ttl:
+                return
+            del self._idle[match_id]
+            self._channels.pop(match_id, None)
+
+    def _drop(self, match_id: str) -> Optional[MatchChannel]:
+        self._idle.pop(match_id, None)
+        return self._channels.pop(match_id, None)
+
+    def message_id(self, message: LiveMessage) -> str:
+        return f"{self.id}-{message.seq}"
+
+    def _parse_id(self, last_event_id: Optional[str]) -> Optional[int]:
+        hub_id, _, seq = (last_event_id or "").rpartition("-")
+        if hub_id != self.id or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def publish(self, match_id, type: str, data: Any) -> None:
+        self._expire()
+        channel = self._channels.get(str(match_id))
+        if channel is None:
+            # Nobody subscribed lately, so there is nobody to deliver to or resume
+            return
+        if type == "match.updated" and isinstance(data, dict):
+            channel.finished = data.get("status") == "finished"
+        channel.seq += 1
+        message = LiveMessage(channel.seq, type, json.dumps(data, default=str))
+        channel.history.append(message)
+        for subscription in channel.subscribers:
+            subscription.offer(message)
+        if channel.finished and not channel.subscribers:
+            self._drop(str(match_id))
+
+    def close(self, match_id) -> None:
+        """Ends every stream of a deleted match."""
+        channel = self._drop(str(match_id))
+        if channel is not None:
+            for subscription in channel.subscribers:
+                subscription.close()
+
+    def subscribe(self, match_id, last_event_id: Optional[str] = None) -> Tuple[Subscription, List[LiveMessage]]:
+        """Returns the subscription and the messages to send before its own:
+        the ones after ``last_event_id``, or ``RESET`` when they can't be replayed."""
+        self._expire()
+        self._idle.pop(str(match_id), None)
+        channel = self._channels.setdefault(str(match_id), MatchChannel(self.history))
+        subscription = Subscription(channel, channel.seq, self.queue_size)
+        channel.subscribers.add(subscription)
+        if last_event_id is None:
+            return subscription, []
+        seq = self._parse_id(last_event_id)
+        backlog = channel.since(seq) if seq is not None and seq <= channel.seq else None
+        return subscription, [RESET] if backlog is None else backlog
+
+    def unsubscribe(self, match_id, subscription: Subscription) -> None:
+        # The channel and its history stay for clients reconnecting with
+        # Last-Event-ID, for history_ttl seconds or until the match is finished
+        channel = self._channels.get(str(match_id))
+        if channel is not None:
+            channel.subscribers.discard(subscription)
+            if not channel.subscribers:
+                if channel.finished:
+                    self._drop(str(match_id))
+                else:
+                    self._idle.setdefault(str(match_id), time.monotonic())
+        self._expire()
+
+    def subscribers(self, match_id) -> int:
+        channel = self._channels.get(str(match_id))
+        return len(channel.subscribers) if channel else 0
+
+
+live_hub = LiveHub()
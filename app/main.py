@@ -1,9 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import supabase
-from app.routers import tournaments, teams, players, matches, events, standings
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.compression import CompressionMiddleware
+from app.config import settings
+from app.database import is_connected, lifespan
+from app.metrics import MetricsMiddleware, registry
+from app.repositories import BackendError
+from app.routers import tournaments, teams, players, matches, events, standings, live
 
-app = FastAPI(title="Kickoff API", version="1.0.0")
+app = FastAPI(title="Kickoff API", version="1.0.0", lifespan=lifespan)
 
 # Enable CORS for all origins (adjust in production)
 app.add_middleware(
@@ -12,7 +17,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "Link", "Server-Timing", "X-Next-Cursor", "X-Total-Count"],
 )
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+if settings.METRICS_ENABLED:
+    # Outermost, so the timings cover the other middleware too
+    app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(BackendError)
+async def backend_error_handler(request: Request, exc: BackendError):
+    # e.g. a check or foreign key violation
+    return JSONResponse(status_code=409, content={"detail": str(exc)})
 
 app.include_router(tournaments.router)
 app.include_router(teams.router)
@@ -20,11 +36,17 @@ app.include_router(players.router)
 app.include_router(matches.router)
 app.include_router(events.router)
 app.include_router(standings.router)
+app.include_router(live.router)
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Welcome to Kickoff API"}
 
 @app.get("/health")
-def health_check():
-    return {"status": "ok", "supabase_connected": bool(supabase)}
+async def health_check():
+    return {"status": "ok", "supabase_connected": is_connected()}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
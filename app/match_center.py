@@ -0,0 +1,212 @@
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from app.config import settings
+
+# Layout of the document; bumped when fields change meaning, so clients can tell
+FORMAT = 1
+MATCH_FIELDS = ("id", "tournament_id", "status", "stage", "start_time", "home_score", "away_score", "updated_at")
+TEAM_FIELDS = ("id", "name", "logo_url", "group")
+PLAYER_FIELDS = ("id", "name", "shirt_number", "position")
+EVENT_FIELDS = ("id", "type", "minute", "team_id", "extra_info", "created_at")
+
+# What the match center reads in one backend call: the match, both squads and its events
+EMBED = {"home_team": {"players": {}}, "away_team": {"players": {}}, "events": {}}
+
+
+def _pick(row: Dict[str, Any], fields) -> Dict[str, Any]:
+    return {field: row.get(field) for field in fields}
+
+
+def _timeline_key(event: Dict[str, Any]):
+    return event["minute"], str(event.get("created_at") or ""), str(event["id"])
+
+
+class MatchCenter:
+    """The denormalized document of one match: both teams, score, status and
+    the timeline of its events with their players.
+
+    Built from one backend read, then patched in place by match and event
+    writes; each change bumps ``seq``. The encoded body is kept until the next
+    change, so serving it is a dict lookup.
+    """
+
+    def __init__(self, match: Dict[str, Any], seq: int):
+        self.seq = seq
+        self.match = _pick(match, MATCH_FIELDS)
+        self.home_team = _pick(match["home_team"], TEAM_FIELDS) if match.get("home_team") else None
+        self.away_team = _pick(match["away_team"], TEAM_FIELDS) if match.get("away_team") else None
+        self.players: Dict[str, Dict[str, Any]] = {}
+        for team in (match.get("home_team"), match.get("away_team")):
+            for player in (team or {}).get("players") or ():
+                self.players[str(player["id"])] = _pick(player, PLAYER_FIELDS)
+        self.events: Dict[str, Dict[str, Any]] = {}
+        for event in match.get("events") or ():
+            self._put_event(event)
+        self.built_at = time.monotonic()
+        self._body: Optional[bytes] = None
+
+    @property
+    def team_ids(self) -> List[str]:
+        return [str(team["id"]) for team in (self.home_team, self.away_team) if team]
+
+    def _put_event(self, event: Dict[str, Any]) -> None:
+        entry = _pick(event, EVENT_FIELDS)
+        entry["player_id"] = event.get("player_id")
+        self.events[str(event["id"])] = entry
+
+    def _side(self, team_id: Any) -> Optional[str]:
+        if self.home_team and str(team_id) == str(self.home_team["id"]):
+            return "home"
+        if self.away_team and str(team_id) == str(self.away_team["id"]):
+            return "away"
+        return None
+
+    def document(self) -> Dict[str, Any]:
+        timeline = []
+        for event in sorted(self.events.values(), key=_timeline_key):
+            entry = {key: value for key, value in event.items() if key != "player_id"}
+            entry["side"] = self._side(event["team_id"])
+            player_id = event["player_id"]
+            entry["player"] = self.players.get(str(player_id)) if player_id is not None else None
+            timeline.append(entry)
+        return {
+            "format": FORMAT,
+            "seq": self.seq,
+            **{("match_id" if key == "id" else key): value for key, value in self.match.items()},
+            "home_team": self.home_team,
+            "away_team": self.away_team,
+            "timeline": timeline,
+        }
+
+    def body(self) -> bytes:
+        if self._body is None:
+            self._body = orjson.dumps(self.document(), default=str)
+        return self._body
+
+    def changed(self, seq: int) -> None:
+        self.seq = seq
+        self._body = None
+
+
+class MatchCenterStore:
+    """Per-worker match center documents, kept current by the write routes.
+
+    Documents are built on first read and patched by ``match_changed`` and
+    ``event_changed``; writes that can't be applied as a patch (a match
+    switching teams, a team renamed) drop the document instead. Like the
+    standings, documents are rebuilt once older than ``max_age`` to pick up
+    writes made through other workers, and at most ``max_entries`` are kept,
+    least recently read first out.
+
+    Every match has a sequence number, bumped by each write and rebuild, which
+    is the document's ``seq`` and part of its ETag. Sequence numbers are per
+    worker; the store id in the ETag keeps two workers' tags apart.
+    """
+
+    def __init__(self, max_entries: int = settings.MATCH_CENTER_MAX_ENTRIES, max_age: float = settings.MATCH_CENTER_MAX_AGE):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.id = uuid.uuid4().hex[:8]
+        self._documents: "OrderedDict[str, MatchCenter]" = OrderedDict()
+        self._seqs: Dict[str, int] = {}
+        self.hits = 0
+        self.builds = 0
+        self.patches = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"documents": len(self._documents), "hits": self.hits, "builds": self.builds, "patches": self.patches}
+
+    def etag(self, center: MatchCenter) -> str:
+        return f'"{self.id}-{center.match["id"]}-{center.seq}"'
+
+    def get(self, match_id: str) -> Optional[MatchCenter]:
+        match_id = str(match_id)
+        center = self._documents.get(match_id)
+        if center is None:
+            return None
+        if self.max_age and time.monotonic() - center.built_at > self.max_age:
+            del self._documents[match_id]
+            return None
+        self._documents.move_to_end(match_id)
+        self.hits += 1
+        return center
+
+    def seq(self, match_id: str) -> int:
+        return self._seqs.get(str(match_id), 0)
+
+    def _bump(self, match_id: str) -> int:
+        seq = self._seqs[match_id] = self.seq(match_id) + 1
+        return seq
+
+    def store(self, match: Dict[str, Any], seq: int) -> MatchCenter:
+        """Builds the document of a freshly read match (with ``EMBED``) and keeps
+        it, unless the match was written since ``seq`` was taken."""
+        match_id = str(match["id"])
+        self.builds += 1
+        if self.seq(match_id) != seq:
+            return MatchCenter(match, seq)
+        center = MatchCenter(match, self._bump(match_id))
+        self._documents[match_id] = center
+        while len(self._documents) > self.max_entries:
+            self._documents.popitem(last=False)
+        return center
+
+    def _patch(self, match_id: str) -> Optional[MatchCenter]:
+        """The document to patch for a write to ``match_id``, after bumping its seq."""
+        seq = self._bump(match_id)
+        center = self._documents.get(match_id)
+        if center is not None:
+            center.changed(seq)
+            self.patches += 1
+        return center
+
+    def match_changed(self, match: Dict[str, Any]) -> None:
+        match_id = str(match["id"])
+        center = self._patch(match_id)
+        if center is None:
+            return
+        if [str(match["home_team_id"]), str(match["away_team_id"])] != center.team_ids:
+            del self._documents[match_id]
+            return
+        center.match.update(_pick(match, [field for field in MATCH_FIELDS if field in match]))
+
+    def event_changed(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        """Applies an event going from ``old`` to ``new`` (either may be None)."""
+        match_id = str((new or old)["match_id"])
+        center = self._patch(match_id)
+        if center is None:
+            return
+        if old is not None:
+            center.events.pop(str(old["id"]), None)
+        if new is not None:
+            center._put_event(new)
+        if old is not None and new is not None and str(old["match_id"]) != str(new["match_id"]):
+            self.remove(old["match_id"])
+
+    def remove(self, match_id: str) -> None:
+        match_id = str(match_id)
+        self._bump(match_id)
+        self._documents.pop(match_id, None)
+
+    def team_changed(self, team_id: str) -> None:
+        self._drop(lambda center: str(team_id) in center.team_ids)
+
+    def player_changed(self, player: Dict[str, Any]) -> None:
+        # A player who joins or leaves one of the squads changes which names resolve
+        self._drop(lambda center: str(player["id"]) in center.players or str(player.get("team_id")) in center.team_ids)
+
+    def _drop(self, predicate) -> None:
+        for match_id in [match_id for match_id, center in self._documents.items() if predicate(center)]:
+            self.remove(match_id)
+
+    def clear(self) -> None:
+        self._documents.clear()
+        self._seqs.clear()
+
+
+match_center_store = MatchCenterStore()
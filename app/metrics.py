@@ -0,0 +1,329 @@
+import math
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import anyio.to_thread
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.repositories.base import Backend, Query
+
+# A minimal Prometheus text-format registry (https://prometheus.io/docs/instrumenting/exposition_formats/),
+# enough for the counters and histograms below without another dependency.
+
+Labels = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100, 1000)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Iterable[str], values: Iterable[Any]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = ()):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        key = tuple(str(label) for label in labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.buckets = buckets
+        # labels -> (per-bucket counts, sum, count)
+        self.values: Dict[Labels, List[Any]] = {}
+
+    def observe(self, value: float, *labels: Any) -> None:
+        key = tuple(str(label) for label in labels)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[0][i] += 1
+                break
+        entry[1] += value
+        entry[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        for labels, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket in zip((*self.buckets, math.inf), (*counts, count - sum(counts))):
+                cumulative += bucket
+                le = _labels((*self.labelnames, "le"), (*labels, _number(bound)))
+                yield f"{self.name}_bucket{le} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {count}"
+
+
+class Gauge:
+    """Value read at scrape time from ``read``, which returns a number or a
+    ``{labels: number}`` dict. ``kind="counter"`` for totals kept elsewhere."""
+
+    def __init__(self, name: str, help: str, read: Callable[[], Any], labelnames: Labels = (), kind: str = "gauge"):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.read = read
+        self.kind = kind
+
+    def samples(self) -> Iterable[str]:
+        value = self.read()
+        values = value if isinstance(value, dict) else {(): value}
+        for labels, number in values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(number)}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Any] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def stats(
+        self, prefix: str, help: str, read: Callable[[], Dict[str, Any]],
+        counters: Iterable[str] = (), gauges: Iterable[str] = (),
+    ) -> None:
+        """Exposes numbers of a ``stats()`` dict: ``counters`` (running totals) as
+        ``<prefix>_<key>_total`` and ``gauges`` (current values) as ``<prefix>_<key>``.
+
+        Averages and ratios over the process lifetime are left out; they follow
+        from the counters with ``rate()``."""
+        for key in counters:
+            name = f"{prefix}_{key}" if key.endswith("_total") else f"{prefix}_{key}_total"
+            self.register(Gauge(name, f"{help}: {key}", lambda key=key: read()[key], kind="counter"))
+        for key in gauges:
+            self.register(Gauge(f"{prefix}_{key}", f"{help}: {key}", lambda key=key: read()[key]))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "kickoff_http_requests_total", "HTTP requests served", ("method", "route", "status")))
+http_duration = registry.register(Histogram(
+    "kickoff_http_request_duration_seconds", "Time to the response headers", ("method", "route")))
+http_response_size = registry.register(Histogram(
+    "kickoff_http_response_size_bytes", "Response body size as sent", ("method", "route"), SIZE_BUCKETS))
+http_upstream_calls = registry.register(Histogram(
+    "kickoff_http_upstream_calls_per_request", "Backend round trips per request", ("method", "route"), COUNT_BUCKETS))
+upstream_calls = registry.register(Counter(
+    "kickoff_upstream_calls_total", "Backend calls", ("table", "operation", "outcome")))
+upstream_duration = registry.register(Histogram(
+    "kickoff_upstream_call_duration_seconds", "Backend call latency", ("table", "operation")))
+upstream_rows = registry.register(Histogram(
+    "kickoff_upstream_rows", "Rows returned per backend call", ("table", "operation"), COUNT_BUCKETS))
+
+
+@dataclass
+class RequestTimings:
+    upstream_calls: int = 0
+    upstream_seconds: float = 0.0
+
+
+_request: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+class InstrumentedBackend(Backend):
+    """Wraps a backend to time every call per table and operation, and to count
+    the round trips of the current request."""
+
+    def __init__(self, inner: Backend):
+        self.inner = inner
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    async def _call(self, table: str, operation: str, call):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await call
+            outcome = "ok"
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            upstream_calls.inc(table, operation, outcome)
+            upstream_duration.observe(elapsed, table, operation)
+            timings = _request.get()
+            if timings is not None:
+                timings.upstream_calls += 1
+                timings.upstream_seconds += elapsed
+
+    async def select(self, table: str, query: Query) -> List[Dict[str, Any]]:
+        rows = await self._call(table, "select", self.inner.select(table, query))
+        upstream_rows.observe(len(rows), table, "select")
+        return rows
+
+    async def count(self, table: str, filters: Dict[str, Any]) -> int:
+        return await self._call(table, "count", self.inner.count(table, filters))
+
+    async def select_with_count(self, table: str, query: Query):
+        if type(self.inner).select_with_count is Backend.select_with_count:
+            # Two round trips, counted as such
+            return await Backend.select_with_count(self, table, query)
+        rows, total = await self._call(table, "select_with_count", self.inner.select_with_count(table, query))
+        upstream_rows.observe(len(rows), table, "select_with_count")
+        return rows, total
+
+    async def insert(self, table: str, rows: List[Dict[str, Any]], on_conflict: Optional[List[str]] = None):
+        operation = "upsert" if on_conflict else "insert"
+        return await self._call(table, operation, self.inner.insert(table, rows, on_conflict))
+
+    async def update(self, table: str, filters: Dict[str, Any], data: Dict[str, Any]):
+        return await self._call(table, "update", self.inner.update(table, filters, data))
+
+    async def delete(self, table: str, filters: Dict[str, Any]):
+        return await self._call(table, "delete", self.inner.delete(table, filters))
+
+    async def rpc(self, function: str, params: Dict[str, Any]):
+        return await self._call(function, "rpc", self.inner.rpc(function, params))
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+
+class MetricsMiddleware:
+    """Records request counts, latency, response sizes and backend round trips
+    per route template, and adds a ``Server-Timing`` header with the time spent
+    in backend calls versus the rest of the request."""
+
+    def __init__(self, app: ASGIApp, server_timing: bool = settings.METRICS_SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = _request.set(timings)
+        started = time.perf_counter()
+        status = 500
+        elapsed = 0.0
+        size = 0
+
+        async def send_timed(message: Message) -> None:
+            nonlocal status, elapsed, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - started
+                if self.server_timing:
+                    upstream = timings.upstream_seconds * 1000
+                    MutableHeaders(raw=message["headers"]).append("Server-Timing", ", ".join((
+                        f'upstream;dur={upstream:.2f};desc="round trips: {timings.upstream_calls}"',
+                        f"app;dur={elapsed * 1000 - upstream:.2f}",
+                        f"total;dur={elapsed * 1000:.2f}",
+                    )))
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            _request.reset(token)
+            route = scope.get("route")
+            # Unmatched paths share one label, so scanners can't blow up the series count
+            labels = (scope["method"], route.path if route is not None else "<unmatched>")
+            http_requests.inc(*labels, status)
+            http_duration.observe(elapsed or time.perf_counter() - started, *labels)
+            http_response_size.observe(size, *labels)
+            http_upstream_calls.observe(timings.upstream_calls, *labels)
+
+
+def _threadpool() -> Dict[Labels, float]:
+    # Sync endpoints, JWKS fetches and run_in_threadpool all share this limiter
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    return {
+        ("capacity",): limiter.total_tokens,
+        ("in_use",): statistics.borrowed_tokens,
+        ("waiting",): statistics.tasks_waiting,
+    }
+
+
+def _register_stats() -> None:
+    from app.auth import token_verifier
+    from app.cache import response_cache
+    from app.event_queue import event_queue
+    from app.match_center import match_center_store
+
+    registry.register(Gauge("kickoff_threadpool_threads", "Worker threadpool usage", _threadpool, ("state",)))
+
+    def cache_stats() -> Dict[Labels, float]:
+        return {
+            ("response", "hits"): response_cache.hits,
+            ("response", "stale"): response_cache.stale_hits,
+            ("response", "misses"): response_cache.misses,
+            ("compressed_body", "hits"): response_cache.body_hits,
+            ("compressed_body", "misses"): response_cache.body_misses,
+        }
+
+    def cache_ratios() -> Dict[Labels, float]:
+        stats = cache_stats()
+        ratios = {}
+        for cache in ("response", "compressed_body"):
+            hits = stats[(cache, "hits")] + stats.get((cache, "stale"), 0)
+            lookups = hits + stats[(cache, "misses")]
+            ratios[(cache,)] = hits / lookups if lookups else 0.0
+        return ratios
+
+    registry.register(Gauge(
+        "kickoff_cache_lookups_total", "Cache lookups by result", cache_stats, ("cache", "result"), kind="counter"))
+    registry.register(Gauge("kickoff_cache_hit_ratio", "Cache hits / lookups", cache_ratios, ("cache",)))
+    registry.stats(
+        "kickoff_cache_single_flight", "Coalesced response cache loads", response_cache.flights.stats,
+        counters=("leaders", "followers"), gauges=("in_flight",),
+    )
+    registry.stats(
+        "kickoff_auth", "Admin token verification", token_verifier.stats,
+        counters=("hits", "misses", "failures", "remote_calls", "verify_seconds_total"), gauges=("cached",),
+    )
+    registry.stats(
+        "kickoff_event_queue", "Write-behind event queue", event_queue.stats,
+        counters=("accepted", "flushed", "rejected", "flushes", "flush_errors", "flush_seconds_total"),
+        gauges=("depth", "last_flush_seconds"),
+    )
+    registry.stats(
+        "kickoff_match_center", "Materialized match center documents", match_center_store.stats,
+        counters=("hits", "builds", "patches"), gauges=("documents",),
+    )
+
+
+_register_stats()
@@ -0,0 +1,69 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi import HTTPException, Query, Request, Response
+
+from app.conditional import revalidate
+from app.config import settings
+
+
+def encode_cursor(after: List[Any]) -> str:
+    raw = json.dumps(after, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        after = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(after, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return after
+
+
+class PageParams:
+    """Keyset pagination query parameters shared by the list routes."""
+
+    def __init__(
+        self,
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+        count: bool = Query(False, description="Return the total number of matching rows in X-Total-Count"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.count = count
+
+    @property
+    def after(self) -> Optional[List[Any]]:
+        return decode_cursor(self.cursor) if self.cursor else None
+
+
+async def load_page(
+    repository,
+    page: PageParams,
+    filters: Optional[Dict[str, Any]] = None,
+    columns: Optional[List[str]] = None,
+    embed: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    try:
+        return await repository.page(
+            filters, limit=page.limit, after=page.after, columns=columns, count=page.count, embed=embed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def page_response(request: Request, response: Response, page: Dict[str, Any], max_age: int) -> Union[List[Dict[str, Any]], Response]:
+    """Returns the page's rows, with the next cursor in ``X-Next-Cursor`` / ``Link``
+    and the total (when requested) in ``X-Total-Count``."""
+    if page["next"] is not None:
+        cursor = encode_cursor(page["next"])
+        response.headers["X-Next-Cursor"] = cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=cursor)}>; rel="next"'
+    if page["total"] is not None:
+        response.headers["X-Total-Count"] = str(page["total"])
+    return revalidate(request, response, page["items"], max_age)
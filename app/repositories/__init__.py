@@ -0,0 +1,9 @@
+from app.repositories.base import Backend, BackendError, MissingFunction, Query, Repository
+from app.repositories.entities import (
+    MatchEventRepository,
+    MatchRepository,
+    PlayerRepository,
+    StandingsRepository,
+    TeamRepository,
+    TournamentRepository,
+)
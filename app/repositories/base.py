@@ -0,0 +1,337 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+
+
+@dataclass
+class Query:
+    """Backend-agnostic description of a read.
+
+    ``filters`` maps a column to the value it must equal; a list, tuple or set
+    value means "column is one of". ``order`` is a list of ``(column, descending)``
+    pairs and ``columns=None`` selects every column. ``after`` holds the order
+    column values of the last row already seen (keyset pagination). ``embed`` is
+    a tree of relation names (see RELATIONS) to nest into each row.
+
+    A filter key ``relation.column`` filters on a column of a to-one relation
+    instead, e.g. ``{"match.tournament_id": ...}`` on match_events; rows
+    without a matching related row are left out (an inner join).
+    """
+    filters: Dict[str, Any] = field(default_factory=dict)
+    order: List[Tuple[str, bool]] = field(default_factory=list)
+    columns: Optional[List[str]] = None
+    limit: Optional[int] = None
+    after: Optional[List[Any]] = None
+    embed: Optional["Embed"] = None
+
+
+@dataclass(frozen=True)
+class Relation:
+    """A foreign key seen from one side.
+
+    To-one relations follow ``column`` on the source row to the target's id;
+    to-many relations collect target rows whose ``column`` is the source's id.
+    """
+    table: str
+    column: str
+    many: bool = False
+    order: Tuple[Tuple[str, bool], ...] = ()
+
+
+# Relations that can be embedded, per source table (from schema.sql's foreign keys)
+RELATIONS: Dict[str, Dict[str, Relation]] = {
+    "tournaments": {
+        "teams": Relation("teams", "tournament_id", many=True, order=(("name", False),)),
+        "matches": Relation("matches", "tournament_id", many=True, order=(("start_time", False),)),
+    },
+    "teams": {
+        "tournament": Relation("tournaments", "tournament_id"),
+        "players": Relation("players", "team_id", many=True, order=(("shirt_number", False),)),
+    },
+    "players": {
+        "team": Relation("teams", "team_id"),
+    },
+    "matches": {
+        "tournament": Relation("tournaments", "tournament_id"),
+        "home_team": Relation("teams", "home_team_id"),
+        "away_team": Relation("teams", "away_team_id"),
+        "events": Relation("match_events", "match_id", many=True, order=(("minute", False),)),
+    },
+    "match_events": {
+        "match": Relation("matches", "match_id"),
+        "team": Relation("teams", "team_id"),
+        "player": Relation("players", "player_id"),
+    },
+}
+
+# PostgREST's default db-max-rows: longer results are cut off without an error,
+# so reads that can exceed it go through Repository.list_all
+MAX_ROWS = 1000
+
+# Nested relation names, e.g. {"home_team": {}, "events": {"player": {}}}
+Embed = Dict[str, "Embed"]
+
+
+def filtered_relations(table: str, filters: Dict[str, Any]) -> Dict[str, List[str]]:
+    """To-one relations of ``table`` filtered on by ``relation.column`` keys, with those columns."""
+    joins: Dict[str, List[str]] = {}
+    for key in filters:
+        if "." not in key:
+            continue
+        name, column = key.split(".", 1)
+        relation = RELATIONS.get(table, {}).get(name)
+        if relation is None or relation.many:
+            raise ValueError(f"Unknown relation for {table}: {name}")
+        joins.setdefault(name, []).append(column)
+    return joins
+
+
+def embed_columns(table: str, embed: Optional[Embed]) -> List[str]:
+    """Columns of ``table`` a backend needs to resolve ``embed``."""
+    columns = []
+    for name in embed or {}:
+        relation = RELATIONS[table][name]
+        columns.append("id" if relation.many else relation.column)
+    return columns
+
+
+# Keyset conditions are small expression trees rendered by each backend:
+# ("or", [nodes]), ("and", [nodes]) or ("cmp", column, op, value) with op one of
+# "gt", "lt", "eq", "is_null" and "not_null".
+Condition = Tuple[Any, ...]
+
+
+def keyset_condition(order: List[Tuple[str, bool]], after: List[Any]) -> Condition:
+    """Rows strictly after ``after`` in ``order``, with Postgres NULL placement
+    (last for ascending columns, first for descending ones)."""
+    (column, descending), value = order[0], after[0]
+    rest = keyset_condition(order[1:], after[1:]) if len(order) > 1 else None
+
+    if value is None:
+        tie = ("cmp", column, "is_null", None)
+        # NULLs sort first in a descending column, so every non-NULL row follows
+        beyond = [("cmp", column, "not_null", None)] if descending else []
+    else:
+        tie = ("cmp", column, "eq", value)
+        beyond = [("cmp", column, "lt" if descending else "gt", value)]
+        if not descending:
+            beyond.append(("cmp", column, "is_null", None))
+
+    branches = list(beyond)
+    if rest is not None:
+        branches.append(("and", [tie, rest]))
+    return ("or", branches)
+
+
+class BackendError(Exception):
+    """A write rejected by the database (constraint or type violation)."""
+
+
+class MissingFunction(BackendError):
+    """An rpc to a database function that isn't installed (its migration wasn't applied)."""
+
+
+class Backend(ABC):
+    """Storage engine behind the repositories. Rows are plain JSON-compatible dicts."""
+
+    name: str
+
+    @abstractmethod
+    async def select(self, table: str, query: Query) -> List[Dict[str, Any]]:
+        ...
+
+    async def count(self, table: str, filters: Dict[str, Any]) -> int:
+        return len(await self.select(table, Query(filters=filters, columns=["id"])))
+
+    async def select_with_count(self, table: str, query: Query) -> Tuple[List[Dict[str, Any]], int]:
+        """Rows for ``query`` plus the total number of rows matching its filters."""
+        return await self.select(table, query), await self.count(table, query.filters)
+
+    @abstractmethod
+    async def insert(
+        self, table: str, rows: List[Dict[str, Any]], on_conflict: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Inserts ``rows`` in one statement and returns them in the same order.
+
+        With ``on_conflict``, rows whose values for those (uniquely indexed)
+        columns already exist update the existing row instead. Raises
+        BackendError when the database rejects the statement; nothing is
+        written in that case.
+        """
+
+    @abstractmethod
+    async def update(self, table: str, filters: Dict[str, Any], data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Updates the matching rows and returns them; raises BackendError like insert."""
+
+    @abstractmethod
+    async def delete(self, table: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def rpc(self, function: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Calls a database function (see migrations/) and returns its rows."""
+
+    async def close(self) -> None:
+        pass
+
+
+def encode(value: Any) -> Any:
+    """Converts UUIDs, dates, enums and nested models into JSON-compatible values."""
+    return jsonable_encoder(value)
+
+
+def _comparable(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return value
+        return parsed.astimezone(timezone.utc) if parsed.tzinfo else parsed
+    return value
+
+
+class Repository:
+    """Generic CRUD over one table; the entity repositories add their own access paths."""
+
+    table: str
+    default_order: List[Tuple[str, bool]] = []
+    # Columns identifying a row outside of its id, used for upserts. Not
+    # enforced by the database (migrations/004_natural_keys.sql)
+    natural_key: Tuple[str, ...] = ()
+
+    def __init__(self, backend: Backend):
+        self.backend = backend
+
+    def _columns(self, columns: Optional[List[str]], embed: Optional[Embed]) -> Optional[List[str]]:
+        if columns is None:
+            return None
+        return list(dict.fromkeys([*columns, *embed_columns(self.table, embed)]))
+
+    async def get(
+        self, id: UUID, columns: Optional[List[str]] = None, embed: Optional[Embed] = None
+    ) -> Optional[Dict[str, Any]]:
+        query = Query(filters={"id": encode(id)}, columns=self._columns(columns, embed), limit=1, embed=embed)
+        rows = await self.backend.select(self.table, query)
+        return rows[0] if rows else None
+
+    async def exists(self, id: UUID) -> bool:
+        return await self.get(id, columns=["id"]) is not None
+
+    async def list(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        order: Optional[List[Tuple[str, bool]]] = None,
+        columns: Optional[List[str]] = None,
+        embed: Optional[Embed] = None,
+    ) -> List[Dict[str, Any]]:
+        # None filter values mean "not filtered", which is how the routes pass optional query params
+        filters = {k: encode(v) for k, v in (filters or {}).items() if v is not None}
+        query = Query(
+            filters=filters,
+            order=order if order is not None else self.default_order,
+            columns=self._columns(columns, embed),
+            embed=embed,
+        )
+        return await self.backend.select(self.table, query)
+
+    async def page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 100,
+        after: Optional[List[Any]] = None,
+        columns: Optional[List[str]] = None,
+        count: bool = False,
+        embed: Optional[Embed] = None,
+    ) -> Dict[str, Any]:
+        """One keyset page in the default order, with ``id`` as the final tiebreak.
+
+        Returns ``{"items", "next", "total"}`` where ``next`` holds the order values
+        to pass back as ``after`` (None on the last page) and ``total`` is only
+        computed when ``count`` is set.
+        """
+        order = self.default_order + [("id", self.default_order[-1][1] if self.default_order else False)]
+        if after is not None and len(after) != len(order):
+            raise ValueError("Cursor does not match this listing")
+        filters = {k: encode(v) for k, v in (filters or {}).items() if v is not None}
+        columns = self._columns(columns, embed)
+        if columns is not None:
+            columns = columns + [c for c, _ in order if c not in columns]
+        # One extra row tells whether there is a next page without another query
+        query = Query(filters=filters, order=order, columns=columns, limit=limit + 1, after=after, embed=embed)
+        if count:
+            rows, total = await self.backend.select_with_count(self.table, query)
+        else:
+            rows, total = await self.backend.select(self.table, query), None
+
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = [rows[-1][c] for c, _ in order]
+        return {"items": rows, "next": next_after, "total": total}
+
+    async def list_all(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None,
+        embed: Optional[Embed] = None,
+    ) -> List[Dict[str, Any]]:
+        """Every row matching ``filters`` in the default order, read in keyset
+        pages of at most MAX_ROWS rows so that none get cut off."""
+        rows: List[Dict[str, Any]] = []
+        after = None
+        while True:
+            # page() asks for one row more than its limit
+            page = await self.page(filters, limit=MAX_ROWS - 1, after=after, columns=columns, embed=embed)
+            rows.extend(page["items"])
+            after = page["next"]
+            if after is None:
+                return rows
+
+    async def create(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self.backend.insert(self.table, [encode(data)])
+        return rows[0] if rows else None
+
+    async def create_many(self, items: List[Dict[str, Any]], upsert: bool = False) -> List[Dict[str, Any]]:
+        """Inserts ``items`` in a single round trip, returning the rows in order.
+        With ``upsert``, items carrying the id of an existing row update it."""
+        if not items:
+            return []
+        return await self.backend.insert(
+            self.table, [encode(item) for item in items], on_conflict=["id"] if upsert else None
+        )
+
+    async def find_natural(self, items: List[Dict[str, Any]]) -> List[List[str]]:
+        """Ids of the existing rows with each item's natural key, in item order.
+
+        One query, filtering every key column on the values of all items; the
+        exact combinations are matched here. Items with a missing key value
+        match nothing.
+        """
+        if not self.natural_key:
+            raise ValueError(f"{self.table} have no natural key to upsert on")
+        keyed = [encode(item) for item in items]
+        keyed = [item if all(item.get(c) is not None for c in self.natural_key) else None for item in keyed]
+        if not any(keyed):
+            return [[] for _ in items]
+        filters = {c: sorted({item[c] for item in keyed if item}, key=str) for c in self.natural_key}
+        rows = await self.list(filters, order=[], columns=["id", *self.natural_key])
+        found: Dict[tuple, List[str]] = {}
+        for row in rows:
+            found.setdefault(self._natural(row), []).append(row["id"])
+        return [found.get(self._natural(item), []) if item else [] for item in keyed]
+
+    def _natural(self, row: Dict[str, Any]) -> tuple:
+        # Timestamps come back as e.g. +00:00 when they were sent as Z
+        return tuple(_comparable(row[c]) for c in self.natural_key)
+
+    async def update(self, id: UUID, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self.backend.update(self.table, {"id": encode(id)}, encode(data))
+        return rows[0] if rows else None
+
+    async def delete(self, id: UUID) -> Optional[Dict[str, Any]]:
+        rows = await self.backend.delete(self.table, {"id": encode(id)})
+        return rows[0] if rows else None
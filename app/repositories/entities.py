@@ -0,0 +1,102 @@
+import logging
+from typing import Any, Dict, List, Optional, Set
+from uuid import UUID
+
+from app.repositories import ingest
+from app.repositories.base import Backend, MissingFunction, Repository, encode
+
+logger = logging.getLogger(__name__)
+
+# Database functions an rpc found missing: until the process restarts, calls
+# go straight to the Python fallback instead of failing upstream first
+_missing_functions: Set[str] = set()
+
+
+async def _rpc(backend: Backend, function: str, params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """``backend.rpc``, or None when the function isn't installed."""
+    if function in _missing_functions:
+        return None
+    try:
+        return await backend.rpc(function, params)
+    except MissingFunction:
+        logger.warning("Database function %s is missing, falling back to Python; apply its migration", function)
+        _missing_functions.add(function)
+        return None
+
+
+class TournamentRepository(Repository):
+    table = "tournaments"
+    default_order = [("created_at", True)]
+
+
+class TeamRepository(Repository):
+    table = "teams"
+    default_order = [("name", False)]
+    natural_key = ("tournament_id", "name")
+
+    async def list_for_tournament(self, tournament_id: UUID, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        return await self.list({"tournament_id": tournament_id}, columns=columns)
+
+
+class PlayerRepository(Repository):
+    table = "players"
+    default_order = [("shirt_number", False)]
+    natural_key = ("team_id", "shirt_number")
+
+
+class MatchRepository(Repository):
+    table = "matches"
+    default_order = [("start_time", False)]
+    natural_key = ("tournament_id", "home_team_id", "away_team_id", "start_time")
+
+    async def list_finished(self, tournament_id: UUID, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        return await self.list_all({"tournament_id": tournament_id, "status": "finished"}, columns=columns)
+
+
+class MatchEventRepository(Repository):
+    table = "match_events"
+    default_order = [("minute", False)]
+
+    # Event writes that keep the match score current (migrations/005_event_ingestion.sql).
+    # Each returns {"event", "match", "previous", "created"} with the match before
+    # and after the write, or None when the event (or its match) doesn't exist.
+    # With rpc=False, or while the functions are missing, the same steps run as
+    # separate requests, without the database function's transaction and row lock.
+
+    async def _ingest(self, function: str, params: Dict[str, Any], rpc: bool) -> Optional[Dict[str, Any]]:
+        params = encode(params)
+        rows = await _rpc(self.backend, function, params) if rpc else None
+        if rows is None:
+            rows = await ingest.PROCEDURES[function](self.backend, **params)
+        return rows[0] if rows else None
+
+    async def record(self, data: Dict[str, Any], rpc: bool = True) -> Optional[Dict[str, Any]]:
+        """Creates the event, or returns the one already recorded with its idempotency key."""
+        return await self._ingest("record_match_event", {"p_event": data}, rpc)
+
+    async def record_many(self, items: List[Dict[str, Any]], rpc: bool = True) -> List[Dict[str, Any]]:
+        """``record`` for a batch, in order and in one call (one transaction with
+        rpc). Events of unknown matches are skipped, so results are matched to
+        items by idempotency key."""
+        params = {"p_events": encode(items)}
+        rows = await _rpc(self.backend, "record_match_events", params) if rpc else None
+        if rows is None:
+            rows = await ingest.record_match_events(self.backend, **params)
+        return rows
+
+    async def change(self, id: UUID, data: Dict[str, Any], rpc: bool = True) -> Optional[Dict[str, Any]]:
+        return await self._ingest("update_match_event", {"p_event_id": id, "p_changes": data}, rpc)
+
+    async def remove(self, id: UUID, rpc: bool = True) -> Optional[Dict[str, Any]]:
+        return await self._ingest("delete_match_event", {"p_event_id": id}, rpc)
+
+
+class StandingsRepository:
+    """Aggregates computed by the database (migrations/002_tournament_standings.sql)."""
+
+    def __init__(self, backend: Backend):
+        self.backend = backend
+
+    async def for_tournament(self, tournament_id: UUID) -> Optional[List[Dict[str, Any]]]:
+        """One row per team, or None when the function isn't installed."""
+        return await _rpc(self.backend, "tournament_standings", {"p_tournament_id": encode(tournament_id)})
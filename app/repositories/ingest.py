@@ -0,0 +1,89 @@
+from typing import Any, Dict, List, Optional
+
+from app.repositories.base import Backend, Query
+
+# Python versions of the event ingestion functions in
+# migrations/005_event_ingestion.sql, written against the Backend interface.
+# LocalBackend runs them inside one transaction as its rpc; against Supabase
+# they are the fallback with EVENTS_RPC=false or before the migration is
+# applied, which takes several round trips and doesn't lock the match, so
+# concurrent writers can race.
+
+Row = Dict[str, Any]
+
+
+def score_delta(event: Optional[Row], team_id: Any) -> int:
+    """Goals a single event adds to ``team_id``'s score."""
+    if event is None or event.get("type") != "goal":
+        return 0
+    return int(str(event.get("team_id")) == str(team_id))
+
+
+async def _first(backend: Backend, table: str, filters: Dict[str, Any]) -> Optional[Row]:
+    rows = await backend.select(table, Query(filters=filters, limit=1))
+    return rows[0] if rows else None
+
+
+async def _apply(backend: Backend, match: Row, old: Optional[Row], new: Optional[Row], start: bool = False) -> Row:
+    """Moves the match score from ``old``'s contribution to ``new``'s."""
+    changes = {}
+    for side in ("home", "away"):
+        team_id = match[f"{side}_team_id"]
+        delta = score_delta(new, team_id) - score_delta(old, team_id)
+        if delta:
+            changes[f"{side}_score"] = max((match[f"{side}_score"] or 0) + delta, 0)
+    if start and match["status"] == "scheduled":
+        changes["status"] = "live"
+    if not changes:
+        return match
+    return (await backend.update("matches", {"id": match["id"]}, changes))[0]
+
+
+async def record_match_event(backend: Backend, p_event: Row) -> List[Row]:
+    previous = await _first(backend, "matches", {"id": p_event["match_id"]})
+    if previous is None:
+        return []
+    key = p_event.get("idempotency_key")
+    if key is not None:
+        existing = await _first(backend, "match_events", {"match_id": previous["id"], "idempotency_key": key})
+        if existing is not None:
+            return [{"event": existing, "match": previous, "previous": previous, "created": False}]
+
+    event = (await backend.insert("match_events", [p_event]))[0]
+    match = await _apply(backend, previous, None, event, start=True)
+    return [{"event": event, "match": match, "previous": previous, "created": True}]
+
+
+async def record_match_events(backend: Backend, p_events: List[Row]) -> List[Row]:
+    results = []
+    for event in p_events:
+        results.extend(await record_match_event(backend, event))
+    return results
+
+
+async def update_match_event(backend: Backend, p_event_id: str, p_changes: Row) -> List[Row]:
+    old = await _first(backend, "match_events", {"id": p_event_id})
+    if old is None:
+        return []
+    previous = await _first(backend, "matches", {"id": old["match_id"]})
+    event = (await backend.update("match_events", {"id": p_event_id}, p_changes))[0]
+    match = await _apply(backend, previous, old, event)
+    return [{"event": event, "match": match, "previous": previous, "created": False}]
+
+
+async def delete_match_event(backend: Backend, p_event_id: str) -> List[Row]:
+    old = await _first(backend, "match_events", {"id": p_event_id})
+    if old is None:
+        return []
+    previous = await _first(backend, "matches", {"id": old["match_id"]})
+    event = (await backend.delete("match_events", {"id": p_event_id}))[0]
+    match = await _apply(backend, previous, event, None)
+    return [{"event": event, "match": match, "previous": previous, "created": False}]
+
+
+PROCEDURES = {
+    "record_match_event": record_match_event,
+    "record_match_events": record_match_events,
+    "update_match_event": update_match_event,
+    "delete_match_event": delete_match_event,
+}
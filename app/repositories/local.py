@@ -0,0 +1,393 @@
+import json
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.repositories.base import (
+    RELATIONS, Backend, BackendError, Condition, Embed, MissingFunction, Query, filtered_relations,
+    keyset_condition
+)
+from app.repositories.ingest import PROCEDURES
+
+# Column types per table, mirroring schema.sql. The type drives how values are
+# stored in SQLite and decoded back into the shapes PostgREST would return.
+TABLES: Dict[str, Dict[str, str]] = {
+    "tournaments": {
+        "id": "uuid", "name": "text", "year": "int", "status": "text",
+        "start_date": "date", "end_date": "date", "tiebreakers": "jsonb",
+        "created_at": "timestamptz", "updated_at": "timestamptz",
+    },
+    "teams": {
+        "id": "uuid", "tournament_id": "uuid", "name": "text", "logo_url": "text", "group": "text",
+        "created_at": "timestamptz", "updated_at": "timestamptz",
+    },
+    "players": {
+        "id": "uuid", "team_id": "uuid", "name": "text", "position": "text", "shirt_number": "int",
+        "created_at": "timestamptz", "updated_at": "timestamptz",
+    },
+    "matches": {
+        "id": "uuid", "tournament_id": "uuid", "home_team_id": "uuid", "away_team_id": "uuid",
+        "start_time": "timestamptz", "status": "text", "home_score": "int", "away_score": "int",
+        "stage": "text", "created_at": "timestamptz", "updated_at": "timestamptz",
+    },
+    "match_events": {
+        "id": "uuid", "match_id": "uuid", "team_id": "uuid", "player_id": "uuid", "type": "text",
+        "minute": "int", "extra_info": "jsonb", "idempotency_key": "text",
+        "created_at": "timestamptz", "updated_at": "timestamptz",
+    },
+}
+
+# SQLite translation of schema.sql (same columns, checks, defaults and cascades;
+# uuid and timestamp defaults are filled in by LocalBackend.insert, and the
+# set_updated_at trigger by LocalBackend.update).
+SCHEMA = """
+create table if not exists tournaments (
+  id text primary key,
+  name text not null,
+  year integer not null,
+  status text not null check (status in ('upcoming', 'ongoing', 'completed')),
+  start_date text,
+  end_date text,
+  tiebreakers text,
+  created_at text,
+  updated_at text
+);
+
+create table if not exists teams (
+  id text primary key,
+  tournament_id text references tournaments(id) on delete cascade,
+  name text not null,
+  logo_url text,
+  "group" text,
+  created_at text,
+  updated_at text
+);
+
+create table if not exists players (
+  id text primary key,
+  team_id text references teams(id) on delete cascade,
+  name text not null,
+  position text check (position in ('GK', 'DEF', 'MID', 'FWD')),
+  shirt_number integer,
+  created_at text,
+  updated_at text
+);
+
+create table if not exists matches (
+  id text primary key,
+  tournament_id text references tournaments(id) on delete cascade,
+  home_team_id text references teams(id),
+  away_team_id text references teams(id),
+  start_time text not null,
+  status text not null default 'scheduled' check (status in ('scheduled', 'live', 'finished', 'postponed')),
+  home_score integer default 0,
+  away_score integer default 0,
+  stage text,
+  created_at text,
+  updated_at text
+);
+
+create table if not exists match_events (
+  id text primary key,
+  match_id text references matches(id) on delete cascade,
+  team_id text references teams(id),
+  player_id text references players(id),
+  type text not null check (type in ('goal', 'yellow_card', 'red_card', 'substitution_in', 'substitution_out')),
+  minute integer not null,
+  extra_info text,
+  idempotency_key text,
+  created_at text,
+  updated_at text
+);
+
+create index if not exists tournaments_created_at_idx on tournaments (created_at desc);
+create index if not exists teams_tournament_id_name_idx on teams (tournament_id, name);
+create index if not exists teams_name_idx on teams (name);
+create index if not exists players_team_id_shirt_number_idx on players (team_id, shirt_number);
+create index if not exists players_shirt_number_idx on players (shirt_number);
+create index if not exists matches_tournament_id_status_start_time_idx on matches (tournament_id, status, start_time);
+create index if not exists matches_tournament_id_start_time_idx on matches (tournament_id, start_time);
+create index if not exists matches_status_start_time_idx on matches (status, start_time);
+create index if not exists matches_start_time_idx on matches (start_time);
+create index if not exists matches_natural_key_idx on matches (tournament_id, home_team_id, away_team_id, start_time);
+create index if not exists matches_home_team_id_idx on matches (home_team_id);
+create index if not exists matches_away_team_id_idx on matches (away_team_id);
+create index if not exists match_events_match_id_minute_idx on match_events (match_id, minute);
+create index if not exists match_events_team_id_idx on match_events (team_id);
+create index if not exists match_events_player_id_idx on match_events (player_id);
+create unique index if not exists match_events_idempotency_key on match_events (match_id, idempotency_key);
+"""
+
+# SQLite versions of the database functions in migrations/, keyed by name.
+FUNCTIONS: Dict[str, str] = {
+    "tournament_standings": """
+        with results as (
+          select home_team_id as team_id, coalesce(home_score, 0) as gf, coalesce(away_score, 0) as ga
+          from matches
+          where tournament_id = :p_tournament_id and status = 'finished'
+          union all
+          select away_team_id, coalesce(away_score, 0), coalesce(home_score, 0)
+          from matches
+          where tournament_id = :p_tournament_id and status = 'finished'
+        ),
+        totals as (
+          select
+            t.id as team_id,
+            t.name as team_name,
+            count(r.team_id) as played,
+            count(*) filter (where r.gf > r.ga) as won,
+            count(*) filter (where r.gf = r.ga) as drawn,
+            count(*) filter (where r.gf < r.ga) as lost,
+            coalesce(sum(r.gf), 0) as goals_for,
+            coalesce(sum(r.ga), 0) as goals_against
+          from teams t
+          left join results r on r.team_id = t.id
+          where t.tournament_id = :p_tournament_id
+          group by t.id, t.name
+        )
+        select
+          team_id, team_name, played, won, drawn, lost, goals_for, goals_against,
+          goals_for - goals_against as goal_difference,
+          won * 3 + drawn as points
+        from totals
+        order by points desc, goal_difference desc, goals_for desc, team_name
+    """,
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _to_db(kind: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if kind == "jsonb":
+        return json.dumps(value)
+    if kind == "timestamptz":
+        # Normalise to UTC so that text ordering matches time ordering
+        parsed = value if isinstance(value, datetime) else datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.astimezone(timezone.utc).isoformat()
+    if kind == "date":
+        return value.isoformat() if isinstance(value, date) else str(value)
+    if kind == "uuid":
+        return str(value)
+    return value
+
+
+def _from_db(kind: str, value: Any) -> Any:
+    if value is not None and kind == "jsonb":
+        return json.loads(value)
+    return value
+
+
+def _quote(column: str) -> str:
+    return f'"{column}"'
+
+
+def _order_by(order) -> str:
+    if not order:
+        return ""
+    # Postgres puts NULLs last for ascending and first for descending sorts
+    return " order by " + ", ".join(
+        f"{_quote(c)} {'desc nulls first' if desc else 'asc nulls last'}" for c, desc in order
+    )
+
+
+class LocalBackend(Backend):
+    """In-process SQLite store with schema.sql semantics.
+
+    Used for offline tests and benchmarks, and by small deployments that want to
+    serve reads without a network hop. ``path`` may be ``:memory:`` or a file.
+    """
+
+    name = "local"
+
+    def __init__(self, path: str = ":memory:"):
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("pragma foreign_keys = on")
+        self.conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        # Nested uses (the ingestion procedures calling insert/update) join the outer one
+        if self.conn.in_transaction:
+            yield
+            return
+        with self.conn:
+            self.conn.execute("begin")
+            yield
+
+    def _columns(self, table: str) -> Dict[str, str]:
+        if table not in TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        return TABLES[table]
+
+    def _check_columns(self, table: str, columns) -> None:
+        known = self._columns(table)
+        unknown = [c for c in columns if c not in known]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for {table}: {', '.join(unknown)}")
+
+    def _where(self, table: str, filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        joins = filtered_relations(table, filters)
+        self._check_columns(table, [column for column in filters if "." not in column])
+        types = self._columns(table)
+        clauses, params = [], []
+        for name in joins:
+            # Filters on a to-one relation become a subquery on its table
+            relation = RELATIONS[table][name]
+            related = {key.split(".", 1)[1]: value for key, value in filters.items() if key.startswith(name + ".")}
+            where, related_params = self._where(relation.table, related)
+            clauses.append(f"{_quote(relation.column)} in (select id from {relation.table}{where})")
+            params.extend(related_params)
+        for column, value in filters.items():
+            if "." in column:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                values = list(value)
+                if not values:
+                    clauses.append("0")
+                    continue
+                clauses.append(f"{_quote(column)} in ({', '.join('?' for _ in values)})")
+                params.extend(_to_db(types[column], v) for v in values)
+            elif value is None:
+                clauses.append(f"{_quote(column)} is null")
+            else:
+                clauses.append(f"{_quote(column)} = ?")
+                params.append(_to_db(types[column], value))
+        return (" where " + " and ".join(clauses)) if clauses else "", params
+
+    def _condition(self, table: str, node: Condition, params: List[Any]) -> str:
+        kind = node[0]
+        if kind in ("or", "and"):
+            parts = [self._condition(table, child, params) for child in node[1]]
+            return "(" + f" {kind} ".join(parts) + ")" if parts else ("0" if kind == "or" else "1")
+        _, column, op, value = node
+        self._check_columns(table, [column])
+        if op == "is_null":
+            return f"{_quote(column)} is null"
+        if op == "not_null":
+            return f"{_quote(column)} is not null"
+        params.append(_to_db(self._columns(table)[column], value))
+        return f"{_quote(column)} {dict(gt='>', lt='<', eq='=')[op]} ?"
+
+    def _decode(self, table: str, rows) -> List[Dict[str, Any]]:
+        types = self._columns(table)
+        return [{key: _from_db(types[key], row[key]) for key in row.keys()} for row in rows]
+
+    def _execute(self, sql: str, params: List[Any]):
+        return self.conn.execute(sql, params).fetchall()
+
+    async def select(self, table: str, query: Query) -> List[Dict[str, Any]]:
+        columns = query.columns or list(self._columns(table))
+        self._check_columns(table, columns)
+        self._check_columns(table, [c for c, _ in query.order])
+        where, params = self._where(table, query.filters)
+        if query.after is not None:
+            keyset = self._condition(table, keyset_condition(query.order, query.after), params)
+            where = f"{where} and {keyset}" if where else f" where {keyset}"
+        sql = f"select {', '.join(_quote(c) for c in columns)} from {table}{where}"
+        sql += _order_by(query.order)
+        if query.limit is not None:
+            sql += " limit ?"
+            params.append(query.limit)
+        rows = self._decode(table, self._execute(sql, params))
+        if query.embed:
+            self._embed(table, rows, query.embed)
+        return rows
+
+    def _embed(self, table: str, rows: List[Dict[str, Any]], embed: Embed) -> None:
+        # One batched query per relation and level, like PostgREST's embedding joins
+        for name, children in embed.items():
+            relation = RELATIONS[table][name]
+            if relation.many:
+                keys = {row["id"] for row in rows}
+                where, params = self._where(relation.table, {relation.column: keys})
+                sql = f"select * from {relation.table}{where}{_order_by(relation.order)}"
+                targets = self._decode(relation.table, self._execute(sql, params))
+                if children:
+                    self._embed(relation.table, targets, children)
+                grouped: Dict[Any, List[Dict[str, Any]]] = {key: [] for key in keys}
+                for target in targets:
+                    grouped[target[relation.column]].append(target)
+                for row in rows:
+                    row[name] = grouped[row["id"]]
+            else:
+                keys = {row[relation.column] for row in rows if row.get(relation.column) is not None}
+                where, params = self._where(relation.table, {"id": keys})
+                targets = self._decode(relation.table, self._execute(f"select * from {relation.table}{where}", params))
+                if children:
+                    self._embed(relation.table, targets, children)
+                by_id = {target["id"]: target for target in targets}
+                for row in rows:
+                    row[name] = by_id.get(row.get(relation.column))
+
+    async def count(self, table: str, filters: Dict[str, Any]) -> int:
+        where, params = self._where(table, filters)
+        return self.conn.execute(f"select count(*) from {table}{where}", params).fetchone()[0]
+
+    async def insert(
+        self, table: str, rows: List[Dict[str, Any]], on_conflict: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        types = self._columns(table)
+        inserted = []
+        try:
+            with self._transaction():
+                for row in rows:
+                    row = dict(row)
+                    self._check_columns(table, row)
+                    row.setdefault("id", str(uuid.uuid4()))
+                    now = _now()
+                    for column in ("created_at", "updated_at"):
+                        if column in types:
+                            row.setdefault(column, now)
+                    columns = list(row)
+                    sql = (
+                        f"insert into {table} ({', '.join(_quote(c) for c in columns)}) "
+                        f"values ({', '.join('?' for _ in columns)})"
+                    )
+                    if on_conflict:
+                        # Same as PostgREST's merge-duplicates: the existing row keeps its id and created_at
+                        updated = [c for c in columns if c not in ("id", "created_at", *on_conflict)]
+                        assignments = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in updated)
+                        sql += f" on conflict ({', '.join(_quote(c) for c in on_conflict)}) do update set {assignments}"
+                    inserted.extend(self._execute(sql + " returning *", [_to_db(types[c], row[c]) for c in columns]))
+        except sqlite3.IntegrityError as e:
+            raise BackendError(str(e)) from e
+        return self._decode(table, inserted)
+
+    async def update(self, table: str, filters: Dict[str, Any], data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        types = self._columns(table)
+        self._check_columns(table, data)
+        if "updated_at" in types:
+            data = {**data, "updated_at": _now()}
+        where, params = self._where(table, filters)
+        assignments = ", ".join(f"{_quote(c)} = ?" for c in data)
+        sql = f"update {table} set {assignments}{where} returning *"
+        try:
+            rows = self._execute(sql, [_to_db(types[c], v) for c, v in data.items()] + params)
+        except sqlite3.IntegrityError as e:
+            raise BackendError(str(e)) from e
+        return self._decode(table, rows)
+
+    async def delete(self, table: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        where, params = self._where(table, filters)
+        return self._decode(table, self._execute(f"delete from {table}{where} returning *", params))
+
+    async def rpc(self, function: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if function in PROCEDURES:
+            # Nothing in them awaits real I/O, so no other request interleaves either
+            with self._transaction():
+                return await PROCEDURES[function](self, **params)
+        if function not in FUNCTIONS:
+            raise MissingFunction(f"Unknown function: {function}")
+        return [dict(row) for row in self.conn.execute(FUNCTIONS[function], params).fetchall()]
+
+    async def close(self) -> None:
+        self.conn.close()
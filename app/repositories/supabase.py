@@ -0,0 +1,161 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+from postgrest.types import CountMethod
+from supabase import AsyncClient
+
+from app.repositories.base import (
+    RELATIONS, Backend, BackendError, Condition, Embed, MissingFunction, Query, filtered_relations,
+    keyset_condition
+)
+
+# PostgREST's "function not found in the schema cache", and Postgres' undefined_function
+UNDEFINED_FUNCTION = ("PGRST202", "42883")
+
+
+def _apply_filters(builder, filters: Dict[str, Any]):
+    for column, value in filters.items():
+        if isinstance(value, (list, tuple, set)):
+            builder = builder.in_(column, list(value))
+        else:
+            builder = builder.eq(column, value)
+    return builder
+
+
+def _literal(value: Any) -> str:
+    # Double-quoted so that commas, dots, colons and parentheses in values
+    # (timestamps, team names) don't break the PostgREST logic-tree syntax
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _render(node: Condition) -> str:
+    kind = node[0]
+    if kind in ("or", "and"):
+        return f"{kind}({','.join(_render(child) for child in node[1])})"
+    _, column, op, value = node
+    if op == "is_null":
+        return f"{column}.is.null"
+    if op == "not_null":
+        return f"{column}.not.is.null"
+    return f"{column}.{op}.{_literal(value)}"
+
+
+def _embed_select(table: str, embed: Embed, inner: Optional[Dict[str, List[str]]] = None) -> str:
+    """PostgREST resource embedding, e.g. ``home_team:teams!home_team_id(*)``.
+
+    The foreign key column is always given as a hint since matches reference
+    teams twice. Relations in ``inner`` are filtered on, which takes an inner
+    join (``!inner``) for the filter to drop the parent rows."""
+    inner = inner or {}
+    parts = []
+    for name, children in embed.items():
+        relation = RELATIONS[table][name]
+        nested = _embed_select(relation.table, children) if children else ""
+        join = "!inner" if name in inner else ""
+        parts.append(f"{name}:{relation.table}!{relation.column}{join}(*{',' + nested if nested else ''})")
+    for name, columns in inner.items():
+        if name not in embed:
+            relation = RELATIONS[table][name]
+            parts.append(f"{name}:{relation.table}!{relation.column}!inner({','.join(dict.fromkeys(columns))})")
+    return ",".join(parts)
+
+
+def _drop_joins(table: str, query: Query, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Removes the relations that were embedded only to filter on them."""
+    hidden = [name for name in filtered_relations(table, query.filters) if name not in (query.embed or {})]
+    if hidden:
+        for row in rows:
+            for name in hidden:
+                row.pop(name, None)
+    return rows
+
+
+def _embed_order(builder, table: str, embed: Embed, path: str = ""):
+    for name, children in embed.items():
+        relation = RELATIONS[table][name]
+        alias = f"{path}.{name}" if path else name
+        for column, descending in relation.order:
+            builder = builder.order(column, desc=descending, foreign_table=alias)
+        if children:
+            builder = _embed_order(builder, relation.table, children, alias)
+    return builder
+
+
+class SupabaseBackend(Backend):
+    """Talks to PostgREST through the shared async Supabase client."""
+
+    name = "supabase"
+
+    def __init__(self, client: AsyncClient):
+        self.client = client
+
+    def _select(self, table: str, query: Query, count: bool = False):
+        columns = ",".join(query.columns) if query.columns else "*"
+        inner = filtered_relations(table, query.filters)
+        if query.embed or inner:
+            columns += "," + _embed_select(table, query.embed or {}, inner)
+        builder = self.client.table(table).select(columns, count=CountMethod.exact if count else None)
+        builder = _apply_filters(builder, query.filters)
+        if query.after is not None:
+            # The top-level node is always an "or"; or_() takes its bare contents
+            builder = builder.or_(_render(keyset_condition(query.order, query.after))[len("or("):-1])
+        for column, descending in query.order:
+            builder = builder.order(column, desc=descending)
+        if query.embed:
+            builder = _embed_order(builder, table, query.embed)
+        if query.limit is not None:
+            builder = builder.limit(query.limit)
+        return builder
+
+    async def select(self, table: str, query: Query) -> List[Dict[str, Any]]:
+        response = await self._select(table, query).execute()
+        return _drop_joins(table, query, response.data)
+
+    async def count(self, table: str, filters: Dict[str, Any]) -> int:
+        # head=True: PostgREST answers with the Content-Range count and no rows
+        inner = filtered_relations(table, filters)
+        columns = "id," + _embed_select(table, {}, inner) if inner else "id"
+        builder = self.client.table(table).select(columns, count=CountMethod.exact, head=True)
+        response = await _apply_filters(builder, filters).execute()
+        return response.count
+
+    async def select_with_count(self, table: str, query: Query) -> Tuple[List[Dict[str, Any]], int]:
+        # The page and the exact total come back in the same round trip
+        response = await self._select(table, query, count=True).execute()
+        return _drop_joins(table, query, response.data), response.count
+
+    async def insert(
+        self, table: str, rows: List[Dict[str, Any]], on_conflict: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        builder = self.client.table(table)
+        # Columns missing from some rows of a batch take their defaults rather than null
+        if on_conflict:
+            request = builder.upsert(rows, on_conflict=",".join(on_conflict), default_to_null=False)
+        else:
+            request = builder.insert(rows, default_to_null=False)
+        try:
+            response = await request.execute()
+        except APIError as e:
+            raise BackendError(e.message or str(e)) from e
+        return response.data
+
+    async def update(self, table: str, filters: Dict[str, Any], data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        try:
+            response = await _apply_filters(self.client.table(table).update(data), filters).execute()
+        except APIError as e:
+            raise BackendError(e.message or str(e)) from e
+        return response.data
+
+    async def delete(self, table: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        response = await _apply_filters(self.client.table(table).delete(), filters).execute()
+        return response.data
+
+    async def rpc(self, function: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        try:
+            response = await self.client.rpc(function, params).execute()
+        except APIError as e:
+            if e.code in UNDEFINED_FUNCTION:
+                raise MissingFunction(e.message or str(e)) from e
+            raise BackendError(e.message or str(e)) from e
+        return response.data
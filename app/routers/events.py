@@ -1,44 +1,167 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, Body, HTTPException, Depends, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from typing import List, Optional
 from uuid import UUID
-from app.database import supabase
-from app.schemas import MatchEvent, MatchEventCreate, MatchEventUpdate
-from app.dependencies import verify_admin
+from app.schemas import BulkResult, MatchEvent, MatchEventCreate, MatchEventUpdate, QueuedEvent
+from app.fields import fields_query, render, select_columns
+from app.bulk import bulk_create, fetch_by_id, written_rows
+from app.pagination import PageParams, load_page, page_response
+from app.config import settings
+from app.cache import cache_key, event_tags, match_tags, response_cache
+from app.database import open_backend
+from app.event_queue import QueueFull, event_queue
+from app.live import live_hub
+from app.leaderboards import leaderboard_store
+from app.match_center import match_center_store
+from app.standings import standings_store
+from app.tiebreakers import CARD_POINTS
+from app.dependencies import verify_admin, get_event_repository, get_match_repository, get_player_repository
+from app.repositories import MatchEventRepository, MatchRepository, PlayerRepository
+
+@asynccontextmanager
+async def _lifespan(app):
+    if not settings.EVENTS_WRITE_BEHIND:
+        yield
+        return
+    await event_queue.start(MatchEventRepository(await open_backend()), _written)
+    try:
+        yield
+    finally:
+        await event_queue.stop()
 
 router = APIRouter(
     prefix="/events",
-    tags=["events"]
+    tags=["events"],
+    lifespan=_lifespan,
 )
 
+async def _written(kind: str, result: dict) -> None:
+    """Propagates an ingestion result: caches, standings, leaderboards, the
+    match center and live streams."""
+    event, match, previous = result["event"], result["match"], result["previous"]
+    tags = list(event_tags(event))
+    score_changed = match != previous
+    if score_changed:
+        standings_store.match_changed(previous, match)
+        tags += match_tags(match)
+    # Cards rank tournaments using fair play; an update may have been a card before
+    if event["type"] in CARD_POINTS or kind == "event.updated":
+        standings_store.cards_changed(match["tournament_id"])
+        tags.append(f"standings:{match['tournament_id']}")
+    await response_cache.invalidate(*tags)
+    if score_changed:
+        match_center_store.match_changed(match)
+    if kind == "event.deleted":
+        match_center_store.event_changed(event, None)
+    else:
+        # An update replaces the event by id, its previous version isn't needed
+        match_center_store.event_changed(None, event)
+    if kind == "event.created":
+        leaderboard_store.event_changed(match["tournament_id"], None, event)
+    elif kind == "event.deleted":
+        leaderboard_store.event_changed(match["tournament_id"], event, None)
+    else:
+        # The event as it was before isn't returned, so the board is rebuilt
+        leaderboard_store.invalidate(match["tournament_id"])
+    live_hub.publish(event["match_id"], kind, event)
+    if score_changed:
+        live_hub.publish(match["id"], "match.updated", match)
+
 @router.get("/", response_model=List[MatchEvent])
-def get_events(match_id: UUID):
+async def get_events(
+    request: Request,
+    response: Response,
+    match_id: UUID,
+    fields: Optional[List[str]] = Depends(fields_query(MatchEvent)),
+    page: PageParams = Depends(),
+    events: MatchEventRepository = Depends(get_event_repository),
+):
     # Events are usually fetched by match_id
-    response = supabase.table("match_events").select("*").eq("match_id", str(match_id)).order("minute").execute()
-    return response.data
+    data = await response_cache.get_or_load(
+        cache_key(request),
+        [f"events:list:{match_id}"],
+        lambda: load_page(events, page, {"match_id": match_id}, select_columns(fields)),
+    )
+    return render(response, page_response(request, response, data, settings.HTTP_MAX_AGE_LIVE), MatchEvent, fields)
 
-@router.post("/", response_model=MatchEvent, dependencies=[Depends(verify_admin)])
-def create_event(event: MatchEventCreate):
-    data = event.dict(exclude_unset=True)
-    
-    response = supabase.table("match_events").insert(data).execute()
-    if not response.data:
-        raise HTTPException(status_code=400, detail="Could not create event")
-    return response.data[0]
+@router.post("/", response_model=MatchEvent, responses={202: {"model": QueuedEvent}}, dependencies=[Depends(verify_admin)])
+async def create_event(event: MatchEventCreate, events: MatchEventRepository = Depends(get_event_repository)):
+    if settings.EVENTS_WRITE_BEHIND:
+        # Acknowledged once spooled; recorded by the next flush, with the same
+        # checks (an event of an unknown match is dropped then)
+        try:
+            queued = await event_queue.put(event.dict(exclude_unset=True))
+        except QueueFull:
+            raise HTTPException(status_code=503, detail="Event queue is full", headers={"Retry-After": "1"})
+        body = QueuedEvent(match_id=event.match_id, idempotency_key=queued["idempotency_key"], queue_depth=event_queue.depth)
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(body))
+
+    # Goals update the match score (and a scheduled match goes live) in the same call
+    result = await events.record(event.dict(exclude_unset=True), rpc=settings.EVENTS_RPC)
+    if not result:
+        raise HTTPException(status_code=404, detail="Match not found")
+    # A retry with a known idempotency key gets the original event back, nothing is written
+    if result["created"]:
+        await _written("event.created", result)
+    return result["event"]
+
+@router.post("/bulk", response_model=BulkResult[MatchEvent], dependencies=[Depends(verify_admin)])
+async def create_events_bulk(
+    items: List[MatchEventCreate] = Body(..., max_length=settings.BULK_MAX_ITEMS),
+    events: MatchEventRepository = Depends(get_event_repository),
+    matches: MatchRepository = Depends(get_match_repository),
+    players: PlayerRepository = Depends(get_player_repository),
+):
+    # Events have no natural key, so there is no upsert. Imports are stored as
+    # they are: match scores are not derived from the goals in them
+    data = [item.dict(exclude_unset=True) for item in items]
+    known_matches = await fetch_by_id(matches, (event["match_id"] for event in data), "tournament_id", "home_team_id", "away_team_id")
+    known_players = await fetch_by_id(players, (event.get("player_id") for event in data), "team_id")
+    errors = {}
+    for i, event in enumerate(data):
+        match = known_matches.get(str(event["match_id"]))
+        team_id = str(event["team_id"])
+        if match is None:
+            errors[i] = "Match not found"
+        elif team_id not in (match["home_team_id"], match["away_team_id"]):
+            errors[i] = "Team is not playing in this match"
+        elif event.get("player_id") is not None and known_players.get(str(event["player_id"]), {}).get("team_id") != team_id:
+            errors[i] = "Player not found in this team"
+
+    result = await bulk_create(events, data, errors)
+    written = written_rows(result)
+    tags = {tag for event in written for tag in event_tags(event)}
+    for event in written:
+        if event["type"] in CARD_POINTS:
+            tournament_id = known_matches[str(event["match_id"])]["tournament_id"]
+            standings_store.cards_changed(tournament_id)
+            tags.add(f"standings:{tournament_id}")
+    await response_cache.invalidate(*tags)
+    for event in written:
+        leaderboard_store.event_changed(known_matches[str(event["match_id"])]["tournament_id"], None, event)
+        match_center_store.event_changed(None, event)
+        live_hub.publish(event["match_id"], "event.created", event)
+    return result
 
 @router.patch("/{event_id}", response_model=MatchEvent, dependencies=[Depends(verify_admin)])
-def update_event(event_id: UUID, event: MatchEventUpdate):
+async def update_event(event_id: UUID, event: MatchEventUpdate, events: MatchEventRepository = Depends(get_event_repository)):
     data = event.dict(exclude_unset=True)
     if not data:
         raise HTTPException(status_code=400, detail="No fields to update")
 
-    response = supabase.table("match_events").update(data).eq("id", str(event_id)).execute()
-    if not response.data:
+    # The old event's goal is taken off the score and the new one's added
+    result = await events.change(event_id, data, rpc=settings.EVENTS_RPC)
+    if not result:
         raise HTTPException(status_code=404, detail="Event not found or update failed")
-    return response.data[0]
+    await _written("event.updated", result)
+    return result["event"]
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(verify_admin)])
-def delete_event(event_id: UUID):
-    response = supabase.table("match_events").delete().eq("id", str(event_id)).execute()
-    if not response.data:
+async def delete_event(event_id: UUID, events: MatchEventRepository = Depends(get_event_repository)):
+    result = await events.remove(event_id, rpc=settings.EVENTS_RPC)
+    if not result:
          raise HTTPException(status_code=404, detail="Event not found")
+    await _written("event.deleted", result)
     return None
@@ -0,0 +1,97 @@
+import asyncio
+from fastapi import APIRouter, Depends, Header, Query, WebSocket, WebSocketDisconnect, WebSocketException, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.websockets import WebSocketState
+from typing import Optional
+from uuid import UUID
+from app.config import settings
+from app.dependencies import get_match_repository
+from app.live import HEARTBEAT, LiveMessage, live_hub
+from app.repositories import MatchRepository
+
+router = APIRouter(
+    prefix="/matches",
+    tags=["live"]
+)
+
+# Streams push "event.created", "event.updated", "event.deleted", "match.updated"
+# and "match.deleted" messages carrying the written row, plus "reset" when the
+# client missed messages and should refetch the match and its events. Subscribe
+# first and fetch the current state second, so no write falls in between.
+
+def _sse(message: LiveMessage) -> str:
+    if message is HEARTBEAT:
+        return ": heartbeat\n\n"
+    if message.seq < 0:
+        return f"event: {message.type}\ndata: {message.data}\n\n"
+    return f"id: {live_hub.message_id(message)}\nevent: {message.type}\ndata: {message.data}\n\n"
+
+def _ws(message: LiveMessage) -> str:
+    # The data is already JSON, so it is spliced in rather than re-encoded
+    message_id = f'"{live_hub.message_id(message)}"' if message.seq >= 0 else "null"
+    return f'{{"id":{message_id},"type":"{message.type}","data":{message.data}}}'
+
+@router.get("/{match_id}/stream")
+async def stream_match(
+    match_id: UUID,
+    last_event_id: Optional[str] = Header(None),
+    matches: MatchRepository = Depends(get_match_repository),
+):
+    """Server-Sent Events stream of a match's writes. Browsers resume with the
+    Last-Event-ID header on their own after a dropped connection."""
+    if not await matches.exists(match_id):
+        raise HTTPException(status_code=404, detail="Match not found")
+
+    async def events():
+        subscription, backlog = live_hub.subscribe(match_id, last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+            for message in backlog:
+                yield _sse(message)
+            async for message in subscription.messages(heartbeat=settings.LIVE_HEARTBEAT):
+                yield _sse(message)
+        finally:
+            live_hub.unsubscribe(match_id, subscription)
+
+    # No proxy buffering or caching of the stream
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+@router.websocket("/{match_id}/ws")
+async def match_socket(
+    websocket: WebSocket,
+    match_id: UUID,
+    last_event_id: Optional[str] = Query(None),
+    matches: MatchRepository = Depends(get_match_repository),
+):
+    """WebSocket variant of the stream; resume with ``?last_event_id=``."""
+    if not await matches.exists(match_id):
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Match not found")
+    await websocket.accept()
+
+    subscription, backlog = live_hub.subscribe(match_id, last_event_id)
+
+    async def watch_disconnect():
+        # The stream is one-way; reading only tells us when the client goes away
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            subscription.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        for message in backlog:
+            await websocket.send_text(_ws(message))
+        async for message in subscription.messages(heartbeat=settings.LIVE_HEARTBEAT):
+            await websocket.send_text(_ws(message))
+        # Ended by a match deletion rather than by the client leaving
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        live_hub.unsubscribe(match_id, subscription)
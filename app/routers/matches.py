@@ -1,64 +1,195 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from fastapi import APIRouter, Body, HTTPException, Depends, Query, Request, Response, status
+from typing import List, Optional
 from uuid import UUID
-from app.database import supabase
-from app.schemas import Match, MatchCreate, MatchUpdate
-from app.dependencies import verify_admin
+from app.schemas import BulkResult, Match, MatchCenter, MatchCreate, MatchUpdate, MatchWithRelations
+from app.coalesce import SingleFlight
+from app.conditional import revalidate, versioned
+from app.fields import fields_query, include_query, render, select_columns
+from app.bulk import bulk_create, fetch_by_id
+from app.pagination import PageParams, load_page, page_response
+from app.config import settings
+from app.cache import cache_key, embedded_tags, match_tags, response_cache
+from app.dependencies import verify_admin, get_match_repository, get_team_repository, get_tournament_repository
+from app.repositories import MatchRepository, TeamRepository, TournamentRepository
+from app.live import live_hub
+from app.leaderboards import leaderboard_store
+from app.match_center import EMBED, match_center_store
+from app.standings import is_finished, standings_store
 
 router = APIRouter(
     prefix="/matches",
     tags=["matches"]
 )
 
-@router.get("/", response_model=List[Match])
-def get_matches(tournament_id: UUID = None, status: str = None):
-    query = supabase.table("matches").select("*")
-    if tournament_id:
-        query = query.eq("tournament_id", str(tournament_id))
-    if status:
-        query = query.eq("status", status)
-    
-    # Order by start_time
-    response = query.order("start_time").execute()
-    return response.data
+_center_builds = SingleFlight()
 
-@router.get("/{match_id}", response_model=Match)
-def get_match(match_id: UUID):
-    response = supabase.table("matches").select("*").eq("id", str(match_id)).execute()
-    if not response.data:
+INCLUDE = ("tournament", "home_team", "away_team", "events", "events.player", "events.team")
+# Match fields that the standings are computed from
+STANDINGS_FIELDS = {"tournament_id", "home_team_id", "away_team_id", "status", "home_score", "away_score"}
+
+@router.get("/", response_model=List[MatchWithRelations], response_model_exclude_unset=True)
+async def get_matches(
+    request: Request,
+    response: Response,
+    tournament_id: UUID = None,
+    status: str = None,
+    fields: Optional[List[str]] = Depends(fields_query(Match)),
+    include: Optional[dict] = Depends(include_query(INCLUDE)),
+    page: PageParams = Depends(),
+    matches: MatchRepository = Depends(get_match_repository),
+):
+    # Ordered by start_time
+    data = await response_cache.get_or_load(
+        cache_key(request),
+        lambda d: [f"matches:list:{tournament_id or '*'}", *embedded_tags("matches", d["items"], include)],
+        lambda: load_page(matches, page, {"tournament_id": tournament_id, "status": status}, select_columns(fields), include),
+    )
+    return render(
+        response,
+        page_response(request, response, data, settings.HTTP_MAX_AGE_LIVE),
+        MatchWithRelations,
+        fields,
+        include,
+        exclude_unset=True,
+    )
+
+@router.get("/{match_id}", response_model=MatchWithRelations, response_model_exclude_unset=True)
+async def get_match(
+    request: Request,
+    response: Response,
+    match_id: UUID,
+    fields: Optional[List[str]] = Depends(fields_query(Match)),
+    include: Optional[dict] = Depends(include_query(INCLUDE)),
+    matches: MatchRepository = Depends(get_match_repository),
+):
+    match = await response_cache.get_or_load(
+        cache_key(request),
+        lambda m: [f"match:{match_id}", f"matches:of:{m['tournament_id']}", *embedded_tags("matches", m, include)],
+        lambda: matches.get(match_id, select_columns(fields, "tournament_id"), include),
+    )
+    if not match:
         raise HTTPException(status_code=404, detail="Match not found")
-    return response.data[0]
+    return render(
+        response,
+        revalidate(request, response, match, settings.HTTP_MAX_AGE_LIVE),
+        MatchWithRelations,
+        fields,
+        include,
+        exclude_unset=True,
+    )
+
+@router.get("/{match_id}/center", response_model=MatchCenter)
+async def get_match_center(request: Request, match_id: UUID, matches: MatchRepository = Depends(get_match_repository)):
+    """The match with both teams, score, status and its timeline, from the
+    document that match and event writes keep up to date. ``seq`` grows with
+    every change."""
+    center = match_center_store.get(match_id)
+    if center is None:
+        seq = match_center_store.seq(match_id)
+
+        async def build():
+            match = await matches.get(match_id, embed=EMBED)
+            if not match:
+                raise HTTPException(status_code=404, detail="Match not found")
+            return match_center_store.store(match, seq)
+
+        # Concurrent reads of a document being built wait for that one build
+        center = await _center_builds.do((str(match_id), seq), build)
+    headers, not_modified = versioned(request, match_center_store.etag(center), settings.HTTP_MAX_AGE_LIVE)
+    if not_modified is not None:
+        return not_modified
+    return Response(center.body(), media_type="application/json", headers=headers)
 
 @router.post("/", response_model=Match, dependencies=[Depends(verify_admin)])
-def create_match(match: MatchCreate):
-    data = match.dict(exclude_unset=True)
-    # Convert datetime to string
-    if data.get('start_time'): data['start_time'] = data['start_time'].isoformat()
-    
+async def create_match(match: MatchCreate, matches: MatchRepository = Depends(get_match_repository)):
     # Validate FKs (optional but good practice, though DB will enforce it too)
     # For speed, we let DB enforce it and catch error if needed, or just trust client + DB error.
-    
-    response = supabase.table("matches").insert(data).execute()
-    if not response.data:
+    created = await matches.create(match.dict(exclude_unset=True))
+    if not created:
         raise HTTPException(status_code=400, detail="Could not create match")
-    return response.data[0]
+    standings_store.match_changed(None, created)
+    await response_cache.invalidate(*match_tags(created))
+    return created
+
+@router.post("/bulk", response_model=BulkResult[Match], dependencies=[Depends(verify_admin)])
+async def create_matches_bulk(
+    items: List[MatchCreate] = Body(..., max_length=settings.BULK_MAX_ITEMS),
+    upsert: bool = Query(
+        False, description="Update matches with the same (tournament_id, home_team_id, away_team_id, start_time) instead of adding another"
+    ),
+    matches: MatchRepository = Depends(get_match_repository),
+    teams: TeamRepository = Depends(get_team_repository),
+    tournaments: TournamentRepository = Depends(get_tournament_repository),
+):
+    data = [item.dict(exclude_unset=True) for item in items]
+    known_tournaments = await fetch_by_id(tournaments, (match["tournament_id"] for match in data))
+    known_teams = await fetch_by_id(
+        teams, (team_id for match in data for team_id in (match["home_team_id"], match["away_team_id"])), "tournament_id"
+    )
+    errors = {}
+    for i, match in enumerate(data):
+        tournament_id = str(match["tournament_id"])
+        if tournament_id not in known_tournaments:
+            errors[i] = "Tournament not found"
+        elif any(
+            known_teams.get(str(match[side]), {}).get("tournament_id") != tournament_id
+            for side in ("home_team_id", "away_team_id")
+        ):
+            errors[i] = "Team not found in this tournament"
+
+    result = await bulk_create(matches, data, errors, upsert)
+    tags = set()
+    for item in result["results"]:
+        if item["status"] == "created":
+            standings_store.match_changed(None, item["data"])
+        elif item["status"] == "updated":
+            # The previous score isn't known, so the table is rebuilt
+            standings_store.invalidate(item["data"]["tournament_id"])
+            match_center_store.match_changed(item["data"])
+            live_hub.publish(item["data"]["id"], "match.updated", item["data"])
+        if item["status"] != "error":
+            tags.update(match_tags(item["data"]))
+    await response_cache.invalidate(*tags)
+    return result
 
 @router.patch("/{match_id}", response_model=Match, dependencies=[Depends(verify_admin)])
-def update_match(match_id: UUID, match: MatchUpdate):
+async def update_match(match_id: UUID, match: MatchUpdate, matches: MatchRepository = Depends(get_match_repository)):
     data = match.dict(exclude_unset=True)
     if not data:
         raise HTTPException(status_code=400, detail="No fields to update")
-    
-    if data.get('start_time'): data['start_time'] = data['start_time'].isoformat()
 
-    response = supabase.table("matches").update(data).eq("id", str(match_id)).execute()
-    if not response.data:
+    # The previous state tells which tournament and cache entries the match left
+    previous = await matches.get(match_id)
+    if not previous:
+        raise HTTPException(status_code=404, detail="Match not found")
+
+    updated = await matches.update(match_id, data)
+    if not updated:
         raise HTTPException(status_code=404, detail="Match not found or update failed")
-    return response.data[0]
+    if STANDINGS_FIELDS.intersection(data) and (is_finished(previous) or is_finished(updated)):
+        # The read and the update are two calls, so a concurrent update may have
+        # changed the match in between: rebuilding is safe where a delta isn't
+        standings_store.invalidate(previous["tournament_id"])
+        standings_store.invalidate(updated["tournament_id"])
+    match_center_store.match_changed(updated)
+    if previous["tournament_id"] != updated["tournament_id"]:
+        # Its events now count for the other tournament
+        leaderboard_store.invalidate(previous["tournament_id"])
+        leaderboard_store.invalidate(updated["tournament_id"])
+    await response_cache.invalidate(*match_tags(previous), *match_tags(updated))
+    live_hub.publish(match_id, "match.updated", updated)
+    return updated
 
 @router.delete("/{match_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(verify_admin)])
-def delete_match(match_id: UUID):
-    response = supabase.table("matches").delete().eq("id", str(match_id)).execute()
-    if not response.data:
+async def delete_match(match_id: UUID, matches: MatchRepository = Depends(get_match_repository)):
+    deleted = await matches.delete(match_id)
+    if not deleted:
          raise HTTPException(status_code=404, detail="Match not found")
+    standings_store.match_changed(deleted, None)
+    # Its events are deleted with it
+    leaderboard_store.invalidate(deleted["tournament_id"])
+    match_center_store.remove(match_id)
+    await response_cache.invalidate(*match_tags(deleted), f"events:list:{match_id}")
+    live_hub.publish(match_id, "match.deleted", deleted)
+    live_hub.close(match_id)
     return None
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from fastapi import APIRouter, Body, HTTPException, Depends, Query, Request, Response, status
+from typing import List, Optional
 from uuid import UUID
-from app.database import supabase
-from app.schemas import Player, PlayerCreate, PlayerUpdate
-from app.dependencies import verify_admin
+from app.schemas import BulkResult, Player, PlayerCreate, PlayerUpdate
+from app.conditional import revalidate
+from app.fields import fields_query, render, select_columns
+from app.bulk import bulk_create, fetch_by_id, written_rows
+from app.pagination import PageParams, load_page, page_response
+from app.config import settings
+from app.cache import cache_key, player_tags, response_cache
+from app.dependencies import verify_admin, get_player_repository, get_team_repository
+from app.leaderboards import leaderboard_store
+from app.match_center import match_center_store
+from app.repositories import PlayerRepository, TeamRepository
 
 router = APIRouter(
     prefix="/players",
@@ -11,47 +19,97 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=List[Player])
-def get_players(team_id: UUID = None):
-    query = supabase.table("players").select("*")
-    if team_id:
-        query = query.eq("team_id", str(team_id))
-    response = query.order("shirt_number").execute()
-    return response.data
+async def get_players(
+    request: Request,
+    response: Response,
+    team_id: UUID = None,
+    fields: Optional[List[str]] = Depends(fields_query(Player)),
+    page: PageParams = Depends(),
+    players: PlayerRepository = Depends(get_player_repository),
+):
+    data = await response_cache.get_or_load(
+        cache_key(request),
+        [f"players:list:{team_id or '*'}"],
+        lambda: load_page(players, page, {"team_id": team_id}, select_columns(fields)),
+    )
+    return render(response, page_response(request, response, data, settings.HTTP_MAX_AGE_STATIC), Player, fields)
 
 @router.get("/{player_id}", response_model=Player)
-def get_player(player_id: UUID):
-    response = supabase.table("players").select("*").eq("id", str(player_id)).execute()
-    if not response.data:
+async def get_player(
+    request: Request,
+    response: Response,
+    player_id: UUID,
+    fields: Optional[List[str]] = Depends(fields_query(Player)),
+    players: PlayerRepository = Depends(get_player_repository),
+):
+    player = await response_cache.get_or_load(
+        cache_key(request),
+        lambda p: [f"player:{player_id}", f"players:of:{p['team_id']}"],
+        lambda: players.get(player_id, select_columns(fields, "team_id")),
+    )
+    if not player:
         raise HTTPException(status_code=404, detail="Player not found")
-    return response.data[0]
+    return render(response, revalidate(request, response, player, settings.HTTP_MAX_AGE_STATIC), Player, fields)
 
 @router.post("/", response_model=Player, dependencies=[Depends(verify_admin)])
-def create_player(player: PlayerCreate):
-    data = player.dict(exclude_unset=True)
+async def create_player(
+    player: PlayerCreate,
+    players: PlayerRepository = Depends(get_player_repository),
+    teams: TeamRepository = Depends(get_team_repository),
+):
     # Ensure team exists
-    team_check = supabase.table("teams").select("id").eq("id", str(player.team_id)).execute()
-    if not team_check.data:
+    if not await teams.exists(player.team_id):
         raise HTTPException(status_code=404, detail="Team not found")
 
-    response = supabase.table("players").insert(data).execute()
-    if not response.data:
+    created = await players.create(player.dict(exclude_unset=True))
+    if not created:
         raise HTTPException(status_code=400, detail="Could not create player")
-    return response.data[0]
+    await response_cache.invalidate(*player_tags(created))
+    # Centers of the team's matches resolve event players from the squad they were built with
+    match_center_store.player_changed(created)
+    return created
+
+@router.post("/bulk", response_model=BulkResult[Player], dependencies=[Depends(verify_admin)])
+async def create_players_bulk(
+    items: List[PlayerCreate] = Body(..., max_length=settings.BULK_MAX_ITEMS),
+    upsert: bool = Query(False, description="Update players with the same (team_id, shirt_number) instead of adding another"),
+    players: PlayerRepository = Depends(get_player_repository),
+    teams: TeamRepository = Depends(get_team_repository),
+):
+    data = [item.dict(exclude_unset=True) for item in items]
+    known = await fetch_by_id(teams, (player["team_id"] for player in data))
+    errors = {i: "Team not found" for i, player in enumerate(data) if str(player["team_id"]) not in known}
+
+    result = await bulk_create(players, data, errors, upsert)
+    await response_cache.invalidate(*{tag for player in written_rows(result) for tag in player_tags(player)})
+    for item in result["results"]:
+        if item["status"] == "updated":
+            leaderboard_store.player_changed(item["data"]["id"])
+        if item["status"] != "error":
+            match_center_store.player_changed(item["data"])
+    return result
 
 @router.patch("/{player_id}", response_model=Player, dependencies=[Depends(verify_admin)])
-def update_player(player_id: UUID, player: PlayerUpdate):
+async def update_player(player_id: UUID, player: PlayerUpdate, players: PlayerRepository = Depends(get_player_repository)):
     data = player.dict(exclude_unset=True)
     if not data:
         raise HTTPException(status_code=400, detail="No fields to update")
 
-    response = supabase.table("players").update(data).eq("id", str(player_id)).execute()
-    if not response.data:
+    updated = await players.update(player_id, data)
+    if not updated:
         raise HTTPException(status_code=404, detail="Player not found or update failed")
-    return response.data[0]
+    # Evicts this player and the rosters listing them, nothing else
+    await response_cache.invalidate(*player_tags(updated))
+    leaderboard_store.player_changed(player_id)
+    match_center_store.player_changed(updated)
+    return updated
 
 @router.delete("/{player_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(verify_admin)])
-def delete_player(player_id: UUID):
-    response = supabase.table("players").delete().eq("id", str(player_id)).execute()
-    if not response.data:
+async def delete_player(player_id: UUID, players: PlayerRepository = Depends(get_player_repository)):
+    deleted = await players.delete(player_id)
+    if not deleted:
          raise HTTPException(status_code=404, detail="Player not found")
+    await response_cache.invalidate(*player_tags(deleted))
+    leaderboard_store.player_changed(player_id)
+    match_center_store.player_changed(deleted)
     return None
@@ -1,86 +1,216 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
-from app.database import supabase
-from app.schemas import Standing
+from app.schemas import Standing, StandingsCheck, StandingsHistory, TournamentStandings
+from app.cache import cache_key, response_cache
+from app.coalesce import SingleFlight
+from app.conditional import revalidate
+from app.fields import fields_query, render
+from app.config import settings
+from app.dependencies import (
+    verify_admin, get_event_repository, get_match_repository, get_standings_repository, get_tournament_repository
+)
+from app.repositories import MatchEventRepository, MatchRepository, StandingsRepository, TournamentRepository
+from app.standings import StandingsTable, compute_standings, compute_tables, sort_standings, standings_history, standings_store
+from app.tiebreakers import CARD_POINTS, Cards, Tiebreaker, count_cards, rules_of, uses_default
 
 router = APIRouter(
     prefix="/standings",
     tags=["standings"]
 )
 
-@router.get("/{tournament_id}", response_model=List[Standing])
-def get_standings(tournament_id: UUID):
-    # 1. Fetch all teams in the tournament
-    teams_response = supabase.table("teams").select("id, name").eq("tournament_id", str(tournament_id)).execute()
-    if not teams_response.data:
-        return []
-    
-    teams = {t['id']: t for t in teams_response.data}
-    
-    # Initialize standings
-    standings: Dict[str, Dict] = {}
-    for team_id, team in teams.items():
-        standings[team_id] = {
-            "team_id": team_id,
-            "team_name": team['name'],
-            "played": 0,
-            "won": 0,
-            "drawn": 0,
-            "lost": 0,
-            "goals_for": 0,
-            "goals_against": 0,
-            "goal_difference": 0,
-            "points": 0
-        }
-
-    # 2. Fetch all finished matches
-    matches_response = supabase.table("matches").select("*").eq("tournament_id", str(tournament_id)).eq("status", "finished").execute()
-    matches = matches_response.data
-
-    # 3. Calculate stats
-    for match in matches:
-        home_id = match['home_team_id']
-        away_id = match['away_team_id']
-        home_score = match['home_score']
-        away_score = match['away_score']
-
-        if home_id in standings:
-            standings[home_id]["played"] += 1
-            standings[home_id]["goals_for"] += home_score
-            standings[home_id]["goals_against"] += away_score
-            standings[home_id]["goal_difference"] += (home_score - away_score)
-            
-            if home_score > away_score:
-                standings[home_id]["won"] += 1
-                standings[home_id]["points"] += 3
-            elif home_score == away_score:
-                standings[home_id]["drawn"] += 1
-                standings[home_id]["points"] += 1
-            else:
-                standings[home_id]["lost"] += 1
-
-        if away_id in standings:
-            standings[away_id]["played"] += 1
-            standings[away_id]["goals_for"] += away_score
-            standings[away_id]["goals_against"] += home_score
-            standings[away_id]["goal_difference"] += (away_score - home_score)
-
-            if away_score > home_score:
-                standings[away_id]["won"] += 1
-                standings[away_id]["points"] += 3
-            elif away_score == home_score:
-                standings[away_id]["drawn"] += 1
-                standings[away_id]["points"] += 1
-            else:
-                standings[away_id]["lost"] += 1
-
-    # 4. Sort standings
-    # Sort by Points (desc), Goal Difference (desc), Goals For (desc)
-    sorted_standings = sorted(
-        standings.values(),
-        key=lambda x: (x["points"], x["goal_difference"], x["goals_for"]),
-        reverse=True
+# Concurrent reads of a table being rebuilt wait for that one rebuild
+_rebuilds = SingleFlight()
+
+MATCH_COLUMNS = ["id", "tournament_id", "home_team_id", "away_team_id", "home_score", "away_score"]
+
+async def _cards(events: MatchEventRepository, tournament_ids: List[str], matches: List[Dict[str, Any]]) -> Cards:
+    """Fair play points of the given finished matches of ``tournament_ids``."""
+    rows = []
+    if matches:
+        # Filtered through the match rather than on a list of match ids, and
+        # paged, so that neither the URL nor the rows grow past a limit
+        rows = await events.list_all(
+            {"match.tournament_id": tournament_ids, "match.status": "finished", "type": list(CARD_POINTS)},
+            columns=["match_id", "team_id", "type"],
+        )
+    return count_cards(matches, rows)
+
+async def _compute(
+    tournament_id: UUID,
+    tournaments: TournamentRepository,
+    match_repository: MatchRepository,
+    event_repository: MatchEventRepository,
+    standings_repository: StandingsRepository,
+) -> Tuple[StandingsTable, Optional[Tiebreaker]]:
+    if settings.STANDINGS_RPC:
+        tournament = await tournaments.get(tournament_id, ["tiebreakers"])
+        if uses_default(rules_of(tournament)):
+            # Aggregated in the database: one row per team comes back
+            rows = await standings_repository.for_tournament(tournament_id)
+            if rows is not None:
+                return {str(row["team_id"]): row for row in rows}, None
+
+    # 1. Fetch the tournament's tiebreakers and teams
+    tournament = await tournaments.get(tournament_id, ["tiebreakers"], {"teams": {}})
+    if not tournament or not tournament["teams"]:
+        return {}, None
+
+    # 2. Fetch all finished matches and 3. calculate stats
+    matches = await match_repository.list_finished(tournament_id, columns=MATCH_COLUMNS)
+    table = compute_standings(tournament["teams"], matches)
+    rules = rules_of(tournament)
+    if uses_default(rules):
+        return table, None
+    cards = await _cards(event_repository, [str(tournament_id)], matches) if "fair_play" in rules else None
+    return table, Tiebreaker(rules, tournament["teams"], matches, cards)
+
+def _standings_tags(tournament_id) -> List[str]:
+    # Match and team writes evict through their list tags, card events through
+    # the standings tag (fair play)
+    return [f"tournament:{tournament_id}", f"standings:{tournament_id}",
+            f"matches:list:{tournament_id}", f"teams:list:{tournament_id}"]
+
+@router.get("/", response_model=List[TournamentStandings], response_model_exclude_unset=True)
+async def get_standings_batch(
+    request: Request,
+    response: Response,
+    tournament_id: List[UUID] = Query(..., max_length=settings.STANDINGS_BATCH_MAX),
+    groups: bool = Query(False, description="Also return a table per group"),
+    tournaments: TournamentRepository = Depends(get_tournament_repository),
+    match_repository: MatchRepository = Depends(get_match_repository),
+    event_repository: MatchEventRepository = Depends(get_event_repository),
+):
+    """Tables of several tournaments, in the order asked for; with ``groups``
+    each also gets one table per group of teams. Tables are ranked by each
+    tournament's tiebreakers."""
+    tournament_ids = list(dict.fromkeys(str(t) for t in tournament_id))
+
+    async def load():
+        # Materialized tables are reused; group tables always need the teams' groups
+        tables = {} if groups else {t: rows for t in tournament_ids if (rows := standings_store.get(t)) is not None}
+        missing = [t for t in tournament_ids if t not in tables]
+        computed, group_tables = {}, {}
+        if missing:
+            # Two queries however many tournaments are missing, not two each
+            # (three when one ranks by fair play). The matches are paged, as
+            # together they can outnumber PostgREST's max-rows
+            generations = {t: standings_store.generation(t) for t in missing}
+            rows = await tournaments.list({"id": missing}, order=[], columns=["id", "tiebreakers"], embed={"teams": {}})
+            teams = [team for row in rows for team in row["teams"]]
+            matches = []
+            if teams:
+                matches = await match_repository.list_all(
+                    {"tournament_id": missing, "status": "finished"}, columns=MATCH_COLUMNS
+                )
+            computed = compute_tables(teams, matches, groups)
+
+            found = {str(row["id"]): row for row in rows}
+            rules = {t: rules_of(found.get(t)) for t in missing}
+            matches_of: Dict[str, List[Dict[str, Any]]] = {}
+            for match in matches:
+                matches_of.setdefault(str(match["tournament_id"]), []).append(match)
+            fair_play = [t for t, r in rules.items() if "fair_play" in r]
+            fair_play_matches = [m for t in fair_play for m in matches_of.get(t, ())]
+            cards = await _cards(event_repository, fair_play, fair_play_matches) if fair_play_matches else None
+
+            for t in missing:
+                tiebreaker = None
+                if not uses_default(rules[t]):
+                    tiebreaker = Tiebreaker(rules[t], found[t]["teams"], matches_of.get(t, ()), cards)
+                tables[t] = standings_store.store(t, computed.get(t, {}).get("table", {}), generations[t], tiebreaker)
+                for name, table in computed.get(t, {}).get("groups", {}).items():
+                    if tiebreaker is None:
+                        group_tables[t, name] = sort_standings(table)
+                        continue
+                    # Ranked on the group's own matches, like its table
+                    group_teams = [team for team in found[t]["teams"] if team.get("group") == name]
+                    group_matches = [m for m in matches_of.get(t, ()) if {str(m["home_team_id"]), str(m["away_team_id"])} <= table.keys()]
+                    group_tables[t, name] = Tiebreaker(rules[t], group_teams, group_matches, cards).rank(table)
+
+        data = []
+        for t in tournament_ids:
+            item = {"tournament_id": t, "standings": tables[t]}
+            if groups:
+                names = sorted(name for tournament, name in group_tables if tournament == t)
+                item["groups"] = [{"group": name, "standings": group_tables[t, name]} for name in names]
+            data.append(item)
+        return data
+
+    data = await response_cache.get_or_load(
+        cache_key(request), [tag for t in tournament_ids for tag in _standings_tags(t)], load
     )
+    return render(
+        response,
+        revalidate(request, response, data, settings.HTTP_MAX_AGE_LIVE),
+        TournamentStandings,
+        None,
+        exclude_unset=True,
+    )
+
+@router.get("/{tournament_id}", response_model=List[Standing])
+async def get_standings(
+    request: Request,
+    response: Response,
+    tournament_id: UUID,
+    fields: Optional[List[str]] = Depends(fields_query(Standing)),
+    tournaments: TournamentRepository = Depends(get_tournament_repository),
+    match_repository: MatchRepository = Depends(get_match_repository),
+    event_repository: MatchEventRepository = Depends(get_event_repository),
+    standings_repository: StandingsRepository = Depends(get_standings_repository),
+):
+    # Served from the materialized table, which match writes keep up to date
+    rows = standings_store.get(tournament_id)
+    if rows is None:
+        # Full rebuild on first read or once the table has aged out
+        generation = standings_store.generation(tournament_id)
+
+        async def rebuild():
+            table, tiebreaker = await _compute(
+                tournament_id, tournaments, match_repository, event_repository, standings_repository
+            )
+            return standings_store.store(tournament_id, table, generation, tiebreaker)
+
+        rows = await _rebuilds.do((tournament_id, generation), rebuild)
+    # Standings are computed, so the fieldset only trims the response
+    return render(response, revalidate(request, response, rows, settings.HTTP_MAX_AGE_LIVE), Standing, fields)
+
+@router.get("/{tournament_id}/history", response_model=StandingsHistory)
+async def get_standings_history(
+    request: Request,
+    response: Response,
+    tournament_id: UUID,
+    tournaments: TournamentRepository = Depends(get_tournament_repository),
+    event_repository: MatchEventRepository = Depends(get_event_repository),
+):
+    """The table after each matchday, for position-over-time charts."""
+    async def load():
+        # Teams and matches come embedded in the tournament, in one backend call
+        tournament = await tournaments.get(tournament_id, ["id", "tiebreakers"], {"teams": {}, "matches": {}})
+        if tournament is None:
+            return None
+        teams, matches = tournament["teams"], tournament["matches"]
+        tiebreaker = None
+        rules = rules_of(tournament)
+        if not uses_default(rules):
+            finished = [m for m in matches if m["status"] == "finished"]
+            cards = await _cards(event_repository, [str(tournament_id)], finished) if "fair_play" in rules else None
+            tiebreaker = Tiebreaker(rules, teams, (), cards)
+        return {"tournament_id": str(tournament_id), "rounds": standings_history(teams, matches, tiebreaker)}
+
+    history = await response_cache.get_or_load(cache_key(request), _standings_tags(tournament_id), load)
+    if history is None:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    return render(response, revalidate(request, response, history, settings.HTTP_MAX_AGE_LIVE), StandingsHistory, None)
 
-    return sorted_standings
+@router.post("/{tournament_id}/verify", response_model=StandingsCheck, dependencies=[Depends(verify_admin)])
+async def verify_standings(
+    tournament_id: UUID,
+    tournaments: TournamentRepository = Depends(get_tournament_repository),
+    match_repository: MatchRepository = Depends(get_match_repository),
+    event_repository: MatchEventRepository = Depends(get_event_repository),
+    standings_repository: StandingsRepository = Depends(get_standings_repository),
+):
+    # Recompute from scratch and compare with the incrementally maintained table
+    table, tiebreaker = await _compute(tournament_id, tournaments, match_repository, event_repository, standings_repository)
+    return {"tournament_id": tournament_id, "consistent": standings_store.check(tournament_id, table, tiebreaker)}
@@ -1,57 +1,133 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from fastapi import APIRouter, Body, HTTPException, Depends, Query, Request, Response, status
+from typing import List, Optional
 from uuid import UUID
-from app.database import supabase
-from app.schemas import Team, TeamCreate, TeamUpdate
-from app.dependencies import verify_admin
+from app.schemas import BulkResult, Team, TeamCreate, TeamUpdate, TeamWithRelations
+from app.conditional import revalidate
+from app.fields import fields_query, include_query, render, select_columns
+from app.bulk import bulk_create, fetch_by_id, written_rows
+from app.pagination import PageParams, load_page, page_response
+from app.config import settings
+from app.cache import cache_key, embedded_tags, response_cache, team_subtree_tags, team_tags
+from app.dependencies import verify_admin, get_team_repository, get_tournament_repository
+from app.repositories import TeamRepository, TournamentRepository
+from app.match_center import match_center_store
+from app.standings import standings_store
 
 router = APIRouter(
     prefix="/teams",
     tags=["teams"]
 )
 
-@router.get("/", response_model=List[Team])
-def get_teams(tournament_id: UUID = None):
-    query = supabase.table("teams").select("*")
-    if tournament_id:
-        query = query.eq("tournament_id", str(tournament_id))
-    response = query.order("name").execute()
-    return response.data
-
-@router.get("/{team_id}", response_model=Team)
-def get_team(team_id: UUID):
-    response = supabase.table("teams").select("*").eq("id", str(team_id)).execute()
-    if not response.data:
+INCLUDE = ("tournament", "players")
+
+@router.get("/", response_model=List[TeamWithRelations], response_model_exclude_unset=True)
+async def get_teams(
+    request: Request,
+    response: Response,
+    tournament_id: UUID = None,
+    fields: Optional[List[str]] = Depends(fields_query(Team)),
+    include: Optional[dict] = Depends(include_query(INCLUDE)),
+    page: PageParams = Depends(),
+    teams: TeamRepository = Depends(get_team_repository),
+):
+    data = await response_cache.get_or_load(
+        cache_key(request),
+        lambda d: [f"teams:list:{tournament_id or '*'}", *embedded_tags("teams", d["items"], include)],
+        lambda: load_page(teams, page, {"tournament_id": tournament_id}, select_columns(fields), include),
+    )
+    return render(
+        response,
+        page_response(request, response, data, settings.HTTP_MAX_AGE_STATIC),
+        TeamWithRelations,
+        fields,
+        include,
+        exclude_unset=True,
+    )
+
+@router.get("/{team_id}", response_model=TeamWithRelations, response_model_exclude_unset=True)
+async def get_team(
+    request: Request,
+    response: Response,
+    team_id: UUID,
+    fields: Optional[List[str]] = Depends(fields_query(Team)),
+    include: Optional[dict] = Depends(include_query(INCLUDE)),
+    teams: TeamRepository = Depends(get_team_repository),
+):
+    team = await response_cache.get_or_load(
+        cache_key(request),
+        lambda t: [f"team:{team_id}", f"teams:of:{t['tournament_id']}", *embedded_tags("teams", t, include)],
+        lambda: teams.get(team_id, select_columns(fields, "tournament_id"), include),
+    )
+    if not team:
         raise HTTPException(status_code=404, detail="Team not found")
-    return response.data[0]
+    return render(
+        response,
+        revalidate(request, response, team, settings.HTTP_MAX_AGE_STATIC),
+        TeamWithRelations,
+        fields,
+        include,
+        exclude_unset=True,
+    )
 
 @router.post("/", response_model=Team, dependencies=[Depends(verify_admin)])
-def create_team(team: TeamCreate):
-    data = team.dict(exclude_unset=True)
+async def create_team(
+    team: TeamCreate,
+    teams: TeamRepository = Depends(get_team_repository),
+    tournaments: TournamentRepository = Depends(get_tournament_repository),
+):
     # Ensure tournament exists
-    tournament_check = supabase.table("tournaments").select("id").eq("id", str(team.tournament_id)).execute()
-    if not tournament_check.data:
+    if not await tournaments.exists(team.tournament_id):
         raise HTTPException(status_code=404, detail="Tournament not found")
 
-    response = supabase.table("teams").insert(data).execute()
-    if not response.data:
+    created = await teams.create(team.dict(exclude_unset=True))
+    if not created:
         raise HTTPException(status_code=400, detail="Could not create team")
-    return response.data[0]
+    standings_store.invalidate(created["tournament_id"])
+    await response_cache.invalidate(*team_tags(created))
+    return created
+
+@router.post("/bulk", response_model=BulkResult[Team], dependencies=[Depends(verify_admin)])
+async def create_teams_bulk(
+    items: List[TeamCreate] = Body(..., max_length=settings.BULK_MAX_ITEMS),
+    upsert: bool = Query(False, description="Update teams with the same (tournament_id, name) instead of adding another"),
+    teams: TeamRepository = Depends(get_team_repository),
+    tournaments: TournamentRepository = Depends(get_tournament_repository),
+):
+    data = [item.dict(exclude_unset=True) for item in items]
+    known = await fetch_by_id(tournaments, (team["tournament_id"] for team in data))
+    errors = {i: "Tournament not found" for i, team in enumerate(data) if str(team["tournament_id"]) not in known}
+
+    result = await bulk_create(teams, data, errors, upsert)
+    written = written_rows(result)
+    for tournament_id in {team["tournament_id"] for team in written}:
+        standings_store.invalidate(tournament_id)
+    for item in result["results"]:
+        if item["status"] == "updated":
+            match_center_store.team_changed(item["data"]["id"])
+    await response_cache.invalidate(*{tag for team in written for tag in team_tags(team)})
+    return result
 
 @router.patch("/{team_id}", response_model=Team, dependencies=[Depends(verify_admin)])
-def update_team(team_id: UUID, team: TeamUpdate):
+async def update_team(team_id: UUID, team: TeamUpdate, teams: TeamRepository = Depends(get_team_repository)):
     data = team.dict(exclude_unset=True)
     if not data:
         raise HTTPException(status_code=400, detail="No fields to update")
 
-    response = supabase.table("teams").update(data).eq("id", str(team_id)).execute()
-    if not response.data:
+    updated = await teams.update(team_id, data)
+    if not updated:
         raise HTTPException(status_code=404, detail="Team not found or update failed")
-    return response.data[0]
+    if "name" in data:
+        standings_store.invalidate(updated["tournament_id"])
+    match_center_store.team_changed(team_id)
+    await response_cache.invalidate(*team_tags(updated))
+    return updated
 
 @router.delete("/{team_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(verify_admin)])
-def delete_team(team_id: UUID):
-    response = supabase.table("teams").delete().eq("id", str(team_id)).execute()
-    if not response.data:
+async def delete_team(team_id: UUID, teams: TeamRepository = Depends(get_team_repository)):
+    deleted = await teams.delete(team_id)
+    if not deleted:
          raise HTTPException(status_code=404, detail="Team not found")
+    standings_store.invalidate(deleted["tournament_id"])
+    match_center_store.team_changed(team_id)
+    await response_cache.invalidate(*team_tags(deleted), *team_subtree_tags(team_id))
     return None
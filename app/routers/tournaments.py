@@ -1,60 +1,171 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from typing import List, Optional
 from uuid import UUID
-from app.database import supabase
-from app.schemas import Tournament, TournamentCreate, TournamentUpdate
-from app.dependencies import verify_admin
+from app.schemas import Leaderboards, LeaderboardStat, Tournament, TournamentCreate, TournamentUpdate, TournamentWithRelations
+from app.conditional import revalidate
+from app.fields import fields_query, include_query, render, select_columns
+from app.pagination import PageParams, load_page, page_response
+from app.config import settings
+from app.cache import cache_key, embedded_tags, response_cache, team_subtree_tags, tournament_tags
+from app.bulk import fetch_by_id
+from app.coalesce import SingleFlight
+from app.dependencies import (
+    verify_admin, get_event_repository, get_match_repository, get_player_repository, get_team_repository, get_tournament_repository
+)
+from app.leaderboards import STATS, build_leaderboard, leaderboard_store
+from app.match_center import match_center_store
+from app.repositories import MatchEventRepository, MatchRepository, PlayerRepository, TeamRepository, TournamentRepository
+from app.standings import standings_store
 
 router = APIRouter(
     prefix="/tournaments",
     tags=["tournaments"]
 )
 
-@router.get("/", response_model=List[Tournament])
-def get_tournaments():
-    response = supabase.table("tournaments").select("*").order("created_at", desc=True).execute()
-    return response.data
+INCLUDE = ("teams", "teams.players", "matches", "matches.home_team", "matches.away_team")
+
+_rebuilds = SingleFlight()
+
+@router.get("/", response_model=List[TournamentWithRelations], response_model_exclude_unset=True)
+async def get_tournaments(
+    request: Request,
+    response: Response,
+    fields: Optional[List[str]] = Depends(fields_query(Tournament)),
+    include: Optional[dict] = Depends(include_query(INCLUDE)),
+    page: PageParams = Depends(),
+    tournaments: TournamentRepository = Depends(get_tournament_repository),
+):
+    # Newest first, paginated by (created_at, id)
+    data = await response_cache.get_or_load(
+        cache_key(request),
+        lambda d: ["tournaments:list", *embedded_tags("tournaments", d["items"], include)],
+        lambda: load_page(tournaments, page, columns=select_columns(fields), embed=include),
+    )
+    return render(
+        response,
+        page_response(request, response, data, settings.HTTP_MAX_AGE_STATIC),
+        TournamentWithRelations,
+        fields,
+        include,
+        exclude_unset=True,
+    )
 
-@router.get("/{tournament_id}", response_model=Tournament)
-def get_tournament(tournament_id: UUID):
-    response = supabase.table("tournaments").select("*").eq("id", str(tournament_id)).execute()
-    if not response.data:
+@router.get("/{tournament_id}", response_model=TournamentWithRelations, response_model_exclude_unset=True)
+async def get_tournament(
+    request: Request,
+    response: Response,
+    tournament_id: UUID,
+    fields: Optional[List[str]] = Depends(fields_query(Tournament)),
+    include: Optional[dict] = Depends(include_query(INCLUDE)),
+    tournaments: TournamentRepository = Depends(get_tournament_repository),
+):
+    tournament = await response_cache.get_or_load(
+        cache_key(request),
+        lambda t: [f"tournament:{tournament_id}", *embedded_tags("tournaments", t, include)],
+        lambda: tournaments.get(tournament_id, select_columns(fields), include),
+    )
+    if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
-    return response.data[0]
+    return render(
+        response,
+        revalidate(request, response, tournament, settings.HTTP_MAX_AGE_STATIC),
+        TournamentWithRelations,
+        fields,
+        include,
+        exclude_unset=True,
+    )
+
+@router.get("/{tournament_id}/leaderboards", response_model=Leaderboards, response_model_exclude_none=True)
+async def get_leaderboards(
+    request: Request,
+    response: Response,
+    tournament_id: UUID,
+    stat: Optional[List[LeaderboardStat]] = Query(None, description="Statistics to return (default: all)"),
+    limit: int = Query(settings.LEADERBOARDS_DEFAULT_LIMIT, ge=1, le=settings.PAGE_SIZE_MAX),
+    tournaments: TournamentRepository = Depends(get_tournament_repository),
+    events: MatchEventRepository = Depends(get_event_repository),
+    players: PlayerRepository = Depends(get_player_repository),
+):
+    """Top scorers, bookings and appearances, from the materialized leaderboard
+    that event writes keep up to date."""
+    board = leaderboard_store.get(tournament_id)
+    if board is None:
+        # Full rebuild on first read or once the board has aged out
+        generation = leaderboard_store.generation(tournament_id)
+
+        async def rebuild():
+            if not await tournaments.exists(tournament_id):
+                raise HTTPException(status_code=404, detail="Tournament not found")
+            # Filtered through the match rather than on a list of match ids, and
+            # paged, so that neither the URL nor the rows grow past a limit
+            rows = await events.list_all(
+                {"match.tournament_id": tournament_id}, columns=["match_id", "team_id", "player_id", "type"]
+            )
+            return leaderboard_store.store(tournament_id, build_leaderboard(rows), generation)
+
+        # Concurrent reads of a board being rebuilt wait for that one rebuild
+        board = await _rebuilds.do((tournament_id, generation), rebuild)
+
+    data = {"tournament_id": tournament_id}
+    for name in [s.value for s in stat] if stat else STATS:
+        data[name] = board.top(name, limit)
+    # Names are looked up for the players shown, once per player
+    unnamed = {row["player_id"] for name in STATS for row in data.get(name, ()) if row["player_name"] is None}
+    if unnamed:
+        found = await fetch_by_id(players, unnamed, "name")
+        board.names.update({player_id: row["name"] for player_id, row in found.items()})
+        for name in STATS:
+            for row in data.get(name, ()):
+                row["player_name"] = board.names.get(row["player_id"])
+    return revalidate(request, response, data, settings.HTTP_MAX_AGE_LIVE)
 
 @router.post("/", response_model=Tournament, dependencies=[Depends(verify_admin)])
-def create_tournament(tournament: TournamentCreate):
-    # Convert date objects to string if necessary, but Supabase client usually handles it.
-    # json serialization might be needed for dates if using raw requests, but client is smart.
-    # We use jsonable_encoder or just dict() with string conversion if needed.
-    # For now, let's try direct dict.
-    data = tournament.dict(exclude_unset=True)
-    if data.get('start_date'): data['start_date'] = data['start_date'].isoformat()
-    if data.get('end_date'): data['end_date'] = data['end_date'].isoformat()
-    
-    response = supabase.table("tournaments").insert(data).execute()
-    if not response.data:
+async def create_tournament(tournament: TournamentCreate, tournaments: TournamentRepository = Depends(get_tournament_repository)):
+    # The repository takes care of encoding dates for the backend
+    created = await tournaments.create(tournament.dict(exclude_unset=True))
+    if not created:
         raise HTTPException(status_code=400, detail="Could not create tournament")
-    return response.data[0]
+    await response_cache.invalidate("tournaments:list")
+    return created
 
 @router.patch("/{tournament_id}", response_model=Tournament, dependencies=[Depends(verify_admin)])
-def update_tournament(tournament_id: UUID, tournament: TournamentUpdate):
+async def update_tournament(tournament_id: UUID, tournament: TournamentUpdate, tournaments: TournamentRepository = Depends(get_tournament_repository)):
     data = tournament.dict(exclude_unset=True)
     if not data:
         raise HTTPException(status_code=400, detail="No fields to update")
-        
-    if data.get('start_date'): data['start_date'] = data['start_date'].isoformat()
-    if data.get('end_date'): data['end_date'] = data['end_date'].isoformat()
 
-    response = supabase.table("tournaments").update(data).eq("id", str(tournament_id)).execute()
-    if not response.data:
+    updated = await tournaments.update(tournament_id, data)
+    if not updated:
         raise HTTPException(status_code=404, detail="Tournament not found or update failed")
-    return response.data[0]
+    if "tiebreakers" in data:
+        standings_store.invalidate(tournament_id)
+    await response_cache.invalidate(*tournament_tags(tournament_id))
+    return updated
 
 @router.delete("/{tournament_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(verify_admin)])
-def delete_tournament(tournament_id: UUID):
-    response = supabase.table("tournaments").delete().eq("id", str(tournament_id)).execute()
-    # Supabase delete returns the deleted rows. If empty, maybe it didn't exist.
-    if not response.data:
+async def delete_tournament(
+    tournament_id: UUID,
+    tournaments: TournamentRepository = Depends(get_tournament_repository),
+    teams: TeamRepository = Depends(get_team_repository),
+    matches: MatchRepository = Depends(get_match_repository),
+):
+    # Teams, players, matches and events go with the tournament (on delete cascade),
+    # so collect their ids first to evict exactly their cache entries
+    team_ids = [t["id"] for t in await teams.list_for_tournament(tournament_id, columns=["id"])]
+    match_ids = [m["id"] for m in await matches.list({"tournament_id": tournament_id}, columns=["id"])]
+
+    # Delete returns the deleted row. If there is none, it didn't exist.
+    if not await tournaments.delete(tournament_id):
          raise HTTPException(status_code=404, detail="Tournament not found")
+    standings_store.invalidate(tournament_id)
+    leaderboard_store.invalidate(tournament_id)
+    for match_id in match_ids:
+        match_center_store.remove(match_id)
+
+    tags = [*tournament_tags(tournament_id), f"teams:of:{tournament_id}", f"teams:list:{tournament_id}", "teams:list:*",
+            f"matches:of:{tournament_id}", f"matches:list:{tournament_id}", "matches:list:*"]
+    for team_id in team_ids:
+        tags.extend(team_subtree_tags(team_id))
+    tags.extend(f"events:list:{match_id}" for match_id in match_ids)
+    await response_cache.invalidate(*tags)
     return None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Generic, TypeVar
 from datetime import date, datetime
 from uuid import UUID
 from enum import Enum
@@ -10,6 +10,16 @@ class TournamentStatus(str, Enum):
     ongoing = "ongoing"
     completed = "completed"
 
+class TiebreakerRule(str, Enum):
+    points = "points"
+    goal_difference = "goal_difference"
+    goals_for = "goals_for"
+    head_to_head_points = "head_to_head_points"
+    head_to_head_goal_difference = "head_to_head_goal_difference"
+    head_to_head_goals_for = "head_to_head_goals_for"
+    away_goals = "away_goals"
+    fair_play = "fair_play"
+
 class PlayerPosition(str, Enum):
     GK = "GK"
     DEF = "DEF"
@@ -36,6 +46,8 @@ class TournamentBase(BaseModel):
     status: TournamentStatus = TournamentStatus.upcoming
     start_date: Optional[date] = None
     end_date: Optional[date] = None
+    # Ranking criteria of the standings, in order (default: points, goal difference, goals for)
+    tiebreakers: Optional[List[TiebreakerRule]] = None
 
 class TournamentCreate(TournamentBase):
     pass
@@ -46,6 +58,7 @@ class TournamentUpdate(BaseModel):
     status: Optional[TournamentStatus] = None
     start_date: Optional[date] = None
     end_date: Optional[date] = None
+    tiebreakers: Optional[List[TiebreakerRule]] = None
 
 class Tournament(TournamentBase):
     id: UUID
@@ -144,6 +157,9 @@ class MatchEventCreate(MatchEventBase):
     match_id: UUID
     team_id: UUID
     player_id: Optional[UUID] = None
+    # Client-chosen id, unique per match: retrying a create with it returns the
+    # event recorded the first time instead of adding (and scoring) it twice
+    idempotency_key: Optional[str] = None
 
 class MatchEventUpdate(BaseModel):
     type: Optional[MatchEventType] = None
@@ -157,11 +173,58 @@ class MatchEvent(MatchEventBase):
     match_id: UUID
     team_id: UUID
     player_id: Optional[UUID] = None
+    idempotency_key: Optional[str] = None
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True
 
+class QueuedEvent(BaseModel):
+    match_id: UUID
+    idempotency_key: str
+    queue_depth: int
+
+# --- Expanded Schemas (include=) ---
+# Relations are only present in the response when requested.
+class MatchEventWithRelations(MatchEvent):
+    team: Optional[Team] = None
+    player: Optional[Player] = None
+
+class TeamWithRelations(Team):
+    tournament: Optional[Tournament] = None
+    players: Optional[List[Player]] = None
+
+class MatchWithRelations(Match):
+    tournament: Optional[Tournament] = None
+    home_team: Optional[Team] = None
+    away_team: Optional[Team] = None
+    events: Optional[List[MatchEventWithRelations]] = None
+
+class TournamentWithRelations(Tournament):
+    teams: Optional[List[TeamWithRelations]] = None
+    matches: Optional[List[MatchWithRelations]] = None
+
+# --- Bulk Schemas ---
+T = TypeVar("T")
+
+class BulkItemStatus(str, Enum):
+    created = "created"
+    updated = "updated"
+    error = "error"
+
+class BulkItemResult(BaseModel, Generic[T]):
+    index: int
+    status: BulkItemStatus
+    data: Optional[T] = None
+    error: Optional[str] = None
+
+class BulkResult(BaseModel, Generic[T]):
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    results: List[BulkItemResult[T]]
+
 # --- Standings Schemas ---
 class Standing(BaseModel):
     team_id: UUID
@@ -174,3 +237,86 @@ class Standing(BaseModel):
     goals_against: int = 0
     goal_difference: int = 0
     points: int = 0
+
+class GroupStandings(BaseModel):
+    group: str
+    standings: List[Standing]
+
+class TournamentStandings(BaseModel):
+    tournament_id: UUID
+    standings: List[Standing]
+    groups: Optional[List[GroupStandings]] = None
+
+class StandingsRound(BaseModel):
+    round: int
+    date: date
+    matches: int
+    standings: List[Standing]
+
+class StandingsHistory(BaseModel):
+    tournament_id: UUID
+    rounds: List[StandingsRound]
+
+class StandingsCheck(BaseModel):
+    tournament_id: UUID
+    consistent: bool
+
+# --- Leaderboard Schemas ---
+class LeaderboardStat(str, Enum):
+    goals = "goals"
+    yellow_cards = "yellow_cards"
+    red_cards = "red_cards"
+    appearances = "appearances"
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    player_id: UUID
+    player_name: Optional[str] = None
+    team_id: Optional[UUID] = None
+    value: int
+
+class Leaderboards(BaseModel):
+    tournament_id: UUID
+    goals: Optional[List[LeaderboardEntry]] = None
+    yellow_cards: Optional[List[LeaderboardEntry]] = None
+    red_cards: Optional[List[LeaderboardEntry]] = None
+    appearances: Optional[List[LeaderboardEntry]] = None
+
+# --- Match Center Schemas ---
+class MatchCenterTeam(BaseModel):
+    id: UUID
+    name: str
+    logo_url: Optional[str] = None
+    group: Optional[str] = None
+
+class MatchCenterPlayer(BaseModel):
+    id: UUID
+    name: str
+    shirt_number: Optional[int] = None
+    position: Optional[PlayerPosition] = None
+
+class MatchCenterEvent(BaseModel):
+    id: UUID
+    type: MatchEventType
+    minute: int
+    team_id: UUID
+    # "home" or "away"
+    side: Optional[str] = None
+    player: Optional[MatchCenterPlayer] = None
+    extra_info: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+
+class MatchCenter(BaseModel):
+    format: int
+    seq: int
+    match_id: UUID
+    tournament_id: UUID
+    status: MatchStatus
+    stage: Optional[str] = None
+    start_time: datetime
+    home_score: int
+    away_score: int
+    updated_at: Optional[datetime] = None
+    home_team: Optional[MatchCenterTeam] = None
+    away_team: Optional[MatchCenterTeam] = None
+    timeline: List[MatchCenterEvent]
@@ -0,0 +1,85 @@
+import typing
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+Projector = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, which encodes datetimes and UUIDs natively."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def adapter(model: Type[BaseModel], many: bool) -> TypeAdapter:
+    """Validator/serializer for ``model`` or a list of it, compiled once per model."""
+    return TypeAdapter(List[model] if many else model)
+
+
+def _nested_model(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """The model a field holds, directly or as a list, unwrapping Optional."""
+    for arg in typing.get_args(annotation) or (annotation,):
+        if arg is type(None):
+            continue
+        if isinstance(arg, type) and issubclass(arg, BaseModel):
+            return arg, False
+        if typing.get_origin(arg) in (list, List):
+            inner = typing.get_args(arg)[0]
+            if isinstance(inner, type) and issubclass(inner, BaseModel):
+                return inner, True
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def projector(model: Type[BaseModel]) -> Projector:
+    """Function keeping the keys of a row that ``model`` declares, recursing into
+    embedded relations. It stands in for validation when rows are trusted."""
+    plain = []
+    nested = []
+    for name, field in model.model_fields.items():
+        inner, many = _nested_model(field.annotation)
+        if inner is None:
+            plain.append(name)
+        else:
+            nested.append((name, inner, many))
+
+    def project(row: Dict[str, Any]) -> Dict[str, Any]:
+        projected = {name: row[name] for name in plain if name in row}
+        for name, inner, many in nested:
+            value = row.get(name)
+            if value is None:
+                if name in row:
+                    projected[name] = None
+                continue
+            # Resolved lazily, models can embed each other
+            project_inner = projector(inner)
+            projected[name] = [project_inner(v) for v in value] if many else project_inner(value)
+        return projected
+
+    return project
+
+
+def json_response(
+    data: Any, model: Type[BaseModel], trusted: bool, exclude_unset: bool = False, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Response with ``data`` (a row or a list of rows) shaped by ``model``.
+
+    Rows are validated with the model's compiled adapter and dumped by
+    pydantic-core, or, when ``trusted``, only projected onto the model's fields
+    and dumped by orjson. Trusted rows keep the values the backend returned,
+    e.g. PostgREST's ``+00:00`` timestamps instead of pydantic's ``Z``.
+    """
+    many = isinstance(data, list)
+    if trusted:
+        project = projector(model)
+        return ORJSONResponse([project(row) for row in data] if many else project(data), headers=headers)
+    compiled = adapter(model, many)
+    body = compiled.dump_json(compiled.validate_python(data), exclude_unset=exclude_unset)
+    return Response(body, media_type="application/json", headers=headers)
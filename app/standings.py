@@ -0,0 +1,304 @@
+import time
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.tiebreakers import Tiebreaker
+
+StandingsTable = Dict[str, Dict[str, Any]]
+
+
+def empty_row(team_id: str, team_name: str) -> Dict[str, Any]:
+    return {
+        "team_id": team_id,
+        "team_name": team_name,
+        "played": 0,
+        "won": 0,
+        "drawn": 0,
+        "lost": 0,
+        "goals_for": 0,
+        "goals_against": 0,
+        "goal_difference": 0,
+        "points": 0
+    }
+
+
+def _apply_side(row: Dict[str, Any], scored: int, conceded: int, sign: int) -> None:
+    row["played"] += sign
+    row["goals_for"] += sign * scored
+    row["goals_against"] += sign * conceded
+    row["goal_difference"] += sign * (scored - conceded)
+
+    if scored > conceded:
+        row["won"] += sign
+        row["points"] += sign * 3
+    elif scored == conceded:
+        row["drawn"] += sign
+        row["points"] += sign
+    else:
+        row["lost"] += sign
+
+
+def apply_match(table: StandingsTable, match: Dict[str, Any], sign: int = 1) -> None:
+    """Adds (sign=1) or removes (sign=-1) a finished match's contribution to the table.
+
+    Teams that are not part of the table are ignored, like in a full recompute.
+    """
+    home_id = str(match['home_team_id'])
+    away_id = str(match['away_team_id'])
+    home_score = match['home_score'] or 0
+    away_score = match['away_score'] or 0
+
+    if home_id in table:
+        _apply_side(table[home_id], home_score, away_score, sign)
+    if away_id in table:
+        _apply_side(table[away_id], away_score, home_score, sign)
+
+
+def compute_standings(teams: Iterable[Dict[str, Any]], matches: Iterable[Dict[str, Any]]) -> StandingsTable:
+    table = {str(t['id']): empty_row(str(t['id']), t['name']) for t in teams}
+    for match in matches:
+        apply_match(table, match)
+    return table
+
+
+def _tally(size: int) -> List[List[int]]:
+    # One column per counter: played, won, drawn, lost, goals for, goals against
+    return [[0] * size for _ in range(6)]
+
+
+def _count(tally: List[List[int]], team: int, scored: int, conceded: int) -> None:
+    played, won, drawn, lost, goals_for, goals_against = tally
+    played[team] += 1
+    goals_for[team] += scored
+    goals_against[team] += conceded
+    if scored > conceded:
+        won[team] += 1
+    elif scored == conceded:
+        drawn[team] += 1
+    else:
+        lost[team] += 1
+
+
+def _row(team: Dict[str, Any], tally: List[List[int]], i: int) -> Dict[str, Any]:
+    played, won, drawn, lost, goals_for, goals_against = (column[i] for column in tally)
+    row = empty_row(str(team["id"]), team["name"])
+    row.update(
+        played=played, won=won, drawn=drawn, lost=lost, goals_for=goals_for, goals_against=goals_against,
+        goal_difference=goals_for - goals_against, points=3 * won + drawn,
+    )
+    return row
+
+
+def compute_tables(
+    teams: Iterable[Dict[str, Any]], matches: Iterable[Dict[str, Any]], groups: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """Standings of several tournaments at once, and of each of their groups.
+
+    Teams need ``tournament_id`` (and ``group``), matches ``tournament_id``.
+    The matches are laid out as score columns indexed by team position and
+    folded into per-team counters in one pass; points and goal difference
+    are derived from the counters. A group table only counts matches between
+    two teams of that group, which keeps knockout games out of it.
+
+    Returns ``{tournament_id: {"table": StandingsTable, "groups": {group: StandingsTable}}}``
+    for every tournament with teams; rows are the same as ``compute_standings``.
+    """
+    teams = list(teams)
+    index = {str(team["id"]): i for i, team in enumerate(teams)}
+    tournaments = [str(team["tournament_id"]) for team in teams]
+    team_groups = [team.get("group") for team in teams]
+
+    home, away, home_goals, away_goals, same_group = [], [], [], [], []
+    for match in matches:
+        tournament_id = str(match["tournament_id"])
+        sides = []
+        for key in ("home_team_id", "away_team_id"):
+            i = index.get(str(match[key]), -1)
+            # Teams of another tournament are ignored, like teams missing from a table
+            sides.append(i if i >= 0 and tournaments[i] == tournament_id else -1)
+        home.append(sides[0])
+        away.append(sides[1])
+        home_goals.append(match["home_score"] or 0)
+        away_goals.append(match["away_score"] or 0)
+        same_group.append(
+            groups and min(sides) >= 0 and team_groups[sides[0]] is not None
+            and team_groups[sides[0]] == team_groups[sides[1]]
+        )
+
+    overall, grouped = _tally(len(teams)), _tally(len(teams))
+    for h, a, hg, ag, in_group in zip(home, away, home_goals, away_goals, same_group):
+        if h >= 0:
+            _count(overall, h, hg, ag)
+        if a >= 0:
+            _count(overall, a, ag, hg)
+        if in_group:
+            _count(grouped, h, hg, ag)
+            _count(grouped, a, ag, hg)
+
+    result: Dict[str, Dict[str, Any]] = {}
+    for i, team in enumerate(teams):
+        tables = result.setdefault(tournaments[i], {"table": {}, "groups": {}})
+        row = _row(team, overall, i)
+        tables["table"][row["team_id"]] = row
+        if groups and team_groups[i] is not None:
+            tables["groups"].setdefault(team_groups[i], {})[row["team_id"]] = _row(team, grouped, i)
+    return result
+
+
+def sort_standings(table: StandingsTable) -> List[Dict[str, Any]]:
+    # Sort by Points (desc), Goal Difference (desc), Goals For (desc)
+    return sorted(
+        table.values(),
+        key=lambda x: (x["points"], x["goal_difference"], x["goals_for"]),
+        reverse=True
+    )
+
+
+def _matchday(match: Dict[str, Any]) -> datetime:
+    start = match["start_time"]
+    if not isinstance(start, datetime):
+        start = datetime.fromisoformat(str(start).replace("Z", "+00:00"))
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    return start.astimezone(timezone.utc)
+
+
+def standings_history(
+    teams: Iterable[Dict[str, Any]], matches: Iterable[Dict[str, Any]], tiebreaker: Optional[Tiebreaker] = None
+) -> List[Dict[str, Any]]:
+    """The table after each round of finished matches, a round being the
+    matches played on one (UTC) day.
+
+    Matches are applied in kick-off order to a running table, which is
+    snapshotted at the end of every round, so the work is the matches plus one
+    sort per round rather than a recompute per round. A ``tiebreaker`` (built
+    without matches) is patched along and ranks the snapshots.
+    """
+    table = compute_standings(teams, [])
+    finished = sorted((m for m in matches if is_finished(m)), key=lambda m: (_matchday(m), str(m.get("id"))))
+    rounds = []
+    for day, played in groupby(finished, key=lambda m: _matchday(m).date()):
+        count = 0
+        for match in played:
+            apply_match(table, match)
+            if tiebreaker:
+                tiebreaker.apply_match(match)
+            count += 1
+        rounds.append({
+            "round": len(rounds) + 1,
+            "date": day.isoformat(),
+            "matches": count,
+            # Copied, the running table keeps changing
+            "standings": [dict(row) for row in (tiebreaker.rank(table) if tiebreaker else sort_standings(table))],
+        })
+    return rounds
+
+
+def is_finished(match: Optional[Dict[str, Any]]) -> bool:
+    return bool(match) and match.get("status") == "finished"
+
+
+class _Materialized:
+    __slots__ = ("table", "tiebreaker", "ordered", "built_at")
+
+    def __init__(self, table: StandingsTable, tiebreaker: Optional[Tiebreaker] = None):
+        self.table = table
+        self.tiebreaker = tiebreaker
+        self.ordered: Optional[List[Dict[str, Any]]] = None
+        self.built_at = time.monotonic()
+
+    def rank(self) -> List[Dict[str, Any]]:
+        return self.tiebreaker.rank(self.table) if self.tiebreaker else sort_standings(self.table)
+
+
+class StandingsStore:
+    """Per-worker materialized standings, kept current by match write deltas.
+
+    Tables are built lazily on first read and then patched by ``match_changed``
+    whenever a match is created, updated or deleted through this worker. Because
+    other workers (or direct database writes) can't patch this copy, tables are
+    rebuilt once they are older than ``max_age`` seconds.
+
+    Tables of tournaments with their own tiebreakers keep a ``Tiebreaker``,
+    patched along with the table.
+    """
+
+    def __init__(self, max_age: float = settings.STANDINGS_MAX_AGE):
+        self.max_age = max_age
+        self._tables: Dict[str, _Materialized] = {}
+        # Bumped on every write touching a tournament so that a rebuild racing
+        # with a write doesn't materialize a table that misses that write.
+        self._generations: Dict[str, int] = {}
+
+    def get(self, tournament_id: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._tables.get(str(tournament_id))
+        if entry is None:
+            return None
+        if self.max_age and time.monotonic() - entry.built_at > self.max_age:
+            self._tables.pop(str(tournament_id), None)
+            return None
+        if entry.ordered is None:
+            entry.ordered = entry.rank()
+        return entry.ordered
+
+    def generation(self, tournament_id: str) -> int:
+        return self._generations.get(str(tournament_id), 0)
+
+    def store(
+        self, tournament_id: str, table: StandingsTable, generation: int, tiebreaker: Optional[Tiebreaker] = None
+    ) -> List[Dict[str, Any]]:
+        """Materializes a freshly computed table unless a write happened since ``generation``."""
+        entry = _Materialized(table, tiebreaker)
+        entry.ordered = entry.rank()
+        if self.generation(tournament_id) == generation:
+            self._tables[str(tournament_id)] = entry
+        return entry.ordered
+
+    def invalidate(self, tournament_id: str) -> None:
+        tournament_id = str(tournament_id)
+        self._generations[tournament_id] = self.generation(tournament_id) + 1
+        self._tables.pop(tournament_id, None)
+
+    def match_changed(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        """Applies the standings delta of a match going from ``old`` to ``new`` (either may be None)."""
+        for match, sign in ((old, -1), (new, 1)):
+            if not is_finished(match):
+                continue
+            tournament_id = str(match["tournament_id"])
+            self._generations[tournament_id] = self.generation(tournament_id) + 1
+            entry = self._tables.get(tournament_id)
+            if entry is None:
+                continue
+            if entry.tiebreaker:
+                if entry.tiebreaker.needs_rebuild(match):
+                    # Its cards were not loaded with the table
+                    del self._tables[tournament_id]
+                    continue
+                entry.tiebreaker.apply_match(match, sign)
+            apply_match(entry.table, match, sign)
+            entry.ordered = None
+
+    def cards_changed(self, tournament_id: str) -> None:
+        """A card was recorded, changed or removed; drops tables ranked by fair play."""
+        tournament_id = str(tournament_id)
+        self._generations[tournament_id] = self.generation(tournament_id) + 1
+        entry = self._tables.get(tournament_id)
+        if entry is not None and entry.tiebreaker and entry.tiebreaker.uses_cards:
+            del self._tables[tournament_id]
+
+    def check(self, tournament_id: str, table: StandingsTable, tiebreaker: Optional[Tiebreaker] = None) -> bool:
+        """Compares the materialized table with a full recompute, replacing it on drift."""
+        entry = self._tables.get(str(tournament_id))
+        consistent = entry is None or entry.table == table
+        if not consistent:
+            self.store(tournament_id, table, self.generation(tournament_id), tiebreaker)
+        return consistent
+
+    def clear(self) -> None:
+        self._tables.clear()
+        self._generations.clear()
+
+
+standings_store = StandingsStore()
@@ -0,0 +1,149 @@
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+# Ranking criteria a tournament can order its table by (tournaments.tiebreakers,
+# migrations/007_tiebreakers.sql). Teams still level on every criterion are
+# ordered by name.
+RULES = (
+    "points",
+    "goal_difference",
+    "goals_for",
+    "head_to_head_points",
+    "head_to_head_goal_difference",
+    "head_to_head_goals_for",
+    "away_goals",
+    "fair_play",
+)
+# What tournaments without tiebreakers use, and what sort_standings does
+DEFAULT_RULES = ("points", "goal_difference", "goals_for")
+HEAD_TO_HEAD = ("head_to_head_points", "head_to_head_goal_difference", "head_to_head_goals_for")
+# Fair play points per card; the fewer, the better the ranking
+CARD_POINTS = {"yellow_card": 1, "red_card": 3}
+
+# Cards of finished matches: match id -> team id -> fair play points
+Cards = Dict[str, Dict[str, int]]
+
+
+def rules_of(tournament: Optional[Dict[str, Any]]) -> Sequence[str]:
+    return tuple((tournament or {}).get("tiebreakers") or DEFAULT_RULES)
+
+
+def uses_default(rules: Sequence[str]) -> bool:
+    return tuple(rules) == DEFAULT_RULES
+
+
+def count_cards(matches: Iterable[Dict[str, Any]], events: Iterable[Dict[str, Any]]) -> Cards:
+    """Fair play points of each team in ``matches``, from their card events."""
+    cards: Cards = {str(match["id"]): {} for match in matches}
+    for event in events:
+        points = CARD_POINTS.get(event["type"])
+        if points:
+            by_team = cards.setdefault(str(event["match_id"]), {})
+            by_team[str(event["team_id"])] = by_team.get(str(event["team_id"]), 0) + points
+    return cards
+
+
+class Tiebreaker:
+    """Orders a standings table by a tournament's rules.
+
+    Results between every pair of teams are kept in a team x team matrix
+    (points and goals each team took off the other), filled once from the
+    finished matches and then patched by ``apply_match`` like the table
+    itself. Head-to-head criteria only look at the teams still tied when
+    they are reached, and sum their rows of the matrix, so breaking a tie
+    never goes back to the match list.
+
+    ``cards`` holds the fair play points of the finished matches; a match
+    finishing later has unknown cards, which ``needs_rebuild`` reports.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[str],
+        teams: Iterable[Dict[str, Any]],
+        matches: Iterable[Dict[str, Any]] = (),
+        cards: Optional[Cards] = None,
+    ):
+        self.rules = tuple(rules)
+        self.index = {str(team["id"]): i for i, team in enumerate(teams)}
+        size = len(self.index)
+        self.points = [[0] * size for _ in range(size)]
+        self.goals = [[0] * size for _ in range(size)]
+        self.away_goals = [0] * size
+        self.fair_play = [0] * size
+        self.cards = cards if cards is not None else {}
+        for match in matches:
+            self.apply_match(match)
+
+    @property
+    def uses_cards(self) -> bool:
+        return "fair_play" in self.rules
+
+    def needs_rebuild(self, match: Dict[str, Any]) -> bool:
+        return self.uses_cards and str(match["id"]) not in self.cards
+
+    def apply_match(self, match: Dict[str, Any], sign: int = 1) -> None:
+        """Adds (sign=1) or removes (sign=-1) a finished match, like ``apply_match`` on the table."""
+        home = self.index.get(str(match["home_team_id"]))
+        away = self.index.get(str(match["away_team_id"]))
+        home_score = match["home_score"] or 0
+        away_score = match["away_score"] or 0
+        if away is not None:
+            self.away_goals[away] += sign * away_score
+        if home is not None and away is not None:
+            self.goals[home][away] += sign * home_score
+            self.goals[away][home] += sign * away_score
+            if home_score > away_score:
+                self.points[home][away] += sign * 3
+            elif home_score < away_score:
+                self.points[away][home] += sign * 3
+            else:
+                self.points[home][away] += sign
+                self.points[away][home] += sign
+        for team_id, points in self.cards.get(str(match.get("id")), {}).items():
+            team = self.index.get(team_id)
+            if team is not None:
+                self.fair_play[team] += sign * points
+
+    def _mini_league(self, rows: List[Dict[str, Any]]) -> Dict[str, tuple]:
+        """(points, goal difference, goals for) of each tied team in the matches among them."""
+        teams = [self.index.get(row["team_id"]) for row in rows]
+        tied = [i for i in teams if i is not None]
+        league = {}
+        for row, i in zip(rows, teams):
+            if i is None:
+                league[row["team_id"]] = (0, 0, 0)
+                continue
+            scored = sum(self.goals[i][j] for j in tied)
+            conceded = sum(self.goals[j][i] for j in tied)
+            league[row["team_id"]] = (sum(self.points[i][j] for j in tied), scored - conceded, scored)
+        return league
+
+    def _key(self, rule: str, rows: List[Dict[str, Any]]) -> Callable[[Dict[str, Any]], int]:
+        """Sort key for ``rule`` among ``rows``, higher ranking first."""
+        if rule in HEAD_TO_HEAD:
+            league = self._mini_league(rows)
+            position = HEAD_TO_HEAD.index(rule)
+            return lambda row: league[row["team_id"]][position]
+        if rule == "away_goals":
+            return lambda row: self._counter(self.away_goals, row)
+        if rule == "fair_play":
+            return lambda row: -self._counter(self.fair_play, row)
+        return lambda row: row[rule]
+
+    def _counter(self, column: List[int], row: Dict[str, Any]) -> int:
+        i = self.index.get(row["team_id"])
+        return column[i] if i is not None else 0
+
+    def _split(self, rows: List[Dict[str, Any]], depth: int) -> List[Dict[str, Any]]:
+        if len(rows) < 2 or depth == len(self.rules):
+            return rows
+        key = self._key(self.rules[depth], rows)
+        ordered = []
+        # Sorting is stable, so teams stay in name order within each tie
+        for _, tied in groupby(sorted(rows, key=key, reverse=True), key=key):
+            ordered.extend(self._split(list(tied), depth + 1))
+        return ordered
+
+    def rank(self, table: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self._split(sorted(table.values(), key=lambda row: row["team_name"]), 0)
@@ -0,0 +1,222 @@
+"""PostgREST stand-in for offline benchmarks and tests.
+
+    python -m benchmarks.fake_postgrest [--port 54321] [--latency-ms 2]
+
+Serves the subset of PostgREST's HTTP API that app/repositories/supabase.py
+uses (select with embedding, eq/in filters, also through ``!inner`` embeds, keyset ``or=`` trees, ordering,
+limits, exact counts, inserts/upserts, updates, deletes and rpc) from a
+LocalBackend, so the real SupabaseBackend code path runs without a Supabase
+project. ``latency`` is added to every request to stand in for the network
+round trip. In-process it is mounted with ``httpx.ASGITransport`` (see
+``http_client``); with ``--port`` it runs under uvicorn.
+"""
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from app.repositories.base import BackendError, Condition, Embed, MissingFunction, Query
+from app.repositories.local import LocalBackend
+
+# Query parameters that are not column filters
+RESERVED = {"select", "order", "limit", "offset", "or", "on_conflict", "columns"}
+
+
+def _split(text: str) -> List[str]:
+    """Splits on the commas that are outside parentheses and quotes."""
+    parts, depth, quoted, current = [], 0, False, ""
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and quoted:
+            current += text[i:i + 2]
+            i += 2
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            i += 1
+            continue
+        current += char
+        i += 1
+    if current:
+        parts.append(current)
+    return parts
+
+
+def parse_select(select: str) -> Tuple[Optional[List[str]], Embed]:
+    """``id,home_team:teams!home_team_id(*)`` -> (["id"], {"home_team": {}}).
+
+    Embedded resources always select ``*`` in SupabaseBackend, so only their
+    own embeds are kept."""
+    columns: List[str] = []
+    embed: Embed = {}
+    star = False
+    for item in _split(select):
+        if "(" in item:
+            head, inner = item.split("(", 1)
+            embed[head.split(":", 1)[0]] = parse_select(inner[:-1])[1]
+        elif item == "*":
+            star = True
+        else:
+            columns.append(item)
+    return None if star or not columns else columns, embed
+
+
+def _unquote(value: str) -> Any:
+    if value.startswith('"') and value.endswith('"'):
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def parse_condition(text: str) -> Condition:
+    """A logic tree such as ``or(a.gt."1",and(a.eq."1",b.is.null))``."""
+    for kind in ("and", "or"):
+        if text.startswith(kind + "("):
+            return (kind, [parse_condition(part) for part in _split(text[len(kind) + 1:-1])])
+    column, rest = text.split(".", 1)
+    if rest == "is.null":
+        return ("cmp", column, "is_null", None)
+    if rest == "not.is.null":
+        return ("cmp", column, "not_null", None)
+    op, value = rest.split(".", 1)
+    return ("cmp", column, op, _unquote(value))
+
+
+def keyset_after(node: Condition) -> List[Any]:
+    """Inverse of ``keyset_condition``: the ``after`` values encoded in ``node``."""
+    branches = node[1]
+    ties = [branch for branch in branches if branch[0] == "and"]
+    if ties:
+        tie, rest = ties[0][1]
+        value = tie[3] if tie[2] == "eq" else None
+        return [value, *keyset_after(rest)]
+    bounds = [branch for branch in branches if branch[0] == "cmp" and branch[2] in ("gt", "lt")]
+    return [bounds[0][3] if bounds else None]
+
+
+def parse_filters(request: Request) -> Dict[str, Any]:
+    filters: Dict[str, Any] = {}
+    for key, value in request.query_params.multi_items():
+        if key in RESERVED or key.endswith(".order"):
+            continue
+        op, operand = value.split(".", 1)
+        if op == "in":
+            filters[key] = [_unquote(v) for v in _split(operand[1:-1])]
+        elif op == "eq":
+            filters[key] = operand
+        elif op == "is" and operand == "null":
+            filters[key] = None
+        else:
+            raise ValueError(f"Unsupported filter {key}={value}")
+    return filters
+
+
+def parse_order(order: Optional[str]) -> List[Tuple[str, bool]]:
+    if not order:
+        return []
+    return [(item.split(".")[0], ".desc" in item) for item in order.split(",")]
+
+
+class FakePostgREST:
+    def __init__(self, backend: Optional[LocalBackend] = None, latency: float = 0.0):
+        self.backend = backend or LocalBackend()
+        self.latency = latency
+        self.requests = 0
+        self.app = Starlette(routes=[
+            Route("/rest/v1/rpc/{function}", self.rpc, methods=["POST"]),
+            Route("/rest/v1/{table}", self.table, methods=["GET", "HEAD", "POST", "PATCH", "DELETE"]),
+        ])
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+    async def _enter(self) -> None:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def table(self, request: Request) -> Response:
+        await self._enter()
+        table = request.path_params["table"]
+        prefer = request.headers.get("prefer", "")
+        try:
+            if request.method in ("GET", "HEAD"):
+                return await self._select(request, table, "count=exact" in prefer)
+            filters = parse_filters(request)
+            if request.method == "POST":
+                body = json.loads(await request.body())
+                rows = body if isinstance(body, list) else [body]
+                on_conflict = request.query_params.get("on_conflict")
+                upsert = "resolution=merge-duplicates" in prefer and on_conflict
+                data = await self.backend.insert(table, rows, on_conflict.split(",") if upsert else None)
+                return JSONResponse(data, status_code=201)
+            if request.method == "PATCH":
+                return JSONResponse(await self.backend.update(table, filters, json.loads(await request.body())))
+            return JSONResponse(await self.backend.delete(table, filters))
+        except BackendError as e:
+            return JSONResponse({"message": str(e), "code": "23505", "details": None, "hint": None}, status_code=409)
+        except ValueError as e:
+            return JSONResponse({"message": str(e), "code": "PGRST100", "details": None, "hint": None}, status_code=400)
+
+    async def _select(self, request: Request, table: str, count: bool) -> Response:
+        columns, embed = parse_select(request.query_params.get("select", "*"))
+        order = parse_order(request.query_params.get("order"))
+        after = None
+        if "or" in request.query_params:
+            after = keyset_after(parse_condition("or" + request.query_params["or"]))
+        limit = request.query_params.get("limit")
+        query = Query(
+            filters=parse_filters(request), order=order, columns=columns,
+            limit=int(limit) if limit else None, after=after, embed=embed or None,
+        )
+        rows = [] if request.method == "HEAD" else await self.backend.select(table, query)
+        headers = {}
+        if count:
+            total = await self.backend.count(table, query.filters)
+            headers["Content-Range"] = f"0-{max(len(rows) - 1, 0)}/{total}" if rows else f"*/{total}"
+        if request.method == "HEAD":
+            return Response(headers=headers)
+        return JSONResponse(rows, headers=headers)
+
+    async def rpc(self, request: Request) -> Response:
+        await self._enter()
+        try:
+            rows = await self.backend.rpc(request.path_params["function"], json.loads(await request.body() or b"{}"))
+        except MissingFunction as e:
+            return JSONResponse({"message": str(e), "code": "PGRST202", "details": None, "hint": None}, status_code=404)
+        except BackendError as e:
+            return JSONResponse({"message": str(e), "code": "23505", "details": None, "hint": None}, status_code=409)
+        return JSONResponse(rows)
+
+    def http_client(self) -> httpx.AsyncClient:
+        """An httpx client whose requests are served in-process by this stand-in."""
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=self))
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--database", default=":memory:", help="SQLite file for the data (default: in memory)")
+    args = parser.parse_args()
+    fake = FakePostgREST(LocalBackend(args.database), latency=args.latency_ms / 1000)
+    uvicorn.run(fake, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""End-to-end load benchmark of the API against a local PostgREST stand-in.
+
+    python -m benchmarks.load [--requests 200] [--concurrency 16] [--latency-ms 2]
+                              [--no-cache] [--baseline benchmarks/baseline.json]
+                              [--update-baseline]
+
+Seeds benchmarks.fake_postgrest with synthetic tournaments, then drives the
+real app (SupabaseBackend, middleware, caches, auth) in-process with
+concurrent clients, one scenario at a time, across every router, standings
+and admin writes included. For each scenario it reports throughput,
+p50/p95/p99 latency and upstream (PostgREST) requests per API request.
+
+Results are compared with the stored baseline: more upstream calls per
+request than the baseline is a regression on any machine, while latency only
+fails past ``--tolerance`` times the baseline p95, since absolute timings
+depend on the machine that recorded them. Exits with 1 on a regression.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# The app reads its settings at import: point it at the stand-in first
+os.environ["DATA_BACKEND"] = "supabase"
+os.environ["SUPABASE_URL"] = "http://fake-postgrest.local"
+os.environ["SUPABASE_KEY"] = "benchmark"
+os.environ["SUPABASE_JWT_SECRET"] = "benchmark-jwt-secret-not-for-production"
+os.environ["EVENTS_WRITE_BEHIND"] = "false"
+
+import httpx
+import jwt
+
+from app import database
+from app.cache import response_cache
+from app.config import settings
+from app.main import app
+from benchmarks.fake_postgrest import FakePostgREST
+from benchmarks.synthetic import Generator, Seeder, Volumes
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+@dataclass
+class Seeded:
+    tournaments: List[Dict[str, Any]]
+    teams: List[Dict[str, Any]]
+    players: List[Dict[str, Any]]
+    matches: List[Dict[str, Any]]
+
+
+async def seed(backend, volumes: Volumes) -> Seeded:
+    """Synthetic tournaments (benchmarks/synthetic.py), keeping the rows scenarios pick from."""
+    seeded = Seeded([], [], [], [])
+    seeder = Seeder(backend)
+    for table, row in Generator(volumes).rows():
+        await seeder.add(table, row)
+        if table != "match_events":
+            getattr(seeded, table).append(row)
+    await seeder.close()
+    return seeded
+
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+def scenarios(data: Seeded, rng: random.Random) -> Dict[str, Callable[[], Request]]:
+    """Scenario name -> a function returning the next (method, path, json body)."""
+    def pick(rows):
+        return rng.choice(rows)["id"]
+
+    def goal() -> Request:
+        match = rng.choice(data.matches)
+        player = rng.choice([p for p in data.players if p["team_id"] == match["home_team_id"]])
+        body = {"match_id": match["id"], "team_id": player["team_id"], "player_id": player["id"],
+                "type": "goal", "minute": rng.randint(1, 90)}
+        return "POST", "/events/", body
+
+    def standings_under_writes() -> Request:
+        # One write in ten, each invalidating the standings of its tournament
+        if rng.random() < 0.1:
+            return "PATCH", f"/matches/{pick(data.matches)}", {"home_score": rng.randint(0, 5)}
+        return "GET", f"/standings/{pick(data.tournaments)}", None
+
+    def standings_batch() -> Request:
+        # A homepage showing the group tables of every tournament
+        ids = "&".join(f"tournament_id={t['id']}" for t in data.tournaments[:settings.STANDINGS_BATCH_MAX])
+        return "GET", f"/standings/?{ids}&groups=true", None
+
+    return {
+        "tournaments_list": lambda: ("GET", "/tournaments/", None),
+        "tournament_include": lambda: ("GET", f"/tournaments/{pick(data.tournaments)}?include=teams", None),
+        "teams_list": lambda: ("GET", f"/teams/?tournament_id={pick(data.tournaments)}&limit=20", None),
+        "players_list": lambda: ("GET", f"/players/?team_id={pick(data.teams)}", None),
+        "matches_list": lambda: ("GET", f"/matches/?tournament_id={pick(data.tournaments)}&limit=20", None),
+        "match_include": lambda: (
+            "GET", f"/matches/{pick(data.matches)}?include=home_team,away_team,events.player", None),
+        "match_center": lambda: ("GET", f"/matches/{pick(data.matches)}/center", None),
+        "events_list": lambda: ("GET", f"/events/?match_id={pick(data.matches)}", None),
+        "standings": lambda: ("GET", f"/standings/{pick(data.tournaments)}", None),
+        "standings_batch": standings_batch,
+        "standings_history": lambda: ("GET", f"/standings/{pick(data.tournaments)}/history", None),
+        "leaderboards": lambda: ("GET", f"/tournaments/{pick(data.tournaments)}/leaderboards", None),
+        "admin_event_create": goal,
+        "admin_match_update": lambda: ("PATCH", f"/matches/{pick(data.matches)}", {"home_score": rng.randint(0, 5)}),
+        "standings_under_writes": standings_under_writes,
+    }
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, fake: FakePostgREST, next_request: Callable[[], Request], requests: int, concurrency: int
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            method, path, body = next_request()
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    upstream_before = fake.requests
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "upstream_calls": round((fake.requests - upstream_before) / requests, 2),
+        "errors": errors,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["upstream_calls"] > expected["upstream_calls"] + 0.05:
+            regressions.append(f"{name}: {result['upstream_calls']} upstream calls/request, baseline {expected['upstream_calls']}")
+        if result["p95_ms"] > expected["p95_ms"] * tolerance:
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms, baseline {expected['p95_ms']} ms (x{tolerance} allowed)")
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} error responses")
+    return regressions
+
+
+async def benchmark(args) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(args.seed)
+    fake = FakePostgREST(latency=args.latency_ms / 1000)
+    volumes = Volumes(tournaments=args.tournaments, teams=args.teams, squad=args.squad, ongoing=0.25, seed=args.seed)
+    data = await seed(fake.backend, volumes)
+    # The app's Supabase client sends its requests to the stand-in, in-process
+    database._build_http_client = fake.http_client
+    response_cache.enabled = not args.no_cache
+    token = jwt.encode(
+        {"sub": "benchmark", "role": "service_role", "exp": int(time.time()) + 3600},
+        os.environ["SUPABASE_JWT_SECRET"],
+        algorithm="HS256",
+    )
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        headers = {"X-Supabase-Auth": f"Bearer {token}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://kickoff.local", headers=headers) as client:
+            for name, next_request in scenarios(data, rng).items():
+                # Each scenario draws the same requests whichever scenarios run
+                # before it, so adding one (or --only) leaves the others' baselines valid
+                rng.seed(f"{args.seed}:{name}")
+                if args.only and name not in args.only:
+                    continue
+                # Warm up (connections, caches, compiled serializers) before measuring
+                await run_scenario(client, fake, next_request, args.concurrency, args.concurrency)
+                results[name] = await run_scenario(client, fake, next_request, args.requests, args.concurrency)
+                print(f"{name:24} {json.dumps(results[name])}")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="added to every upstream request")
+    parser.add_argument("--tournaments", type=int, default=4)
+    parser.add_argument("--teams", type=int, default=16, help="teams per tournament")
+    parser.add_argument("--squad", type=int, default=16, help="players per team")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument("--only", nargs="*", help="scenarios to run")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=2.0, help="allowed p95 slowdown factor")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(benchmark(args))
+    key = "no_cache" if args.no_cache else "cached"
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.update_baseline:
+        stored[key] = {**stored.get(key, {}), **results}
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+    regressions = compare(results, stored.get(key, {}), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
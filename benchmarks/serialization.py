@@ -0,0 +1,76 @@
+"""Per-row cost of serializing a list response.
+
+    python -m benchmarks.serialization [rows]
+
+Compares the generic path (validate each row, jsonable_encoder, stdlib json)
+with the compiled adapter path and the trusted-rows path of app.serialization,
+on rows shaped like PostgREST's.
+"""
+import json
+import sys
+import time
+import uuid
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas import Match
+from app.serialization import json_response
+
+
+def match_rows(count: int) -> List[dict]:
+    tournament_id = str(uuid.uuid4())
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "tournament_id": tournament_id,
+            "home_team_id": str(uuid.uuid4()),
+            "away_team_id": str(uuid.uuid4()),
+            "start_time": f"2024-06-{i % 28 + 1:02d}T18:00:00+00:00",
+            "status": "finished",
+            "home_score": i % 4,
+            "away_score": i % 3,
+            "stage": "Group stage",
+            "created_at": "2024-05-01T10:00:00.123456+00:00",
+            "updated_at": "2024-06-01T20:00:00.123456+00:00",
+        }
+        for i in range(count)
+    ]
+
+
+MATCHES = TypeAdapter(List[Match])
+
+
+def generic(rows: List[dict]) -> bytes:
+    # Models out of the rows, then encoded through plain Python objects
+    return json.dumps(jsonable_encoder(MATCHES.validate_python(rows))).encode()
+
+
+def timed(function, rows: List[dict], repeat: int = 20) -> float:
+    function(rows)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(rows)
+        best = min(best, time.perf_counter() - started)
+    return best / len(rows) * 1e6
+
+
+def main(count: int = 2000) -> None:
+    rows = match_rows(count)
+    paths = {
+        "generic (validate + stdlib json)": generic,
+        "compiled adapter": lambda r: json_response(r, Match, trusted=False).body,
+        "trusted rows (orjson)": lambda r: json_response(r, Match, trusted=True).body,
+    }
+    baseline = None
+    print(f"{count} Match rows, best of 20 runs")
+    for name, function in paths.items():
+        per_row = timed(function, rows)
+        baseline = baseline or per_row
+        print(f"  {name:<34} {per_row:7.2f} us/row  {baseline / per_row:5.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,328 @@
+"""Deterministic synthetic tournaments, seeded in batches for capacity testing.
+
+    python -m benchmarks.synthetic [--tournaments 100] [--teams 16] [--squad 23]
+                                   [--backend local|supabase] [--database seed.db]
+                                   [--batch-size 1000] [--concurrency 4] [--seed 1]
+
+Generates tournaments with a group stage and a knockout bracket, full squads,
+finished matches whose scores agree with their goal events, and bookings and
+substitutions with realistic counts and minutes. The same arguments always
+produce the same rows, ids included, so datasets can be rebuilt anywhere.
+
+Rows are streamed: each tournament is generated when its turn comes and
+inserted in batches of ``--batch-size``, with up to ``--concurrency`` batches
+in flight, parents before children. Rows per second are reported per table.
+
+For scale: 1000 tournaments of 32 teams with 25 players make 800k players,
+63k matches and about 1.3M match_events.
+
+``--backend local`` writes to a SQLite file (``--database``) with the schema
+of app/repositories/local.py, ``--backend supabase`` to the project in
+SUPABASE_URL / SUPABASE_KEY, which needs a service-role key to bypass RLS.
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.repositories.base import Backend
+
+Row = Dict[str, Any]
+
+# Insert order: every table only references the ones before it
+TABLES = ("tournaments", "teams", "players", "matches", "match_events")
+SQUAD_POSITIONS = ("GK", "DEF", "DEF", "DEF", "DEF", "MID", "MID", "MID", "FWD", "FWD", "FWD")
+# Relative chance of scoring per position
+SCORING_WEIGHT = {"GK": 0.02, "DEF": 1.0, "MID": 2.5, "FWD": 5.0}
+KNOCKOUT_STAGES = {2: "Final", 4: "Semi-final", 8: "Quarter-final", 16: "Round of 16", 32: "Round of 32"}
+NAMES = (
+    "Ade", "Bruno", "Chen", "Diego", "Emeka", "Felix", "Goran", "Hugo", "Ivan", "Jonas", "Kofi", "Luca",
+    "Mateo", "Nabil", "Omar", "Pavel", "Quinn", "Rafael", "Sami", "Tomas", "Umar", "Viktor", "Yusuf", "Zoran",
+)
+SURNAMES = (
+    "Silva", "Okafor", "Nakamura", "Haddad", "Kowalski", "Jensen", "Moreau", "Rossi", "Petrov", "Mensah",
+    "Garcia", "Novak", "Ibrahim", "Costa", "Larsen", "Tanaka", "Dubois", "Schmidt", "Kariuki", "Alves",
+)
+CITIES = (
+    "Addis", "Bahir", "Dire", "Gondar", "Hawassa", "Jimma", "Mekelle", "Adama", "Dessie", "Harar",
+    "Arba", "Bishoftu", "Sodo", "Shashemene", "Jijiga", "Nekemte", "Debre", "Asosa", "Gambela", "Semera",
+)
+MASCOTS = ("Dragons", "Tigers", "Eagles", "Lions", "Wolves", "Falcons", "Sharks", "Bears", "Rangers", "United")
+
+
+@dataclass
+class Volumes:
+    tournaments: int = 100
+    teams: int = 16
+    squad: int = 23
+    group_size: int = 4
+    # Share of tournaments still being played: their last rounds are scheduled
+    ongoing: float = 0.1
+    seed: int = 1
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    # Knuth's method, fine for the small means of football statistics
+    limit, k, product = math.exp(-mean), 0, rng.random()
+    while product > limit:
+        k += 1
+        product *= rng.random()
+    return k
+
+
+def _minute(rng: random.Random, low: int, mode: int) -> int:
+    """A minute skewed towards ``mode``; a few land in stoppage time."""
+    minute = int(rng.triangular(low, 90, mode))
+    if minute >= 88 and rng.random() < 0.3:
+        minute = 90 + rng.randint(1, 6)
+    return max(minute, 1)
+
+
+class Generator:
+    """Rows of ``volumes``, tournament by tournament, in insert order."""
+
+    def __init__(self, volumes: Volumes):
+        self.volumes = volumes
+        self.rng = random.Random(volumes.seed)
+
+    def rows(self) -> Iterator[Tuple[str, Row]]:
+        for index in range(self.volumes.tournaments):
+            yield from self.tournament(index)
+
+    def tournament(self, index: int) -> Iterator[Tuple[str, Row]]:
+        rng, volumes = self.rng, self.volumes
+        start = date(2000 + index % 25, 1 + rng.randrange(12), 1 + rng.randrange(28))
+        ongoing = index >= volumes.tournaments * (1 - volumes.ongoing)
+        tournament = {
+            "id": _uuid(rng), "name": f"Synthetic Cup {index + 1}", "year": start.year,
+            "status": "ongoing" if ongoing else "completed",
+            "start_date": start.isoformat(), "end_date": (start + timedelta(days=40)).isoformat(),
+        }
+        yield "tournaments", tournament
+
+        teams, squads = [], {}
+        for number in range(volumes.teams):
+            group = chr(ord("A") + number // volumes.group_size)
+            name = f"{CITIES[number % len(CITIES)]} {MASCOTS[number // len(CITIES) % len(MASCOTS)]} {number + 1}"
+            team = {"id": _uuid(rng), "tournament_id": tournament["id"], "name": name, "logo_url": None, "group": group}
+            teams.append(team)
+            yield "teams", team
+            squads[team["id"]] = []
+            for shirt in range(1, volumes.squad + 1):
+                player = {
+                    "id": _uuid(rng), "team_id": team["id"],
+                    "name": f"{rng.choice(NAMES)} {rng.choice(SURNAMES)}",
+                    "position": SQUAD_POSITIONS[(shirt - 1) % len(SQUAD_POSITIONS)], "shirt_number": shirt,
+                }
+                squads[team["id"]].append(player)
+                yield "players", player
+
+        fixtures = self._fixtures(teams)
+        kickoff = datetime(start.year, start.month, start.day, 15, tzinfo=timezone.utc)
+        played_until = len(fixtures) * 2 // 3 if ongoing else len(fixtures)
+        for number, (stage, home, away) in enumerate(fixtures):
+            # Four kick-off slots a day, one fixture per slot
+            start_time = kickoff + timedelta(days=number // 4, hours=number % 4 * 3)
+            match = {
+                "id": _uuid(rng), "tournament_id": tournament["id"], "home_team_id": home["id"],
+                "away_team_id": away["id"], "start_time": start_time.isoformat(), "stage": stage,
+                "status": "scheduled", "home_score": 0, "away_score": 0,
+            }
+            if number >= played_until:
+                yield "matches", match
+                continue
+            events = self._events(match, squads[home["id"]], squads[away["id"]])
+            goals = [e for e in events if e["type"] == "goal"]
+            match["status"] = "finished"
+            match["home_score"] = sum(1 for e in goals if e["team_id"] == home["id"])
+            match["away_score"] = len(goals) - match["home_score"]
+            yield "matches", match
+            for event in events:
+                yield "match_events", event
+
+    def _fixtures(self, teams: List[Row]) -> List[Tuple[str, Row, Row]]:
+        """Group round robins, then a bracket of the top two of each group."""
+        groups: Dict[str, List[Row]] = {}
+        for team in teams:
+            groups.setdefault(team["group"], []).append(team)
+        fixtures = [
+            (f"Group {name}", home, away)
+            for name, members in groups.items()
+            for i, home in enumerate(members) for away in members[i + 1:]
+        ]
+        # Knockout pairings are drawn: the bracket only needs the right number of games
+        bracket = [team for members in groups.values() for team in members[:2]]
+        while len(bracket) >= 2 and len(bracket) in KNOCKOUT_STAGES:
+            self.rng.shuffle(bracket)
+            pairs = list(zip(bracket[::2], bracket[1::2]))
+            fixtures.extend((KNOCKOUT_STAGES[len(bracket)], home, away) for home, away in pairs)
+            bracket = [self.rng.choice(pair) for pair in pairs]
+        return fixtures
+
+    def _events(self, match: Row, home: List[Row], away: List[Row]) -> List[Row]:
+        rng = self.rng
+        events = []
+
+        def event(player: Row, type: str, minute: int) -> None:
+            events.append({
+                "id": _uuid(rng), "match_id": match["id"], "team_id": player["team_id"], "player_id": player["id"],
+                "type": type, "minute": minute, "extra_info": None, "idempotency_key": None,
+            })
+
+        for squad, mean_goals in ((home, 1.5), (away, 1.15)):
+            starters, bench = squad[:11], squad[11:]
+            weights = [SCORING_WEIGHT[player["position"]] for player in starters]
+            # Goals come later in matches on average
+            for _ in range(_poisson(rng, mean_goals)):
+                event(rng.choices(starters, weights)[0], "goal", _minute(rng, 1, 75))
+            booked: Set[str] = set()
+            for _ in range(_poisson(rng, 1.8)):
+                player = rng.choice(starters)
+                minute = _minute(rng, 10, 70)
+                event(player, "yellow_card", minute)
+                if player["id"] in booked:
+                    event(player, "red_card", minute)
+                booked.add(player["id"])
+            if rng.random() < 0.04:
+                event(rng.choice(starters), "red_card", _minute(rng, 15, 60))
+            substitutions = min(rng.randint(3, 5), len(bench), len(starters) - 1)
+            # The goalkeeper stays on
+            for off, on in zip(rng.sample(starters[1:], substitutions), rng.sample(bench, substitutions)):
+                minute = rng.randint(46, 88)
+                event(off, "substitution_out", minute)
+                event(on, "substitution_in", minute)
+        events.sort(key=lambda e: e["minute"])
+        return events
+
+
+class Seeder:
+    """Buffers rows per table and inserts them in batches, parents first.
+
+    Up to ``concurrency`` batches are in flight at once; a batch of a child
+    table waits for every batch of its parent tables, so foreign keys always
+    resolve.
+    """
+
+    def __init__(self, backend: Backend, batch_size: int = 1000, concurrency: int = 4):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.buffers: Dict[str, List[Row]] = {table: [] for table in TABLES}
+        self.pending: Dict[str, Set["asyncio.Task[None]"]] = {table: set() for table in TABLES}
+        self.rows: Dict[str, int] = dict.fromkeys(TABLES, 0)
+        self.seconds: Dict[str, float] = dict.fromkeys(TABLES, 0.0)
+        self.batches = 0
+
+    async def add(self, table: str, row: Row) -> None:
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            await self.flush(table)
+
+    async def flush(self, table: str) -> None:
+        """Sends ``table``'s buffer, after everything buffered for its parents."""
+        for parent in TABLES[:TABLES.index(table)]:
+            await self._send(parent)
+            if self.pending[parent]:
+                await asyncio.gather(*self.pending[parent])
+        await self._send(table)
+
+    async def close(self) -> None:
+        for table in TABLES:
+            await self.flush(table)
+        await asyncio.gather(*(task for tasks in self.pending.values() for task in tasks))
+
+    async def _send(self, table: str) -> None:
+        if not self.buffers[table]:
+            return
+        while sum(len(tasks) for tasks in self.pending.values()) >= self.concurrency:
+            await asyncio.wait(
+                [task for tasks in self.pending.values() for task in tasks], return_when=asyncio.FIRST_COMPLETED
+            )
+        batch, self.buffers[table] = self.buffers[table], []
+        task = asyncio.ensure_future(self._insert(table, batch))
+        self.pending[table].add(task)
+        task.add_done_callback(self.pending[table].discard)
+
+    async def _insert(self, table: str, batch: List[Row]) -> None:
+        started = time.perf_counter()
+        await self.backend.insert(table, batch)
+        self.seconds[table] += time.perf_counter() - started
+        self.rows[table] += len(batch)
+        self.batches += 1
+
+
+async def seed(backend: Backend, volumes: Volumes, batch_size: int = 1000, concurrency: int = 4,
+               progress: Optional[float] = None) -> Seeder:
+    """Inserts the rows of ``volumes``; ``progress`` prints a line every so many seconds."""
+    seeder = Seeder(backend, batch_size, concurrency)
+    started = last = time.perf_counter()
+    for table, row in Generator(volumes).rows():
+        await seeder.add(table, row)
+        if progress and time.perf_counter() - last >= progress:
+            last = time.perf_counter()
+            total = sum(seeder.rows.values())
+            print(f"  {total:>10} rows, {total / (last - started):,.0f} rows/s")
+    await seeder.close()
+    return seeder
+
+
+def report(seeder: Seeder, elapsed: float) -> None:
+    print(f"{'table':14} {'rows':>10} {'insert s':>9} {'rows/s':>10}")
+    for table in TABLES:
+        rows, seconds = seeder.rows[table], seeder.seconds[table]
+        print(f"{table:14} {rows:>10} {seconds:>9.2f} {rows / seconds if seconds else 0:>10,.0f}")
+    total = sum(seeder.rows.values())
+    print(f"{'total':14} {total:>10} {elapsed:>9.2f} {total / elapsed if elapsed else 0:>10,.0f}"
+          f"  ({seeder.batches} batches, wall clock)")
+
+
+async def _main(args) -> None:
+    if args.backend == "local":
+        from app.repositories.local import LocalBackend
+
+        backend: Backend = LocalBackend(args.database)
+    else:
+        from app.database import connect
+        from app.repositories.supabase import SupabaseBackend
+
+        backend = SupabaseBackend(await connect())
+    volumes = Volumes(args.tournaments, args.teams, args.squad, args.group_size, args.ongoing, args.seed)
+    started = time.perf_counter()
+    try:
+        seeder = await seed(backend, volumes, args.batch_size, args.concurrency, progress=5.0)
+    finally:
+        await backend.close()
+        if args.backend == "supabase":
+            from app.database import disconnect
+
+            await disconnect()
+    report(seeder, time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tournaments", type=int, default=Volumes.tournaments)
+    parser.add_argument("--teams", type=int, default=Volumes.teams, help="teams per tournament")
+    parser.add_argument("--squad", type=int, default=Volumes.squad, help="players per team")
+    parser.add_argument("--group-size", type=int, default=Volumes.group_size)
+    parser.add_argument("--ongoing", type=float, default=Volumes.ongoing, help="share of unfinished tournaments")
+    parser.add_argument("--seed", type=int, default=Volumes.seed)
+    parser.add_argument("--backend", choices=("local", "supabase"), default="local")
+    parser.add_argument("--database", default="synthetic.db", help="SQLite file for --backend local")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4, help="batches in flight")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+-- Secondary indexes matching the API's filter + sort patterns.
+-- Safe to re-run on an existing project.
+
+-- GET /tournaments/ orders by created_at desc
+create index if not exists tournaments_created_at_idx on public.tournaments (created_at desc);
+
+-- GET /teams/?tournament_id= orders by name; standings read teams per tournament
+create index if not exists teams_tournament_id_name_idx on public.teams (tournament_id, name);
+create index if not exists teams_name_idx on public.teams (name);
+
+-- GET /players/?team_id= orders by shirt_number
+create index if not exists players_team_id_shirt_number_idx on public.players (team_id, shirt_number);
+create index if not exists players_shirt_number_idx on public.players (shirt_number);
+
+-- GET /matches/ filters by tournament_id and/or status and orders by start_time;
+-- standings read finished matches per tournament
+create index if not exists matches_tournament_id_status_start_time_idx on public.matches (tournament_id, status, start_time);
+create index if not exists matches_tournament_id_start_time_idx on public.matches (tournament_id, start_time);
+create index if not exists matches_status_start_time_idx on public.matches (status, start_time);
+create index if not exists matches_start_time_idx on public.matches (start_time);
+-- Foreign keys without an index make team deletes scan matches
+create index if not exists matches_home_team_id_idx on public.matches (home_team_id);
+create index if not exists matches_away_team_id_idx on public.matches (away_team_id);
+
+-- GET /events/?match_id= orders by minute
+create index if not exists match_events_match_id_minute_idx on public.match_events (match_id, minute);
+create index if not exists match_events_team_id_idx on public.match_events (team_id);
+create index if not exists match_events_player_id_idx on public.match_events (player_id);
@@ -0,0 +1,51 @@
+-- Standings aggregate computed inside Postgres, called through supabase.rpc("tournament_standings").
+-- Returns one row per team instead of shipping every finished match to the API.
+create or replace function public.tournament_standings(p_tournament_id uuid)
+returns table (
+  team_id uuid,
+  team_name text,
+  played integer,
+  won integer,
+  drawn integer,
+  lost integer,
+  goals_for integer,
+  goals_against integer,
+  goal_difference integer,
+  points integer
+)
+language sql
+stable
+as $$
+  with results as (
+    select home_team_id as team_id, coalesce(home_score, 0) as gf, coalesce(away_score, 0) as ga
+    from public.matches
+    where tournament_id = p_tournament_id and status = 'finished'
+    union all
+    select away_team_id, coalesce(away_score, 0), coalesce(home_score, 0)
+    from public.matches
+    where tournament_id = p_tournament_id and status = 'finished'
+  ),
+  totals as (
+    select
+      t.id as team_id,
+      t.name as team_name,
+      count(r.team_id)::integer as played,
+      (count(*) filter (where r.gf > r.ga))::integer as won,
+      (count(*) filter (where r.gf = r.ga))::integer as drawn,
+      (count(*) filter (where r.gf < r.ga))::integer as lost,
+      coalesce(sum(r.gf), 0)::integer as goals_for,
+      coalesce(sum(r.ga), 0)::integer as goals_against
+    from public.teams t
+    left join results r on r.team_id = t.id
+    where t.tournament_id = p_tournament_id
+    group by t.id, t.name
+  )
+  select
+    team_id, team_name, played, won, drawn, lost, goals_for, goals_against,
+    goals_for - goals_against as goal_difference,
+    won * 3 + drawn as points
+  from totals
+  order by points desc, goal_difference desc, goals_for desc, team_name;
+$$;
+
+grant execute on function public.tournament_standings(uuid) to anon, authenticated;
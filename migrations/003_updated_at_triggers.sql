@@ -0,0 +1,25 @@
+-- Keep updated_at current on every update so it can drive ETag / Last-Modified.
+-- match_events had no updated_at column; it is added and backfilled from created_at.
+alter table public.match_events add column if not exists updated_at timestamptz default now();
+update public.match_events set updated_at = created_at where updated_at is null or updated_at < created_at;
+
+create or replace function public.set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at = now();
+  return new;
+end;
+$$;
+
+drop trigger if exists set_updated_at on public.tournaments;
+create trigger set_updated_at before update on public.tournaments for each row execute function public.set_updated_at();
+drop trigger if exists set_updated_at on public.teams;
+create trigger set_updated_at before update on public.teams for each row execute function public.set_updated_at();
+drop trigger if exists set_updated_at on public.players;
+create trigger set_updated_at before update on public.players for each row execute function public.set_updated_at();
+drop trigger if exists set_updated_at on public.matches;
+create trigger set_updated_at before update on public.matches for each row execute function public.set_updated_at();
+drop trigger if exists set_updated_at on public.match_events;
+create trigger set_updated_at before update on public.match_events for each row execute function public.set_updated_at();
@@ -0,0 +1,16 @@
+-- Lookup indexes for the natural keys the bulk upsert endpoints
+-- (POST /teams/bulk?upsert=true etc.) match existing rows on.
+-- They are not unique: single creates keep accepting duplicates, and an
+-- upsert item matching several rows is reported as an error.
+
+-- (tournament_id, name) and (team_id, shirt_number) are the indexes from 001.
+-- Earlier versions of this migration replaced them with unique ones; running
+-- it again puts the plain ones back.
+create index if not exists teams_tournament_id_name_idx on public.teams (tournament_id, name);
+drop index if exists public.teams_tournament_id_name_key;
+
+create index if not exists players_team_id_shirt_number_idx on public.players (team_id, shirt_number);
+drop index if exists public.players_team_id_shirt_number_key;
+
+create index if not exists matches_natural_key_idx on public.matches (tournament_id, home_team_id, away_team_id, start_time);
+drop index if exists public.matches_natural_key;
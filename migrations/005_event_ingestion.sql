@@ -0,0 +1,170 @@
+-- Event writes that keep the match score current, each in one transaction:
+-- goal events add to the score of their team's side, and updates/deletes take
+-- the old contribution back off. The match row is locked first, so operators
+-- logging goals for the same match at once can't lose an update.
+-- Called through supabase.rpc(...) by app/routers/events.py (EVENTS_RPC).
+
+-- Client-chosen key making event creation retry-safe
+alter table public.match_events add column if not exists idempotency_key text;
+create unique index if not exists match_events_idempotency_key on public.match_events (match_id, idempotency_key);
+
+create or replace function public.goal_delta(p_type text, p_team_id uuid, p_side_team_id uuid)
+returns integer
+language sql
+immutable
+as $$
+  select case when p_type = 'goal' and p_team_id = p_side_team_id then 1 else 0 end;
+$$;
+
+-- Returns no row when the match doesn't exist. With a known idempotency key the
+-- existing event is returned with created = false and nothing is written.
+create or replace function public.record_match_event(p_event jsonb)
+returns table (event jsonb, match jsonb, previous jsonb, created boolean)
+language plpgsql
+as $$
+declare
+  v_previous public.matches;
+  v_match public.matches;
+  v_event public.match_events;
+  v_home integer;
+  v_away integer;
+begin
+  select * into v_previous from public.matches where id = (p_event->>'match_id')::uuid for update;
+  if not found then
+    return;
+  end if;
+
+  if p_event->>'idempotency_key' is not null then
+    select * into v_event from public.match_events
+    where match_id = v_previous.id and idempotency_key = p_event->>'idempotency_key';
+    if found then
+      return query select to_jsonb(v_event), to_jsonb(v_previous), to_jsonb(v_previous), false;
+      return;
+    end if;
+  end if;
+
+  insert into public.match_events (match_id, team_id, player_id, type, minute, extra_info, idempotency_key)
+  values (
+    v_previous.id,
+    (p_event->>'team_id')::uuid,
+    (p_event->>'player_id')::uuid,
+    p_event->>'type',
+    (p_event->>'minute')::integer,
+    nullif(p_event->'extra_info', 'null'::jsonb),
+    p_event->>'idempotency_key'
+  )
+  returning * into v_event;
+
+  v_home := public.goal_delta(v_event.type, v_event.team_id, v_previous.home_team_id);
+  v_away := public.goal_delta(v_event.type, v_event.team_id, v_previous.away_team_id);
+  if v_home <> 0 or v_away <> 0 or v_previous.status = 'scheduled' then
+    update public.matches set
+      home_score = coalesce(home_score, 0) + v_home,
+      away_score = coalesce(away_score, 0) + v_away,
+      status = case when status = 'scheduled' then 'live' else status end
+    where id = v_previous.id
+    returning * into v_match;
+  else
+    v_match := v_previous;
+  end if;
+
+  return query select to_jsonb(v_event), to_jsonb(v_match), to_jsonb(v_previous), true;
+end;
+$$;
+
+-- Applies the fields present in p_changes. Returns no row when the event doesn't exist.
+create or replace function public.update_match_event(p_event_id uuid, p_changes jsonb)
+returns table (event jsonb, match jsonb, previous jsonb, created boolean)
+language plpgsql
+as $$
+declare
+  v_old public.match_events;
+  v_event public.match_events;
+  v_previous public.matches;
+  v_match public.matches;
+  v_home integer;
+  v_away integer;
+begin
+  select * into v_previous from public.matches
+  where id = (select match_id from public.match_events where id = p_event_id)
+  for update;
+  if not found then
+    return;
+  end if;
+  -- Read under the match lock, so a concurrent write to it has completed
+  select * into v_old from public.match_events where id = p_event_id;
+  if not found then
+    return;
+  end if;
+
+  update public.match_events set
+    type = coalesce(p_changes->>'type', type),
+    minute = coalesce((p_changes->>'minute')::integer, minute),
+    extra_info = case when p_changes ? 'extra_info' then nullif(p_changes->'extra_info', 'null'::jsonb) else extra_info end,
+    team_id = case when p_changes ? 'team_id' then (p_changes->>'team_id')::uuid else team_id end,
+    player_id = case when p_changes ? 'player_id' then (p_changes->>'player_id')::uuid else player_id end
+  where id = p_event_id
+  returning * into v_event;
+
+  v_home := public.goal_delta(v_event.type, v_event.team_id, v_previous.home_team_id)
+          - public.goal_delta(v_old.type, v_old.team_id, v_previous.home_team_id);
+  v_away := public.goal_delta(v_event.type, v_event.team_id, v_previous.away_team_id)
+          - public.goal_delta(v_old.type, v_old.team_id, v_previous.away_team_id);
+  if v_home <> 0 or v_away <> 0 then
+    update public.matches set
+      home_score = greatest(coalesce(home_score, 0) + v_home, 0),
+      away_score = greatest(coalesce(away_score, 0) + v_away, 0)
+    where id = v_previous.id
+    returning * into v_match;
+  else
+    v_match := v_previous;
+  end if;
+
+  return query select to_jsonb(v_event), to_jsonb(v_match), to_jsonb(v_previous), false;
+end;
+$$;
+
+-- Returns the deleted event, or no row when it doesn't exist.
+create or replace function public.delete_match_event(p_event_id uuid)
+returns table (event jsonb, match jsonb, previous jsonb, created boolean)
+language plpgsql
+as $$
+declare
+  v_event public.match_events;
+  v_previous public.matches;
+  v_match public.matches;
+  v_home integer;
+  v_away integer;
+begin
+  select * into v_previous from public.matches
+  where id = (select match_id from public.match_events where id = p_event_id)
+  for update;
+  if not found then
+    return;
+  end if;
+
+  delete from public.match_events where id = p_event_id returning * into v_event;
+  if not found then
+    return;
+  end if;
+
+  v_home := public.goal_delta(v_event.type, v_event.team_id, v_previous.home_team_id);
+  v_away := public.goal_delta(v_event.type, v_event.team_id, v_previous.away_team_id);
+  if v_home <> 0 or v_away <> 0 then
+    update public.matches set
+      home_score = greatest(coalesce(home_score, 0) - v_home, 0),
+      away_score = greatest(coalesce(away_score, 0) - v_away, 0)
+    where id = v_previous.id
+    returning * into v_match;
+  else
+    v_match := v_previous;
+  end if;
+
+  return query select to_jsonb(v_event), to_jsonb(v_match), to_jsonb(v_previous), false;
+end;
+$$;
+
+-- Security invoker: the row level security policies on the tables still apply
+grant execute on function public.record_match_event(jsonb) to authenticated, service_role;
+grant execute on function public.update_match_event(uuid, jsonb) to authenticated, service_role;
+grant execute on function public.delete_match_event(uuid) to authenticated, service_role;
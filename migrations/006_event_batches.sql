@@ -0,0 +1,21 @@
+-- Batched form of record_match_event for the write-behind event queue
+-- (app/event_queue.py, EVENTS_WRITE_BEHIND): a whole flush is recorded in one
+-- call and one transaction, each event in array order, so the events of a
+-- match are applied in the order they were acknowledged.
+
+create or replace function public.record_match_events(p_events jsonb)
+returns table (event jsonb, match jsonb, previous jsonb, created boolean)
+language plpgsql
+as $$
+declare
+  v_item jsonb;
+begin
+  for v_item in
+    select value from jsonb_array_elements(p_events) with ordinality as item(value, position) order by position
+  loop
+    return query select * from public.record_match_event(v_item);
+  end loop;
+end;
+$$;
+
+grant execute on function public.record_match_events(jsonb) to authenticated, service_role;
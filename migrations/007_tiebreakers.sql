@@ -0,0 +1,11 @@
+-- Per-tournament ranking criteria for the standings, in order (app/tiebreakers.py).
+-- Null keeps the default: points, goal difference, goals for.
+-- The tournament_standings function keeps ordering by the default; tournaments
+-- with their own tiebreakers are ranked by the API from their matches.
+alter table public.tournaments add column if not exists tiebreakers text[];
+
+alter table public.tournaments drop constraint if exists tournaments_tiebreakers_check;
+alter table public.tournaments add constraint tournaments_tiebreakers_check check (tiebreakers <@ array[
+  'points', 'goal_difference', 'goals_for', 'head_to_head_points', 'head_to_head_goal_difference',
+  'head_to_head_goals_for', 'away_goals', 'fair_play'
+]);
@@ -1,11 +1,14 @@
 """
 Direct database population script using Supabase client.
 This bypasses the API authentication and adds data directly to Supabase.
+For production-sized datasets use ``python -m benchmarks.synthetic`` instead.
 """
-from app.database import supabase
+from app.database import create_sync_client
 from datetime import datetime
 import sys
 
+supabase = create_sync_client()
+
 print("=" * 60)
 print("Adding sample data directly to Supabase database...")
 print("=" * 60)
@@ -40,15 +43,11 @@ try:
         {"name": "Yellow Lions", "tournament_id": tournament_id, "group": "B"}
     ]
     
-    teams = []
-    for team_data in teams_data:
-        response = supabase.table("teams").insert(team_data).execute()
-        if response.data:
-            team = response.data[0]
-            teams.append(team)
-            print(f"✅ Team created: {team['name']} (Group {team.get('group', 'N/A')})")
-        else:
-            print(f"❌ Failed to create team: {team_data['name']}")
+    # One insert per table; rows come back in the order they were sent
+    response = supabase.table("teams").insert(teams_data).execute()
+    teams = response.data
+    for team in teams:
+        print(f"✅ Team created: {team['name']} (Group {team.get('group', 'N/A')})")
 
     # 3. Create players for each team
     print("\n3. Creating players...")
@@ -67,16 +66,14 @@ try:
         ]
     }
     
-    for team in teams[:2]:  # Add players to first 2 teams
-        team_name = team['name']
-        if team_name in player_names:
-            print(f"\n   Adding players to {team_name}:")
-            for player_data in player_names[team_name]:
-                player_data['team_id'] = team['id']
-                response = supabase.table("players").insert(player_data).execute()
-                if response.data:
-                    player = response.data[0]
-                    print(f"   ✅ {player['name']} #{player['shirt_number']} ({player.get('position', 'N/A')})")
+    players_data = [
+        {**player_data, "team_id": team['id']}
+        for team in teams[:2]  # Add players to first 2 teams
+        for player_data in player_names.get(team['name'], [])
+    ]
+    response = supabase.table("players").insert(players_data).execute()
+    for player in response.data:
+        print(f"   ✅ {player['name']} #{player['shirt_number']} ({player.get('position', 'N/A')})")
 
     # 4. Create matches
     print("\n4. Creating matches...")
@@ -103,13 +100,11 @@ try:
         }
     ]
     
-    for match_data in matches_data:
-        response = supabase.table("matches").insert(match_data).execute()
-        if response.data:
-            match = response.data[0]
-            home_team = next(t for t in teams if t['id'] == match['home_team_id'])
-            away_team = next(t for t in teams if t['id'] == match['away_team_id'])
-            print(f"✅ Match: {home_team['name']} {match['home_score']} - {match['away_score']} {away_team['name']}")
+    response = supabase.table("matches").insert(matches_data).execute()
+    for match in response.data:
+        home_team = next(t for t in teams if t['id'] == match['home_team_id'])
+        away_team = next(t for t in teams if t['id'] == match['away_team_id'])
+        print(f"✅ Match: {home_team['name']} {match['home_score']} - {match['away_score']} {away_team['name']}")
 
     # 5. Fetch and display standings
     print("\n5. Fetching standings...")
@@ -9,6 +9,11 @@ create table public.tournaments (
   status text not null check (status in ('upcoming', 'ongoing', 'completed')),
   start_date date,
   end_date date,
+  -- Ranking criteria of the standings in order (app/tiebreakers.py); null for the default
+  tiebreakers text[] check (tiebreakers <@ array[
+    'points', 'goal_difference', 'goals_for', 'head_to_head_points', 'head_to_head_goal_difference',
+    'head_to_head_goals_for', 'away_goals', 'fair_play'
+  ]),
   created_at timestamptz default now(),
   updated_at timestamptz default now()
 );
@@ -59,7 +64,9 @@ create table public.match_events (
   type text not null check (type in ('goal', 'yellow_card', 'red_card', 'substitution_in', 'substitution_out')),
   minute integer not null,
   extra_info jsonb,
-  created_at timestamptz default now()
+  idempotency_key text,
+  created_at timestamptz default now(),
+  updated_at timestamptz default now()
 );
 
 -- Enable Row Level Security (RLS)
@@ -99,3 +106,295 @@ create policy "Admins can delete matches" on public.matches for delete to authen
 create policy "Admins can insert match_events" on public.match_events for insert to authenticated with check (true);
 create policy "Admins can update match_events" on public.match_events for update to authenticated using (true);
 create policy "Admins can delete match_events" on public.match_events for delete to authenticated using (true);
+
+-- Indexes and functions (also shipped as migrations/ for existing projects)
+
+-- GET /tournaments/ orders by created_at desc
+create index if not exists tournaments_created_at_idx on public.tournaments (created_at desc);
+
+-- GET /teams/?tournament_id= orders by name; standings read teams per tournament.
+-- Also the natural key bulk upserts look rows up by (same for players)
+create index if not exists teams_tournament_id_name_idx on public.teams (tournament_id, name);
+create index if not exists teams_name_idx on public.teams (name);
+
+-- GET /players/?team_id= orders by shirt_number
+create index if not exists players_team_id_shirt_number_idx on public.players (team_id, shirt_number);
+create index if not exists players_shirt_number_idx on public.players (shirt_number);
+
+-- GET /matches/ filters by tournament_id and/or status and orders by start_time;
+-- standings read finished matches per tournament
+create index if not exists matches_tournament_id_status_start_time_idx on public.matches (tournament_id, status, start_time);
+create index if not exists matches_tournament_id_start_time_idx on public.matches (tournament_id, start_time);
+create index if not exists matches_status_start_time_idx on public.matches (status, start_time);
+create index if not exists matches_start_time_idx on public.matches (start_time);
+-- Natural key bulk upserts look rows up by
+create index if not exists matches_natural_key_idx on public.matches (tournament_id, home_team_id, away_team_id, start_time);
+-- Foreign keys without an index make team deletes scan matches
+create index if not exists matches_home_team_id_idx on public.matches (home_team_id);
+create index if not exists matches_away_team_id_idx on public.matches (away_team_id);
+
+-- GET /events/?match_id= orders by minute
+create index if not exists match_events_match_id_minute_idx on public.match_events (match_id, minute);
+create index if not exists match_events_team_id_idx on public.match_events (team_id);
+create index if not exists match_events_player_id_idx on public.match_events (player_id);
+
+-- Standings aggregate computed inside Postgres, called through supabase.rpc("tournament_standings").
+-- Returns one row per team instead of shipping every finished match to the API.
+create or replace function public.tournament_standings(p_tournament_id uuid)
+returns table (
+  team_id uuid,
+  team_name text,
+  played integer,
+  won integer,
+  drawn integer,
+  lost integer,
+  goals_for integer,
+  goals_against integer,
+  goal_difference integer,
+  points integer
+)
+language sql
+stable
+as $$
+  with results as (
+    select home_team_id as team_id, coalesce(home_score, 0) as gf, coalesce(away_score, 0) as ga
+    from public.matches
+    where tournament_id = p_tournament_id and status = 'finished'
+    union all
+    select away_team_id, coalesce(away_score, 0), coalesce(home_score, 0)
+    from public.matches
+    where tournament_id = p_tournament_id and status = 'finished'
+  ),
+  totals as (
+    select
+      t.id as team_id,
+      t.name as team_name,
+      count(r.team_id)::integer as played,
+      (count(*) filter (where r.gf > r.ga))::integer as won,
+      (count(*) filter (where r.gf = r.ga))::integer as drawn,
+      (count(*) filter (where r.gf < r.ga))::integer as lost,
+      coalesce(sum(r.gf), 0)::integer as goals_for,
+      coalesce(sum(r.ga), 0)::integer as goals_against
+    from public.teams t
+    left join results r on r.team_id = t.id
+    where t.tournament_id = p_tournament_id
+    group by t.id, t.name
+  )
+  select
+    team_id, team_name, played, won, drawn, lost, goals_for, goals_against,
+    goals_for - goals_against as goal_difference,
+    won * 3 + drawn as points
+  from totals
+  order by points desc, goal_difference desc, goals_for desc, team_name;
+$$;
+
+grant execute on function public.tournament_standings(uuid) to anon, authenticated;
+
+-- Keep updated_at current on every update (drives ETag / Last-Modified)
+create or replace function public.set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at = now();
+  return new;
+end;
+$$;
+
+create trigger set_updated_at before update on public.tournaments for each row execute function public.set_updated_at();
+create trigger set_updated_at before update on public.teams for each row execute function public.set_updated_at();
+create trigger set_updated_at before update on public.players for each row execute function public.set_updated_at();
+create trigger set_updated_at before update on public.matches for each row execute function public.set_updated_at();
+create trigger set_updated_at before update on public.match_events for each row execute function public.set_updated_at();
+
+-- Event writes that keep the match score current, each in one transaction:
+-- goal events add to the score of their team's side, and updates/deletes take
+-- the old contribution back off. The match row is locked first, so operators
+-- logging goals for the same match at once can't lose an update.
+-- Called through supabase.rpc(...) by app/routers/events.py (EVENTS_RPC).
+
+-- Client-chosen key making event creation retry-safe
+create unique index if not exists match_events_idempotency_key on public.match_events (match_id, idempotency_key);
+
+create or replace function public.goal_delta(p_type text, p_team_id uuid, p_side_team_id uuid)
+returns integer
+language sql
+immutable
+as $$
+  select case when p_type = 'goal' and p_team_id = p_side_team_id then 1 else 0 end;
+$$;
+
+-- Returns no row when the match doesn't exist. With a known idempotency key the
+-- existing event is returned with created = false and nothing is written.
+create or replace function public.record_match_event(p_event jsonb)
+returns table (event jsonb, match jsonb, previous jsonb, created boolean)
+language plpgsql
+as $$
+declare
+  v_previous public.matches;
+  v_match public.matches;
+  v_event public.match_events;
+  v_home integer;
+  v_away integer;
+begin
+  select * into v_previous from public.matches where id = (p_event->>'match_id')::uuid for update;
+  if not found then
+    return;
+  end if;
+
+  if p_event->>'idempotency_key' is not null then
+    select * into v_event from public.match_events
+    where match_id = v_previous.id and idempotency_key = p_event->>'idempotency_key';
+    if found then
+      return query select to_jsonb(v_event), to_jsonb(v_previous), to_jsonb(v_previous), false;
+      return;
+    end if;
+  end if;
+
+  insert into public.match_events (match_id, team_id, player_id, type, minute, extra_info, idempotency_key)
+  values (
+    v_previous.id,
+    (p_event->>'team_id')::uuid,
+    (p_event->>'player_id')::uuid,
+    p_event->>'type',
+    (p_event->>'minute')::integer,
+    nullif(p_event->'extra_info', 'null'::jsonb),
+    p_event->>'idempotency_key'
+  )
+  returning * into v_event;
+
+  v_home := public.goal_delta(v_event.type, v_event.team_id, v_previous.home_team_id);
+  v_away := public.goal_delta(v_event.type, v_event.team_id, v_previous.away_team_id);
+  if v_home <> 0 or v_away <> 0 or v_previous.status = 'scheduled' then
+    update public.matches set
+      home_score = coalesce(home_score, 0) + v_home,
+      away_score = coalesce(away_score, 0) + v_away,
+      status = case when status = 'scheduled' then 'live' else status end
+    where id = v_previous.id
+    returning * into v_match;
+  else
+    v_match := v_previous;
+  end if;
+
+  return query select to_jsonb(v_event), to_jsonb(v_match), to_jsonb(v_previous), true;
+end;
+$$;
+
+-- Applies the fields present in p_changes. Returns no row when the event doesn't exist.
+create or replace function public.update_match_event(p_event_id uuid, p_changes jsonb)
+returns table (event jsonb, match jsonb, previous jsonb, created boolean)
+language plpgsql
+as $$
+declare
+  v_old public.match_events;
+  v_event public.match_events;
+  v_previous public.matches;
+  v_match public.matches;
+  v_home integer;
+  v_away integer;
+begin
+  select * into v_previous from public.matches
+  where id = (select match_id from public.match_events where id = p_event_id)
+  for update;
+  if not found then
+    return;
+  end if;
+  -- Read under the match lock, so a concurrent write to it has completed
+  select * into v_old from public.match_events where id = p_event_id;
+  if not found then
+    return;
+  end if;
+
+  update public.match_events set
+    type = coalesce(p_changes->>'type', type),
+    minute = coalesce((p_changes->>'minute')::integer, minute),
+    extra_info = case when p_changes ? 'extra_info' then nullif(p_changes->'extra_info', 'null'::jsonb) else extra_info end,
+    team_id = case when p_changes ? 'team_id' then (p_changes->>'team_id')::uuid else team_id end,
+    player_id = case when p_changes ? 'player_id' then (p_changes->>'player_id')::uuid else player_id end
+  where id = p_event_id
+  returning * into v_event;
+
+  v_home := public.goal_delta(v_event.type, v_event.team_id, v_previous.home_team_id)
+          - public.goal_delta(v_old.type, v_old.team_id, v_previous.home_team_id);
+  v_away := public.goal_delta(v_event.type, v_event.team_id, v_previous.away_team_id)
+          - public.goal_delta(v_old.type, v_old.team_id, v_previous.away_team_id);
+  if v_home <> 0 or v_away <> 0 then
+    update public.matches set
+      home_score = greatest(coalesce(home_score, 0) + v_home, 0),
+      away_score = greatest(coalesce(away_score, 0) + v_away, 0)
+    where id = v_previous.id
+    returning * into v_match;
+  else
+    v_match := v_previous;
+  end if;
+
+  return query select to_jsonb(v_event), to_jsonb(v_match), to_jsonb(v_previous), false;
+end;
+$$;
+
+-- Returns the deleted event, or no row when it doesn't exist.
+create or replace function public.delete_match_event(p_event_id uuid)
+returns table (event jsonb, match jsonb, previous jsonb, created boolean)
+language plpgsql
+as $$
+declare
+  v_event public.match_events;
+  v_previous public.matches;
+  v_match public.matches;
+  v_home integer;
+  v_away integer;
+begin
+  select * into v_previous from public.matches
+  where id = (select match_id from public.match_events where id = p_event_id)
+  for update;
+  if not found then
+    return;
+  end if;
+
+  delete from public.match_events where id = p_event_id returning * into v_event;
+  if not found then
+    return;
+  end if;
+
+  v_home := public.goal_delta(v_event.type, v_event.team_id, v_previous.home_team_id);
+  v_away := public.goal_delta(v_event.type, v_event.team_id, v_previous.away_team_id);
+  if v_home <> 0 or v_away <> 0 then
+    update public.matches set
+      home_score = greatest(coalesce(home_score, 0) - v_home, 0),
+      away_score = greatest(coalesce(away_score, 0) - v_away, 0)
+    where id = v_previous.id
+    returning * into v_match;
+  else
+    v_match := v_previous;
+  end if;
+
+  return query select to_jsonb(v_event), to_jsonb(v_match), to_jsonb(v_previous), false;
+end;
+$$;
+
+-- Security invoker: the row level security policies on the tables still apply
+grant execute on function public.record_match_event(jsonb) to authenticated, service_role;
+grant execute on function public.update_match_event(uuid, jsonb) to authenticated, service_role;
+grant execute on function public.delete_match_event(uuid) to authenticated, service_role;
+
+-- Batched form of record_match_event for the write-behind event queue
+-- (app/event_queue.py, EVENTS_WRITE_BEHIND): a whole flush is recorded in one
+-- call and one transaction, each event in array order, so the events of a
+-- match are applied in the order they were acknowledged.
+
+create or replace function public.record_match_events(p_events jsonb)
+returns table (event jsonb, match jsonb, previous jsonb, created boolean)
+language plpgsql
+as $$
+declare
+  v_item jsonb;
+begin
+  for v_item in
+    select value from jsonb_array_elements(p_events) with ordinality as item(value, position) order by position
+  loop
+    return query select * from public.record_match_event(v_item);
+  end loop;
+end;
+$$;
+
+grant execute on function public.record_match_events(jsonb) to authenticated, service_role;
@@ -0,0 +1,104 @@
+import asyncio
+import os
+
+# Run the suite against the in-process backend so it needs no Supabase project
+os.environ.setdefault("DATA_BACKEND", "local")
+os.environ.setdefault("LOCAL_DATABASE_PATH", ":memory:")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.cache import response_cache
+from app.dependencies import verify_admin
+from app.leaderboards import leaderboard_store
+from app.main import app
+from app.match_center import match_center_store
+from app.standings import standings_store
+
+
+@pytest.fixture
+def client():
+    # Entering the client runs the lifespan, which gives every test a fresh local database,
+    # so the in-process caches built on top of it are reset too
+    standings_store.clear()
+    leaderboard_store.clear()
+    match_center_store.clear()
+    asyncio.run(response_cache.clear())
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def admin_client(client):
+    app.dependency_overrides[verify_admin] = lambda: {"id": "test-admin"}
+    yield client
+    app.dependency_overrides.pop(verify_admin, None)
+
+
+@pytest.fixture
+def tournament(admin_client):
+    response = admin_client.post("/tournaments/", json={"name": "Test Cup", "year": 2024, "status": "ongoing"})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+def teams(admin_client, tournament):
+    created = []
+    for name, group in [("Red Dragons", "A"), ("Blue Tigers", "A"), ("Green Eagles", "B"), ("Yellow Lions", "B")]:
+        response = admin_client.post("/teams/", json={"name": name, "tournament_id": tournament["id"], "group": group})
+        assert response.status_code == 200
+        created.append(response.json())
+    return created
+
+
+@pytest.fixture
+def create_match(admin_client, tournament):
+    """Creates a match of the tournament; ``fields`` override the defaults (scheduled, 1 June 2024)."""
+    def create(home, away, **fields):
+        response = admin_client.post("/matches/", json={
+            "tournament_id": tournament["id"], "home_team_id": home["id"], "away_team_id": away["id"],
+            "start_time": "2024-06-01T18:00:00Z", **fields,
+        })
+        assert response.status_code == 200
+        return response.json()
+    return create
+
+
+@pytest.fixture
+def play_match(create_match):
+    """Creates a match with a score, finished unless ``status`` says otherwise."""
+    def play(home, away, home_score, away_score, status="finished", start="2024-02-01T15:00:00+00:00"):
+        return create_match(home, away, home_score=home_score, away_score=away_score, status=status, start_time=start)
+    return play
+
+
+@pytest.fixture
+def create_player(admin_client):
+    def create(team, name, number):
+        response = admin_client.post("/players/", json={"name": name, "team_id": team["id"], "shirt_number": number})
+        assert response.status_code == 200
+        return response.json()
+    return create
+
+
+@pytest.fixture
+def create_event(admin_client):
+    """Records an event of ``player`` (and their team)."""
+    def create(match, player, type, minute):
+        response = admin_client.post("/events/", json={
+            "match_id": match["id"], "team_id": player["team_id"], "player_id": player["id"], "type": type, "minute": minute,
+        })
+        assert response.status_code == 200
+        return response.json()
+    return create
+
+
+@pytest.fixture
+def table_rows(client):
+    """The standings table of a tournament, as served."""
+    def rows(tournament):
+        response = client.get(f"/standings/{tournament['id']}")
+        assert response.status_code == 200
+        return response.json()
+    return rows
@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import jwt
+import pytest
+
+from app.auth import Forbidden, InvalidToken, TokenVerifier, token_verifier
+
+SECRET = "test-jwt-secret-with-at-least-32-bytes"
+
+
+def make_token(role="authenticated", expires_in=3600, secret=SECRET):
+    claims = {"sub": "user-1", "role": role, "exp": int(time.time()) + expires_in}
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+def test_tokens_are_verified_locally_and_cached():
+    verifier = TokenVerifier(secret=SECRET, jwks_url="")
+    token = make_token()
+
+    assert asyncio.run(verifier.verify(token))["sub"] == "user-1"
+    assert asyncio.run(verifier.verify(token))["sub"] == "user-1"
+    stats = verifier.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+    assert stats["verify_seconds_total"] > 0
+
+
+@pytest.mark.parametrize("token, error", [
+    (make_token(secret="another-secret-with-at-least-32-bytes"), InvalidToken),
+    (make_token(expires_in=-10), InvalidToken),
+    (make_token(role="anon"), Forbidden),
+    ("not-a-jwt", InvalidToken),
+])
+def test_invalid_tokens_are_rejected_and_not_cached(token, error):
+    verifier = TokenVerifier(secret=SECRET, jwks_url="")
+    for _ in range(2):
+        with pytest.raises(error):
+            asyncio.run(verifier.verify(token))
+    assert verifier.stats()["failures"] == 2 and verifier.stats()["cached"] == 0
+
+
+def test_cache_is_bounded_and_entries_expire_with_the_token():
+    verifier = TokenVerifier(secret=SECRET, jwks_url="", max_entries=2)
+    tokens = [make_token(expires_in=3600 + i) for i in range(3)]
+    for token in tokens:
+        asyncio.run(verifier.verify(token))
+    assert verifier.stats()["cached"] == 2
+
+    verifier = TokenVerifier(secret=SECRET, jwks_url="", ttl=0)
+    token = make_token()
+    asyncio.run(verifier.verify(token))
+    asyncio.run(verifier.verify(token))
+    assert verifier.stats()["hits"] == 0
+
+
+def test_remote_fallback_only_when_enabled():
+    async def remote(token):
+        return {"sub": "user-2", "role": "authenticated"}
+
+    token = make_token()
+    with pytest.raises(InvalidToken):
+        asyncio.run(TokenVerifier(secret="", jwks_url="", remote_fallback=False).verify(token, remote=remote))
+
+    verifier = TokenVerifier(secret="", jwks_url="", remote_fallback=True)
+    assert asyncio.run(verifier.verify(token, remote=remote))["sub"] == "user-2"
+    assert verifier.stats()["remote_calls"] == 1
+
+    # Unset, the fallback covers a missing secret only
+    assert TokenVerifier(secret="", jwks_url="").remote_fallback is True
+    assert TokenVerifier(secret=SECRET, jwks_url="").remote_fallback is False
+
+
+def test_admin_routes_use_the_verifier(client, monkeypatch):
+    monkeypatch.setattr(token_verifier, "secret", SECRET)
+    payload = {"name": "Cup", "year": 2024, "status": "upcoming"}
+
+    assert client.post("/tournaments/", json=payload).status_code == 401
+    assert client.post("/tournaments/", json=payload, headers={"x-supabase-auth": "junk"}).status_code == 401
+    assert client.post("/tournaments/", json=payload, headers={"x-supabase-auth": make_token(role="anon")}).status_code == 403
+    assert client.post("/tournaments/", json=payload, headers={"x-supabase-auth": make_token()}).status_code == 200
+
+
+def test_auth_server_errors_are_not_reported_as_bad_tokens(client, monkeypatch):
+    async def unavailable(token):
+        raise ConnectionError("auth server unreachable")
+
+    monkeypatch.setattr(token_verifier, "secret", "")
+    monkeypatch.setattr(token_verifier, "remote_fallback", True)
+    monkeypatch.setattr("app.dependencies._remote_claims", unavailable)
+    payload = {"name": "Cup", "year": 2024, "status": "upcoming"}
+    with pytest.raises(ConnectionError):
+        client.post("/tournaments/", json=payload, headers={"x-supabase-auth": make_token(expires_in=7200)})
@@ -0,0 +1,116 @@
+def test_bulk_create_reports_per_item_results(admin_client, tournament):
+    missing = "00000000-0000-0000-0000-000000000000"
+    response = admin_client.post("/teams/bulk", json=[
+        {"name": "Red Dragons", "tournament_id": tournament["id"], "group": "A"},
+        {"name": "Ghosts", "tournament_id": missing},
+        {"name": "Blue Tigers", "tournament_id": tournament["id"], "group": "A"},
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["updated"], body["failed"]) == (2, 0, 1)
+    assert [r["status"] for r in body["results"]] == ["created", "error", "created"]
+    assert body["results"][1]["error"] == "Tournament not found"
+    assert body["results"][2]["data"]["name"] == "Blue Tigers"
+
+    names = [t["name"] for t in admin_client.get("/teams/", params={"tournament_id": tournament["id"]}).json()]
+    assert names == ["Blue Tigers", "Red Dragons"]
+
+
+def test_bulk_upsert_updates_on_natural_key(admin_client, teams):
+    team_id = teams[0]["id"]
+    players = [{"name": f"Player {n}", "team_id": team_id, "shirt_number": n} for n in (1, 2)]
+    admin_client.post("/players/bulk", json=players)
+
+    response = admin_client.post(
+        "/players/bulk",
+        params={"upsert": True},
+        json=[
+            {"name": "Renamed 2", "team_id": team_id, "shirt_number": 2, "position": "GK"},
+            {"name": "Player 3", "team_id": team_id, "shirt_number": 3},
+            {"name": "Again 3", "team_id": team_id, "shirt_number": 3},
+        ],
+    )
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == ["updated", "created", "error"]
+    assert body["results"][2]["error"] == "Duplicate of item 1"
+
+    roster = admin_client.get("/players/", params={"team_id": team_id}).json()
+    assert [(p["shirt_number"], p["name"]) for p in roster] == [(1, "Player 1"), (2, "Renamed 2"), (3, "Player 3")]
+
+
+def test_batch_rejected_by_the_database_writes_nothing(admin_client, teams, monkeypatch):
+    import sqlite3
+
+    from app.repositories.local import LocalBackend
+
+    execute = LocalBackend._execute
+
+    def reject_clash(self, sql, params):
+        if sql.startswith("insert into players") and "Clash" in params:
+            raise sqlite3.IntegrityError("check constraint failed")
+        return execute(self, sql, params)
+
+    monkeypatch.setattr(LocalBackend, "_execute", reject_clash)
+    team_id = teams[0]["id"]
+    body = admin_client.post("/players/bulk", json=[
+        {"name": "New", "team_id": team_id, "shirt_number": 5},
+        {"name": "Clash", "team_id": team_id, "shirt_number": 1},
+    ]).json()
+    assert body["failed"] == 2 and body["created"] == 0
+    assert admin_client.get("/players/", params={"team_id": team_id}).json() == []
+    # The single-object route reports the same rejection as a conflict
+    assert admin_client.post("/players/", json={"name": "Clash", "team_id": team_id, "shirt_number": 1}).status_code == 409
+
+
+def test_natural_keys_only_merge_on_upsert(admin_client, tournament, teams):
+    match = {
+        "tournament_id": tournament["id"], "home_team_id": teams[0]["id"], "away_team_id": teams[1]["id"],
+        "start_time": "2024-06-01T18:00:00Z", "status": "finished", "home_score": 2, "away_score": 0,
+    }
+    assert admin_client.post("/matches/bulk", json=[match]).json()["created"] == 1
+    # Sent with a different offset, still the same kick-off
+    body = admin_client.post(
+        "/matches/bulk", params={"upsert": True},
+        json=[{**match, "start_time": "2024-06-01T20:00:00+02:00", "home_score": 1, "away_score": 1}],
+    ).json()
+    assert [r["status"] for r in body["results"]] == ["updated"]
+    standings = admin_client.get(f"/standings/{tournament['id']}").json()
+    assert [(row["played"], row["points"]) for row in standings[:2]] == [(1, 1), (1, 1)]
+
+    # Without upsert a duplicate is just another row, like on the single-object route
+    duplicate = {"name": "Keeper", "team_id": teams[0]["id"], "shirt_number": 1}
+    assert admin_client.post("/players/", json=duplicate).status_code == 200
+    assert admin_client.post("/players/bulk", json=[duplicate]).json()["created"] == 1
+    body = admin_client.post("/players/bulk", params={"upsert": True}, json=[duplicate]).json()
+    assert body["results"][0]["error"] == "Matches 2 existing rows"
+
+
+def test_bulk_matches_and_events_validate_references(admin_client, tournament, teams):
+    other = admin_client.post("/tournaments/", json={"name": "Other Cup", "year": 2024, "status": "upcoming"}).json()
+    outsider = admin_client.post("/teams/", json={"name": "Outsiders", "tournament_id": other["id"]}).json()
+    match = {"tournament_id": tournament["id"], "start_time": "2024-06-01T18:00:00Z", "status": "finished", "home_score": 2}
+    body = admin_client.post("/matches/bulk", json=[
+        {**match, "home_team_id": teams[0]["id"], "away_team_id": teams[1]["id"]},
+        {**match, "home_team_id": teams[2]["id"], "away_team_id": outsider["id"]},
+    ]).json()
+    assert [r["status"] for r in body["results"]] == ["created", "error"]
+    assert body["results"][1]["error"] == "Team not found in this tournament"
+    # Created matches feed the standings like single creates do
+    standings = admin_client.get(f"/standings/{tournament['id']}").json()
+    assert standings[0]["team_name"] == "Red Dragons" and standings[0]["points"] == 3
+
+    match_id = body["results"][0]["data"]["id"]
+    body = admin_client.post("/events/bulk", json=[
+        {"match_id": match_id, "team_id": teams[0]["id"], "type": "goal", "minute": 10},
+        {"match_id": match_id, "team_id": teams[2]["id"], "type": "goal", "minute": 20},
+    ]).json()
+    assert [r["status"] for r in body["results"]] == ["created", "error"]
+    assert body["results"][1]["error"] == "Team is not playing in this match"
+
+
+def test_batch_size_is_bounded(admin_client, teams):
+    from app.config import settings
+
+    team = {"name": "Team", "tournament_id": teams[0]["tournament_id"]}
+    too_many = [{**team, "name": f"Team {i}"} for i in range(settings.BULK_MAX_ITEMS + 1)]
+    assert admin_client.post("/teams/bulk", json=too_many).status_code == 422
@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+from app.cache import MISSING, MemoryCache, ResponseCache, response_cache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_memory_cache_lru_ttl_and_tags():
+    cache = MemoryCache(max_entries=2, ttl=60)
+    run(cache.set("a", 1, ["x"]))
+    run(cache.set("b", 2, ["y"]))
+    assert run(cache.get("a")) == 1  # "a" is now most recently used
+    run(cache.set("c", 3, ["x"]))
+    assert run(cache.get("b")) is MISSING and len(cache) == 2
+
+    assert run(cache.invalidate(["x"])) == 2
+    assert len(cache) == 0
+
+    run(cache.set("d", 4, [], ttl=0.001))
+    time.sleep(0.01)
+    assert run(cache.get("d")) is MISSING
+
+
+def test_load_overlapping_invalidation_is_not_stored():
+    cache = ResponseCache(MemoryCache(10, 60))
+
+    async def scenario():
+        async def slow_loader():
+            await cache.invalidate("x")  # a write lands while the read is in flight
+            return "stale"
+        await cache.get_or_load("k", ["x"], slow_loader)
+        return await cache.backend.get("k")
+
+    assert run(scenario()) is MISSING
+
+
+def test_player_patch_evicts_only_that_player_and_rosters(admin_client, teams):
+    red, blue = teams[0], teams[1]
+    keeper = admin_client.post("/players/", json={"name": "Keeper", "team_id": red["id"], "shirt_number": 1}).json()
+    admin_client.post("/players/", json={"name": "Other", "team_id": blue["id"], "shirt_number": 1})
+
+    admin_client.get(f"/players/{keeper['id']}")
+    admin_client.get("/players/", params={"team_id": red["id"]})
+    admin_client.get("/players/", params={"team_id": blue["id"]})
+    admin_client.get(f"/teams/{red['id']}")
+
+    hits = response_cache.hits
+    admin_client.patch(f"/players/{keeper['id']}", json={"name": "Captain"})
+
+    assert admin_client.get(f"/players/{keeper['id']}").json()["name"] == "Captain"
+    assert admin_client.get("/players/", params={"team_id": red["id"]}).json()[0]["name"] == "Captain"
+    assert response_cache.hits == hits
+    # Another team's roster and the team itself are still served from cache
+    admin_client.get("/players/", params={"team_id": blue["id"]})
+    admin_client.get(f"/teams/{red['id']}")
+    assert response_cache.hits == hits + 2
+
+
+def test_team_delete_evicts_cascaded_players(admin_client, teams):
+    red = teams[0]
+    keeper = admin_client.post("/players/", json={"name": "Keeper", "team_id": red["id"]}).json()
+    assert admin_client.get(f"/players/{keeper['id']}").status_code == 200
+    assert admin_client.delete(f"/teams/{red['id']}").status_code == 204
+    assert admin_client.get(f"/players/{keeper['id']}").status_code == 404
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ResponseCache(MemoryCache(10, 60))
+    calls = 0
+
+    async def scenario():
+        async def loader():
+            nonlocal calls
+            calls += 1
+            value = {"calls": calls}
+            await asyncio.sleep(0.01)
+            return value
+        first = await asyncio.gather(*(cache.get_or_load("k", ["x"], loader) for _ in range(20)))
+        # A write lands while the next load is in flight: later readers start their own
+        second = asyncio.ensure_future(cache.get_or_load("j", ["x"], loader))
+        await asyncio.sleep(0)
+        await cache.invalidate("x")
+        third = await cache.get_or_load("j", ["x"], loader)
+        return first, await second, third
+
+    first, second, third = run(scenario())
+    assert all(value is first[0] for value in first) and first[0] == {"calls": 1}
+    assert (second, third) == ({"calls": 2}, {"calls": 3})
+    assert cache.flights.followers == 19
+
+
+def test_stale_entries_are_served_while_one_refresh_runs():
+    cache = ResponseCache(MemoryCache(10, 0.05), stale_ttl=60)
+    calls = 0
+
+    async def scenario():
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+        await cache.get_or_load("k", ["x"], loader)
+        await asyncio.sleep(0.06)
+        stale = await asyncio.gather(*(cache.get_or_load("k", ["x"], loader) for _ in range(5)))
+        await asyncio.sleep(0.02)
+        fresh = await cache.get_or_load("k", ["x"], loader)
+        # Invalidated entries are gone, not stale
+        await cache.invalidate("x")
+        reloaded = await cache.get_or_load("k", ["x"], loader)
+        return stale, fresh, reloaded
+
+    assert run(scenario()) == ([1] * 5, 2, 3)
+    assert cache.stale_hits == 5
+
+
+def test_coalesced_failures_reach_every_caller():
+    cache = ResponseCache(MemoryCache(10, 60))
+
+    async def scenario():
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+        return await asyncio.gather(*(cache.get_or_load("k", [], loader) for _ in range(3)), return_exceptions=True)
+
+    errors = run(scenario())
+    assert [str(error) for error in errors] == ["upstream down"] * 3
+    assert run(cache.backend.get("k")) is MISSING
@@ -0,0 +1,42 @@
+from app.cache import response_cache
+from app.compression import negotiate
+
+
+def test_negotiation_follows_q_values_then_preference():
+    available = ["zstd", "br", "gzip"]
+    assert negotiate("gzip, br", available) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", available) == "gzip"
+    assert negotiate("*;q=0.1, zstd;q=0", available) == "br"
+    assert negotiate("identity", available) is None
+    assert negotiate("", available) is None
+
+
+def test_large_cacheable_responses_are_compressed_once(admin_client, tournament, teams):
+    for number in range(1, 30):
+        admin_client.post("/players/", json={"name": f"Player {number}", "team_id": teams[0]["id"], "shirt_number": number})
+
+    response = admin_client.get("/players/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["etag"].startswith('W/"')
+    assert len(response.json()) == 29
+    misses = response_cache.body_misses
+
+    # A hit serves the stored compressed body
+    again = admin_client.get("/players/", headers={"Accept-Encoding": "gzip"})
+    assert again.content == response.content
+    assert response_cache.body_misses == misses and response_cache.body_hits >= 1
+
+    # Revalidating the compressed copy
+    etag = response.headers["etag"]
+    not_modified = admin_client.get("/players/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.headers["etag"] == etag
+
+    identity = admin_client.get("/players/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.json() == response.json()
+
+
+def test_small_responses_are_left_alone(client):
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,39 @@
+def test_get_returns_validators_and_304_when_unchanged(admin_client, teams):
+    team = teams[0]
+    response = admin_client.get(f"/teams/{team['id']}")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert "last-modified" in response.headers
+
+    response = admin_client.get(f"/teams/{team['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    last_modified = admin_client.get(f"/teams/{team['id']}").headers["last-modified"]
+    assert admin_client.get(f"/teams/{team['id']}", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+
+def test_etag_changes_with_updates_and_list_membership(admin_client, tournament, teams):
+    params = {"tournament_id": tournament["id"]}
+    list_etag = admin_client.get("/teams/", params=params).headers["etag"]
+    team_etag = admin_client.get(f"/teams/{teams[0]['id']}").headers["etag"]
+
+    admin_client.patch(f"/teams/{teams[0]['id']}", json={"logo_url": "https://example.com/logo.png"})
+    response = admin_client.get(f"/teams/{teams[0]['id']}", headers={"If-None-Match": team_etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != team_etag
+
+    response = admin_client.get("/teams/", params=params, headers={"If-None-Match": list_etag})
+    assert response.status_code == 200
+    new_list_etag = response.headers["etag"]
+
+    admin_client.delete(f"/teams/{teams[3]['id']}")
+    response = admin_client.get("/teams/", params=params, headers={"If-None-Match": new_list_etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+
+def test_standings_are_revalidated_by_content(admin_client, tournament, teams):
+    etag = admin_client.get(f"/standings/{tournament['id']}").headers["etag"]
+    assert admin_client.get(f"/standings/{tournament['id']}", headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.config import settings
+from app.event_queue import EventQueue, QueueFull, event_queue
+from app.repositories import MatchEventRepository, MatchRepository, TeamRepository, TournamentRepository
+from app.repositories.local import LocalBackend
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def backend():
+    backend = LocalBackend()
+    tournament = run(TournamentRepository(backend).create({"name": "Cup", "year": 2024, "status": "ongoing"}))
+    home, away = (
+        run(TeamRepository(backend).create({"name": name, "tournament_id": tournament["id"]})) for name in ("Reds", "Blues")
+    )
+    backend.match = run(MatchRepository(backend).create({
+        "tournament_id": tournament["id"],
+        "home_team_id": home["id"],
+        "away_team_id": away["id"],
+        "start_time": "2024-06-01T18:00:00Z",
+    }))
+    return backend
+
+
+def goal(match, minute):
+    return {"match_id": match["id"], "team_id": match["home_team_id"], "type": "goal", "minute": minute}
+
+
+def written_log(log):
+    async def on_written(kind, result):
+        log.append((kind, result["event"]["minute"], result["match"]["home_score"]))
+    return on_written
+
+
+def test_flushes_in_batches_and_in_order(backend, tmp_path):
+    queue = EventQueue(flush_rows=2, flush_interval=60, spool_path=str(tmp_path / "spool.jsonl"), fsync=False)
+    log = []
+
+    async def scenario():
+        await queue.start(MatchEventRepository(backend), written_log(log))
+        for minute in (5, 10, 15):
+            await queue.put(goal(backend.match, minute))
+        # The first two may already be flushing: put() yields while the spool is written
+        assert queue.accepted == 3
+        await queue.stop()
+
+    run(scenario())
+    # Scores are derived per event, in the order the events were acknowledged
+    assert log == [("event.created", 5, 1), ("event.created", 10, 2), ("event.created", 15, 3)]
+    assert queue.stats()["flushes"] == 2 and queue.stats()["flushed"] == 3
+    assert (tmp_path / "spool.jsonl").read_text() == ""
+
+
+def test_spool_survives_a_restart_and_replays_once(backend, tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    events = MatchEventRepository(backend)
+
+    async def crash():
+        # Acknowledged, then the process dies before the flush
+        queue = EventQueue(flush_rows=100, flush_interval=60, spool_path=str(spool), fsync=False)
+        await queue.start(events, written_log([]))
+        await queue.put(goal(backend.match, 5))
+        await queue.put(goal(backend.match, 10))
+        queue._task.cancel()
+
+    run(crash())
+    queued = [json.loads(line) for line in spool.read_text().splitlines()]
+    assert [event["minute"] for event in queued] == [5, 10]
+
+    # The first event was recorded but the spool not rewritten yet
+    run(events.record_many(queued[:1], rpc=True))
+
+    log = []
+
+    async def restart():
+        queue = EventQueue(flush_rows=100, flush_interval=60, spool_path=str(spool), fsync=False)
+        await queue.start(events, written_log(log))
+        await queue.stop()
+
+    run(restart())
+    assert log == [("event.created", 10, 2)]
+    assert len(run(events.list({"match_id": backend.match["id"]}))) == 2
+
+
+def test_rejected_events_are_set_aside(backend, tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    queue = EventQueue(flush_rows=10, flush_interval=60, spool_path=str(spool), fsync=False)
+    log = []
+
+    async def scenario():
+        await queue.start(MatchEventRepository(backend), written_log(log))
+        await queue.put(goal(backend.match, 5))
+        await queue.put({**goal(backend.match, 6), "type": "bogus"})
+        await queue.put(goal(backend.match, 7))
+        await queue.stop()
+
+    run(scenario())
+    assert [minute for _, minute, _ in log] == [5, 7]
+    assert queue.rejected == 1 and queue.depth == 0
+    rejected = [json.loads(line) for line in (tmp_path / "spool.jsonl.rejected").read_text().splitlines()]
+    assert rejected[0]["event"]["minute"] == 6
+
+
+def test_events_of_missing_matches_are_set_aside(backend, tmp_path):
+    queue = EventQueue(flush_rows=10, flush_interval=60, spool_path=str(tmp_path / "spool.jsonl"), fsync=False)
+    log = []
+    gone = {**backend.match, "id": "00000000-0000-0000-0000-000000000000"}
+
+    async def scenario():
+        await queue.start(MatchEventRepository(backend), written_log(log))
+        await queue.put(goal(backend.match, 5))
+        await queue.put(goal(gone, 6))
+        await queue.stop()
+
+    run(scenario())
+    # Skipped by record_match_events without an error, but not lost
+    assert [minute for _, minute, _ in log] == [5]
+    assert (queue.flushed, queue.rejected) == (1, 1)
+    rejected = [json.loads(line) for line in (tmp_path / "spool.jsonl.rejected").read_text().splitlines()]
+    assert rejected == [{"event": {**goal(gone, 6), "idempotency_key": rejected[0]["event"]["idempotency_key"]}, "error": "Match not found"}]
+
+
+def test_full_queue_refuses_events(backend):
+    queue = EventQueue(max_size=1, spool_path="")
+    run(queue.put(goal(backend.match, 5)))
+    with pytest.raises(QueueFull):
+        run(queue.put(goal(backend.match, 6)))
+
+
+@pytest.fixture
+def write_behind(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "EVENTS_WRITE_BEHIND", True)
+    monkeypatch.setattr(event_queue, "spool_path", str(tmp_path / "spool.jsonl"))
+    monkeypatch.setattr(event_queue, "flush_interval", 0.01)
+    monkeypatch.setattr(event_queue, "fsync", False)
+
+
+def test_route_acknowledges_then_records(write_behind, admin_client, tournament, teams):
+    # write_behind comes first so the client's lifespan starts the queue
+    client = admin_client
+    match = client.post("/matches/", json={
+        "tournament_id": tournament["id"],
+        "home_team_id": teams[0]["id"],
+        "away_team_id": teams[1]["id"],
+        "start_time": "2024-06-01T18:00:00Z",
+    }).json()
+
+    response = client.post("/events/", json={"match_id": match["id"], "team_id": teams[0]["id"], "type": "goal", "minute": 3})
+    assert response.status_code == 202
+    assert response.json()["match_id"] == match["id"] and response.json()["idempotency_key"]
+
+    deadline = time.monotonic() + 5
+    while event_queue.depth and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(client.get("/events/", params={"match_id": match["id"]}).json()) == 1
+    assert client.get(f"/matches/{match['id']}").json()["home_score"] == 1
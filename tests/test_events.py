@@ -0,0 +1,79 @@
+import pytest
+
+from app.config import settings
+from app.repositories import MissingFunction, entities
+from app.repositories.local import LocalBackend
+
+
+@pytest.fixture(params=["rpc", "requests", "missing"])
+def match(request, admin_client, tournament, teams, monkeypatch):
+    # The transactional function, the EVENTS_RPC=false fallback, and the same
+    # fallback when migrations/005_event_ingestion.sql isn't applied
+    monkeypatch.setattr(settings, "EVENTS_RPC", request.param != "requests")
+    if request.param == "missing":
+        async def missing(self, function, params):
+            raise MissingFunction(function)
+
+        monkeypatch.setattr(LocalBackend, "rpc", missing)
+        monkeypatch.setattr(entities, "_missing_functions", set())
+    response = admin_client.post("/matches/", json={
+        "tournament_id": tournament["id"],
+        "home_team_id": teams[0]["id"],
+        "away_team_id": teams[1]["id"],
+        "start_time": "2024-06-01T18:00:00Z",
+    })
+    return response.json()
+
+
+def goal(match, team, minute, **extra):
+    return {"match_id": match["id"], "team_id": team["id"], "type": "goal", "minute": minute, **extra}
+
+
+def score(client, match):
+    body = client.get(f"/matches/{match['id']}").json()
+    return body["home_score"], body["away_score"], body["status"]
+
+
+def test_goals_move_the_score_and_start_the_match(admin_client, match, teams):
+    admin_client.post("/events/", json=goal(match, teams[0], 10))
+    admin_client.post("/events/", json=goal(match, teams[1], 20))
+    admin_client.post("/events/", json={**goal(match, teams[0], 30), "type": "yellow_card"})
+    assert score(admin_client, match) == (1, 1, "live")
+
+
+def test_updates_and_deletes_reverse_the_goal(admin_client, match, teams):
+    event = admin_client.post("/events/", json=goal(match, teams[0], 10)).json()
+
+    # Reassigning the goal moves it to the other side
+    admin_client.patch(f"/events/{event['id']}", json={"team_id": teams[1]["id"]})
+    assert score(admin_client, match)[:2] == (0, 1)
+    # Turning it into a card takes it off the score
+    admin_client.patch(f"/events/{event['id']}", json={"type": "yellow_card"})
+    assert score(admin_client, match)[:2] == (0, 0)
+
+    admin_client.patch(f"/events/{event['id']}", json={"type": "goal"})
+    assert admin_client.delete(f"/events/{event['id']}").status_code == 204
+    assert score(admin_client, match)[:2] == (0, 0)
+
+
+def test_retries_with_an_idempotency_key_count_once(admin_client, match, teams):
+    first = admin_client.post("/events/", json=goal(match, teams[0], 10, idempotency_key="op1-0001"))
+    retry = admin_client.post("/events/", json=goal(match, teams[0], 10, idempotency_key="op1-0001"))
+    assert retry.status_code == 200 and retry.json()["id"] == first.json()["id"]
+    assert score(admin_client, match)[:2] == (1, 0)
+    assert len(admin_client.get("/events/", params={"match_id": match["id"]}).json()) == 1
+
+
+def test_goals_on_finished_matches_update_the_standings(admin_client, match, teams, tournament):
+    admin_client.patch(f"/matches/{match['id']}", json={"status": "finished"})
+    admin_client.get(f"/standings/{tournament['id']}")
+    admin_client.post("/events/", json=goal(match, teams[1], 88))
+
+    standings = {row["team_name"]: row for row in admin_client.get(f"/standings/{tournament['id']}").json()}
+    assert standings["Blue Tigers"]["points"] == 3 and standings["Red Dragons"]["points"] == 0
+
+
+def test_events_of_unknown_matches_are_404(admin_client, match, teams):
+    missing = {**goal(match, teams[0], 1), "match_id": "00000000-0000-0000-0000-000000000000"}
+    assert admin_client.post("/events/", json=missing).status_code == 404
+    assert admin_client.delete("/events/00000000-0000-0000-0000-000000000000").status_code == 404
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from supabase import AsyncClientOptions, acreate_client
+
+from app.repositories import BackendError, MatchEventRepository, MatchRepository, TeamRepository, TournamentRepository
+from app.repositories.base import Query
+from app.repositories.supabase import SupabaseBackend
+from benchmarks.fake_postgrest import FakePostgREST, keyset_after, parse_condition, parse_select
+
+
+async def supabase_backend(fake: FakePostgREST) -> SupabaseBackend:
+    options = AsyncClientOptions(httpx_client=fake.http_client(), auto_refresh_token=False, persist_session=False)
+    return SupabaseBackend(await acreate_client("http://fake-postgrest.local", "test", options))
+
+
+def test_supabase_backend_round_trips_through_the_stand_in():
+    async def scenario():
+        fake = FakePostgREST()
+        backend = await supabase_backend(fake)
+        tournament = await TournamentRepository(backend).create({"name": "Cup", "year": 2024, "status": "ongoing"})
+        teams = await TeamRepository(backend).create_many(
+            [{"name": name, "tournament_id": tournament["id"]} for name in ("A, B", "C (2)", 'D "x"', "E")]
+        )
+        assert await backend.count("teams", {"tournament_id": tournament["id"]}) == 4
+
+        # Keyset page after a value that needs quoting, with the exact total
+        ordered = sorted(teams, key=lambda team: team["name"])
+        query = Query(
+            filters={"tournament_id": tournament["id"]}, order=[("name", False), ("id", False)], limit=2,
+            after=[ordered[0]["name"], ordered[0]["id"]],
+        )
+        rows, total = await backend.select_with_count("teams", query)
+        assert [row["name"] for row in rows] == [team["name"] for team in ordered[1:3]] and total == 4
+
+        match = await MatchRepository(backend).create({
+            "tournament_id": tournament["id"], "home_team_id": teams[0]["id"], "away_team_id": teams[1]["id"],
+            "start_time": "2024-06-01T18:00:00+00:00",
+        })
+        await backend.rpc("record_match_event", {"p_event": {
+            "match_id": match["id"], "team_id": teams[0]["id"], "type": "goal", "minute": 3,
+        }})
+        embedded = await MatchRepository(backend).get(match["id"], embed={"home_team": {}, "events": {"team": {}}})
+        assert embedded["home_score"] == 1 and embedded["home_team"]["name"] == teams[0]["name"]
+        assert embedded["events"][0]["team"]["id"] == teams[0]["id"]
+
+        # Upserts merge on the id, plain inserts of an existing id are rejected
+        renamed = await backend.insert("teams", [{**teams[3], "logo_url": "e.png"}], on_conflict=["id"])
+        assert renamed[0]["logo_url"] == "e.png"
+        with pytest.raises(BackendError):
+            await backend.insert("teams", [teams[3]])
+
+        assert await MatchEventRepository(backend).list({"match_id": match["id"]})
+        # Filters through a relation embed it with an inner join, and drop it again
+        events = await MatchEventRepository(backend).list({"match.tournament_id": tournament["id"]}, columns=["id"])
+        assert len(events) == 1 and "match" not in events[0]
+        assert await backend.count("match_events", {"match.tournament_id": tournament["id"]}) == 1
+        assert await TournamentRepository(backend).delete(tournament["id"])
+        assert await backend.count("teams", {}) == 0
+        assert fake.requests > 0
+
+    asyncio.run(scenario())
+
+
+def test_select_and_keyset_parsing():
+    assert parse_select("id,home_team:teams!home_team_id(*),events:match_events!match_id(*,player:players!player_id(*))") == (
+        ["id"], {"home_team": {}, "events": {"player": {}}},
+    )
+    assert parse_select("id,match:matches!match_id!inner(tournament_id)") == (["id"], {"match": {}})
+    condition = parse_condition('or(start_time.gt."2024-06-01T18:00:00+00:00",start_time.is.null,'
+                                'and(start_time.eq."2024-06-01T18:00:00+00:00",or(id.gt."x,y",id.is.null)))')
+    assert keyset_after(condition) == ["2024-06-01T18:00:00+00:00", "x,y"]
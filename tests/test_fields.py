@@ -0,0 +1,35 @@
+from app.repositories.local import LocalBackend
+
+
+def test_fields_trim_list_and_detail_responses(admin_client, tournament, teams):
+    response = admin_client.get("/teams/", params={"tournament_id": tournament["id"], "fields": "id,name", "limit": 2})
+    assert response.status_code == 200
+    assert all(set(team) == {"id", "name"} for team in response.json())
+    # Pagination and validator headers survive the trimmed response
+    assert "x-next-cursor" in response.headers and "etag" in response.headers
+
+    response = admin_client.get(f"/teams/{teams[0]['id']}", params={"fields": "name"})
+    assert response.json() == {"name": teams[0]["name"]}
+
+    response = admin_client.get(f"/standings/{tournament['id']}", params={"fields": "team_name,points"})
+    assert all(set(row) == {"team_name", "points"} for row in response.json())
+
+
+def test_fields_are_pushed_down_to_the_backend(admin_client, tournament, teams, monkeypatch):
+    selected = []
+    original = LocalBackend.select
+
+    async def spy(self, table, query):
+        selected.append(query.columns)
+        return await original(self, table, query)
+
+    monkeypatch.setattr(LocalBackend, "select", spy)
+    admin_client.get("/teams/", params={"tournament_id": tournament["id"], "fields": "name"})
+    # Only the requested field plus the keyset sort columns are fetched
+    assert selected == [["name", "id"]]
+
+
+def test_unknown_field_is_rejected(admin_client, teams):
+    response = admin_client.get("/teams/", params={"fields": "name,password"})
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
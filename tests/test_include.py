@@ -0,0 +1,65 @@
+import pytest
+
+
+@pytest.fixture
+def match(admin_client, tournament, teams):
+    response = admin_client.post("/matches/", json={
+        "tournament_id": tournament["id"],
+        "home_team_id": teams[0]["id"],
+        "away_team_id": teams[1]["id"],
+        "start_time": "2024-06-01T18:00:00Z",
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+def player(admin_client, teams):
+    response = admin_client.post("/players/", json={"name": "Ada Striker", "team_id": teams[0]["id"], "shirt_number": 9})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_include_embeds_nested_relations(admin_client, match, player):
+    event = admin_client.post("/events/", json={
+        "match_id": match["id"], "team_id": player["team_id"], "player_id": player["id"], "type": "goal", "minute": 12,
+    }).json()
+
+    response = admin_client.get(f"/matches/{match['id']}", params={"include": "home_team,events.player"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["home_team"]["name"] == "Red Dragons"
+    assert [e["id"] for e in body["events"]] == [event["id"]]
+    assert body["events"][0]["player"]["name"] == "Ada Striker"
+    # Relations that weren't asked for are left out entirely
+    assert "away_team" not in body and "team" not in body["events"][0]
+
+
+def test_without_include_the_payload_is_unchanged(admin_client, match):
+    body = admin_client.get(f"/matches/{match['id']}").json()
+    assert not {"tournament", "home_team", "away_team", "events"} & set(body)
+
+
+def test_include_on_lists_and_with_fields(admin_client, tournament, teams, player):
+    response = admin_client.get("/teams/", params={"tournament_id": tournament["id"], "include": "players", "fields": "name"})
+    assert response.status_code == 200
+    by_name = {team["name"]: team for team in response.json()}
+    assert set(by_name["Red Dragons"]) == {"name", "players"}
+    assert [p["name"] for p in by_name["Red Dragons"]["players"]] == ["Ada Striker"]
+    assert by_name["Blue Tigers"]["players"] == []
+
+
+def test_writes_to_embedded_rows_evict_the_embedding_entry(admin_client, teams, player):
+    path = f"/teams/{teams[0]['id']}"
+    first = admin_client.get(path, params={"include": "players"})
+    admin_client.patch(f"/players/{player['id']}", json={"name": "Ada Keeper"})
+
+    second = admin_client.get(path, params={"include": "players"})
+    assert second.json()["players"][0]["name"] == "Ada Keeper"
+    assert second.headers["etag"] != first.headers["etag"]
+
+
+def test_unknown_relation_is_rejected(admin_client, match):
+    response = admin_client.get(f"/matches/{match['id']}", params={"include": "events.match"})
+    assert response.status_code == 400
+    assert "events.match" in response.json()["detail"]
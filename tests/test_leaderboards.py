@@ -0,0 +1,71 @@
+from app.leaderboards import build_leaderboard, leaderboard_store
+
+
+def boards(client, tournament, **params):
+    response = client.get(f"/tournaments/{tournament['id']}/leaderboards", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_leaderboards_follow_event_writes(admin_client, tournament, teams, create_match, create_player, create_event):
+    red, blue = teams[:2]
+    striker = create_player(red, "Striker", 9)
+    winger = create_player(blue, "Winger", 7)
+    first = create_match(red, blue)
+    second = create_match(blue, red, start_time="2024-06-08T18:00:00Z")
+
+    create_event(first, striker, "goal", 10)
+    create_event(first, winger, "goal", 20)
+    assert [row["value"] for row in boards(admin_client, tournament)["goals"]] == [1, 1]
+    assert [row["rank"] for row in boards(admin_client, tournament)["goals"]] == [1, 1]
+
+    # Written after the board was built: applied as deltas
+    create_event(second, striker, "goal", 5)
+    create_event(second, striker, "yellow_card", 30)
+    create_event(first, winger, "substitution_out", 60)
+    create_event(second, winger, "substitution_in", 46)
+    create_event(second, winger, "substitution_out", 80)
+    board = boards(admin_client, tournament)
+    assert [(row["player_name"], row["value"], row["rank"]) for row in board["goals"]] == [("Striker", 2, 1), ("Winger", 1, 2)]
+    assert board["goals"][0]["team_id"] == red["id"]
+    assert [(row["player_name"], row["value"]) for row in board["yellow_cards"]] == [("Striker", 1)]
+    assert board["red_cards"] == []
+    # On and off in the same match is one appearance
+    assert [(row["player_name"], row["value"]) for row in board["appearances"]] == [("Winger", 2)]
+
+    # Deleting the match takes its events off the board
+    admin_client.delete(f"/matches/{second['id']}")
+    assert [row["value"] for row in boards(admin_client, tournament)["goals"]] == [1, 1]
+
+
+def test_deltas_match_a_rebuild(admin_client, tournament, teams, create_match, create_player, create_event):
+    red, blue = teams[:2]
+    players = [create_player(red, f"P{number}", number) for number in range(1, 5)]
+    match = create_match(red, blue)
+    boards(admin_client, tournament)
+
+    events = [create_event(match, players[i % 4], "goal", i) for i in range(10)]
+    admin_client.delete(f"/events/{events[0]['id']}")
+    admin_client.patch(f"/events/{events[1]['id']}", json={"type": "red_card"})
+    incremental = boards(admin_client, tournament, limit=3)
+
+    leaderboard_store.clear()
+    assert boards(admin_client, tournament, limit=3) == incremental
+    assert [row["value"] for row in incremental["goals"]] == [2, 2, 2]
+    assert len(incremental["red_cards"]) == 1
+
+
+def test_stat_selection_and_unknown_tournament(admin_client, tournament):
+    assert set(boards(admin_client, tournament, stat="goals")) == {"tournament_id", "goals"}
+    missing = admin_client.get("/tournaments/00000000-0000-0000-0000-000000000000/leaderboards")
+    assert missing.status_code == 404
+
+
+def test_sorted_index_survives_removals():
+    events = [{"player_id": p, "team_id": "t", "match_id": "m", "type": "goal"} for p in "abcabca"]
+    board = build_leaderboard(events)
+    assert [(row["player_id"], row["value"]) for row in board.top("goals", 2)] == [("a", 3), ("b", 2)]
+    for _ in range(3):
+        board.apply(events[0], -1)
+    assert [row["player_id"] for row in board.top("goals", 5)] == ["b", "c"]
+    assert board.index["goals"] == sorted(board.index["goals"])
@@ -0,0 +1,123 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app import live
+from app.live import HEARTBEAT, RESET, LiveHub
+from app.routers.live import _sse
+
+
+@pytest.fixture
+def match(admin_client, tournament, teams):
+    response = admin_client.post("/matches/", json={
+        "tournament_id": tournament["id"],
+        "home_team_id": teams[0]["id"],
+        "away_team_id": teams[1]["id"],
+        "start_time": "2024-06-01T18:00:00Z",
+        "status": "live",
+    })
+    return response.json()
+
+
+async def take(subscription, n, heartbeat=None):
+    received = []
+    async for message in subscription.messages(heartbeat=heartbeat):
+        received.append(message)
+        if len(received) == n:
+            break
+    return received
+
+
+def test_fan_out_and_resume_from_last_event_id():
+    async def scenario():
+        hub = LiveHub(history=10, queue_size=10)
+        first, _ = hub.subscribe("m1")
+        for minute in (1, 2, 3):
+            hub.publish("m1", "event.created", {"minute": minute})
+        received = await take(first, 3)
+        assert [m.data for m in received] == ['{"minute": 1}', '{"minute": 2}', '{"minute": 3}']
+
+        # A reconnecting client gets what it missed after its last id, then live messages
+        _, backlog = hub.subscribe("m1", hub.message_id(received[0]))
+        assert [m.seq for m in backlog] == [2, 3]
+        # An id from another hub (e.g. before a restart) can't be resumed
+        _, backlog = hub.subscribe("m1", "deadbeef-2")
+        assert backlog == [RESET]
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_catches_up_from_history_without_blocking_writers():
+    async def scenario():
+        hub = LiveHub(history=8, queue_size=2)
+        slow, _ = hub.subscribe("m1")
+        for minute in range(5):
+            hub.publish("m1", "event.created", {"minute": minute})
+        # Its queue overflowed, but the history still holds everything
+        assert [m.seq for m in await take(slow, 5)] == [1, 2, 3, 4, 5]
+
+        for minute in range(20):
+            hub.publish("m1", "event.created", {"minute": minute})
+        # Fell further behind than the history reaches: told to refetch, then live again
+        assert await take(slow, 1) == [RESET]
+        hub.publish("m1", "match.updated", {})
+        assert [m.seq for m in await take(slow, 1)] == [26]
+
+    asyncio.run(scenario())
+
+
+def test_unwatched_channels_are_dropped(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(live, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    hub = LiveHub(history=10, queue_size=10, history_ttl=60)
+    first, _ = hub.subscribe("m1")
+    hub.publish("m1", "event.created", {"minute": 1})
+    hub.unsubscribe("m1", first)
+
+    # Kept for a while after the last subscriber left, for reconnects
+    clock[0] += 30
+    second, backlog = hub.subscribe("m1", f"{hub.id}-0")
+    assert [m.seq for m in backlog] == [1]
+    hub.unsubscribe("m1", second)
+    clock[0] += 61
+    third, backlog = hub.subscribe("m1", f"{hub.id}-1")
+    assert backlog == [RESET]
+
+    # The history of a finished match goes with its last subscriber
+    hub.publish("m1", "match.updated", {"status": "finished"})
+    hub.unsubscribe("m1", third)
+    _, backlog = hub.subscribe("m1", f"{hub.id}-1")
+    assert backlog == [RESET]
+
+
+def test_heartbeats_keep_idle_streams_alive():
+    async def scenario():
+        hub = LiveHub()
+        subscription, _ = hub.subscribe("m1")
+        assert await take(subscription, 1, heartbeat=0.01) == [HEARTBEAT]
+
+    asyncio.run(scenario())
+    assert _sse(HEARTBEAT) == ": heartbeat\n\n"
+
+
+def test_websocket_receives_writes_to_its_match(admin_client, match, teams):
+    with admin_client.websocket_connect(f"/matches/{match['id']}/ws") as websocket:
+        admin_client.post("/events/", json={"match_id": match["id"], "team_id": teams[0]["id"], "type": "goal", "minute": 9})
+        admin_client.patch(f"/matches/{match['id']}", json={"status": "finished"})
+
+        created = websocket.receive_json()
+        assert created["type"] == "event.created" and created["data"]["minute"] == 9
+        # The goal moved the score
+        updated = websocket.receive_json()
+        assert updated["type"] == "match.updated" and updated["data"]["home_score"] == 1
+        updated = websocket.receive_json()
+        assert updated["type"] == "match.updated" and updated["data"]["status"] == "finished"
+
+        admin_client.delete(f"/matches/{match['id']}")
+        assert websocket.receive_json()["type"] == "match.deleted"
+
+
+def test_streams_of_unknown_matches_are_refused(admin_client):
+    missing = "00000000-0000-0000-0000-000000000000"
+    assert admin_client.get(f"/matches/{missing}/stream").status_code == 404
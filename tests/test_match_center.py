@@ -0,0 +1,85 @@
+from app.match_center import match_center_store
+
+
+def center(client, match, **headers):
+    return client.get(f"/matches/{match['id']}/center", headers=headers)
+
+
+def test_center_is_patched_by_writes(admin_client, tournament, teams, create_match, create_player, create_event):
+    red, blue = teams[:2]
+    striker = create_player(red, "Striker", 9)
+    keeper = create_player(blue, "Keeper", 1)
+    match = create_match(red, blue)
+    create_event(match, keeper, "yellow_card", 30)
+
+    first = center(admin_client, match).json()
+    assert (first["home_team"]["name"], first["away_team"]["name"], first["status"]) == ("Red Dragons", "Blue Tigers", "live")
+    assert [(e["type"], e["side"], e["player"]["name"]) for e in first["timeline"]] == [("yellow_card", "away", "Keeper")]
+    builds = match_center_store.builds
+
+    # Written after the document was built: patched, not rebuilt
+    goal = create_event(match, striker, "goal", 12)
+    second = center(admin_client, match).json()
+    assert second["seq"] > first["seq"] and (second["home_score"], second["status"]) == (1, "live")
+    assert [e["minute"] for e in second["timeline"]] == [12, 30]
+
+    admin_client.patch(f"/events/{goal['id']}", json={"minute": 44})
+    admin_client.patch(f"/matches/{match['id']}", json={"status": "finished"})
+    third = center(admin_client, match).json()
+    assert [e["minute"] for e in third["timeline"]] == [30, 44] and third["status"] == "finished"
+    assert match_center_store.builds == builds
+
+    # Same document as a rebuild from the database
+    match_center_store.clear()
+    rebuilt = center(admin_client, match).json()
+    assert {**rebuilt, "seq": 0, "updated_at": None} == {**third, "seq": 0, "updated_at": None}
+
+
+def test_center_etag_and_invalidation(admin_client, tournament, teams, create_match, create_player, create_event):
+    red, blue = teams[:2]
+    striker = create_player(red, "Striker", 9)
+    match = create_match(red, blue)
+    create_event(match, striker, "goal", 5)
+
+    response = center(admin_client, match)
+    etag = response.headers["etag"]
+    assert center(admin_client, match, **{"If-None-Match": etag}).status_code == 304
+
+    # Renamed players and teams show up in the next read
+    admin_client.patch(f"/players/{striker['id']}", json={"name": "Captain"})
+    admin_client.patch(f"/teams/{red['id']}", json={"name": "Crimson"})
+    renamed = center(admin_client, match, **{"If-None-Match": etag})
+    assert renamed.status_code == 200 and renamed.headers["etag"] != etag
+    assert renamed.json()["timeline"][0]["player"]["name"] == "Captain"
+    assert renamed.json()["home_team"]["name"] == "Crimson"
+
+    admin_client.delete(f"/matches/{match['id']}")
+    assert center(admin_client, match).status_code == 404
+
+
+def test_players_added_after_the_build_are_resolved(admin_client, tournament, teams, create_match, create_player, create_event):
+    red, blue = teams[:2]
+    match = create_match(red, blue)
+    center(admin_client, match)
+
+    sub = create_player(red, "Late Signing", 23)
+    create_event(match, sub, "goal", 50)
+    assert [e["player"]["name"] for e in center(admin_client, match).json()["timeline"]] == ["Late Signing"]
+
+    response = admin_client.post("/players/bulk", json=[{"name": "Loanee", "team_id": blue["id"], "shirt_number": 7}])
+    loanee = response.json()["results"][0]["data"]
+    create_event(match, loanee, "yellow_card", 60)
+    assert [e["player"]["name"] for e in center(admin_client, match).json()["timeline"]] == ["Late Signing", "Loanee"]
+
+
+def test_teams_upserted_in_bulk_are_refreshed(admin_client, tournament, teams, create_match):
+    red, blue = teams[:2]
+    match = create_match(red, blue)
+    assert center(admin_client, match).json()["home_team"]["logo_url"] is None
+
+    response = admin_client.post(
+        "/teams/bulk", params={"upsert": True},
+        json=[{"name": "Red Dragons", "tournament_id": tournament["id"], "group": "A", "logo_url": "red.png"}],
+    )
+    assert response.json()["results"][0]["status"] == "updated"
+    assert center(admin_client, match).json()["home_team"]["logo_url"] == "red.png"
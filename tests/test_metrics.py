@@ -0,0 +1,49 @@
+import re
+
+from app.metrics import Histogram, Registry
+
+
+def sample(body, name, **labels):
+    for line in body.splitlines():
+        metric, _, value = line.rpartition(" ")
+        if metric.split("{")[0] == name and all(f'{k}="{v}"' in metric for k, v in labels.items()):
+            return float(value)
+    return None
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.register(Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "/x")
+    body = registry.render()
+    assert "# TYPE latency_seconds histogram" in body
+    assert sample(body, "latency_seconds_bucket", route="/x", le="0.1") == 1
+    assert sample(body, "latency_seconds_bucket", route="/x", le="1.0") == 3
+    assert sample(body, "latency_seconds_bucket", route="/x", le="+Inf") == 4
+    assert sample(body, "latency_seconds_count", route="/x") == 4
+
+
+def test_requests_are_measured_per_route_and_upstream_call(client, tournament):
+    response = client.get(f"/tournaments/{tournament['id']}", params={"include": "teams"})
+    # The local backend embeds the teams in the same call
+    timing = response.headers["server-timing"]
+    assert re.search(r'upstream;dur=[\d.]+;desc="round trips: 1"', timing) and "total;dur=" in timing
+
+    body = client.get("/metrics").text
+    route = "/tournaments/{tournament_id}"
+    assert sample(body, "kickoff_http_requests_total", method="GET", route=route, status="200") >= 1
+    assert sample(body, "kickoff_http_request_duration_seconds_count", method="GET", route=route) >= 1
+    assert sample(body, "kickoff_http_upstream_calls_per_request_bucket", method="GET", route=route, le="1") >= 1
+    assert sample(body, "kickoff_upstream_calls_total", table="tournaments", operation="select", outcome="ok") >= 1
+    assert sample(body, "kickoff_upstream_call_duration_seconds_count", table="tournaments", operation="select") >= 1
+    assert sample(body, "kickoff_threadpool_threads", state="capacity") > 0
+    assert sample(body, "kickoff_cache_hit_ratio", cache="response") is not None
+    # Running totals are counters, current values gauges
+    assert sample(body, "kickoff_auth_hits_total") is not None
+    assert sample(body, "kickoff_auth_verify_seconds_total") is not None
+    assert "# TYPE kickoff_event_queue_flushed_total counter" in body
+    assert "# TYPE kickoff_event_queue_depth gauge" in body
+
+    client.get("/no/such/path")
+    assert sample(client.get("/metrics").text, "kickoff_http_requests_total", route="<unmatched>", status="404") >= 1
@@ -0,0 +1,47 @@
+from app.repositories.base import keyset_condition
+from app.repositories.supabase import _render
+
+
+def collect(client, url, params, limit):
+    seen, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        seen.extend(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return seen
+
+
+def test_keyset_pages_cover_every_row_once_with_nulls(admin_client, teams):
+    team = teams[0]
+    for number in [7, None, 3, 7, None, 1, 10]:
+        admin_client.post("/players/", json={"name": f"P{number}", "team_id": team["id"], "shirt_number": number})
+
+    unpaged = admin_client.get("/players/", params={"team_id": team["id"]}).json()
+    paged = collect(admin_client, "/players/", {"team_id": team["id"]}, limit=2)
+    assert [p["id"] for p in paged] == [p["id"] for p in unpaged]
+    assert [p["shirt_number"] for p in paged] == [1, 3, 7, 7, 10, None, None]
+
+
+def test_descending_pages_and_total_count(admin_client):
+    for year in range(2015, 2022):
+        admin_client.post("/tournaments/", json={"name": f"Cup {year}", "year": year, "status": "completed"})
+
+    response = admin_client.get("/tournaments/", params={"limit": 3, "count": True})
+    assert response.headers["x-total-count"] == "7"
+    assert 'rel="next"' in response.headers["link"]
+    assert [t["year"] for t in collect(admin_client, "/tournaments/", {}, limit=3)] == list(range(2021, 2014, -1))
+
+
+def test_invalid_cursor_is_rejected(admin_client, teams):
+    assert admin_client.get("/teams/", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert admin_client.get("/teams/", params={"limit": 100000}).status_code == 422
+
+
+def test_postgrest_keyset_filter_quotes_values():
+    condition = keyset_condition([("name", False), ("id", False)], ["Red, Dragons", "abc"])
+    assert _render(condition) == (
+        'or(name.gt."Red, Dragons",name.is.null,'
+        'and(name.eq."Red, Dragons",or(id.gt."abc",id.is.null)))'
+    )
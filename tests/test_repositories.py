@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.repositories import MatchEventRepository, MatchRepository, PlayerRepository, TeamRepository, TournamentRepository
+from app.repositories import base
+from app.repositories.local import LocalBackend
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_local_backend_crud_and_ordering():
+    backend = LocalBackend()
+    tournaments, teams, players = TournamentRepository(backend), TeamRepository(backend), PlayerRepository(backend)
+
+    tournament = run(tournaments.create({"name": "Cup", "year": 2024, "status": "upcoming"}))
+    assert tournament["id"] and tournament["created_at"]
+    team = run(teams.create({"name": "Reds", "tournament_id": tournament["id"]}))
+    for number in (9, None, 1):
+        run(players.create({"name": f"P{number}", "team_id": team["id"], "shirt_number": number}))
+
+    # Same NULL placement as Postgres: ascending sorts put NULLs last
+    assert [p["shirt_number"] for p in run(players.list({"team_id": team["id"]}))] == [1, 9, None]
+    assert run(teams.exists(team["id"]))
+
+    updated = run(teams.update(team["id"], {"group": "A"}))
+    assert updated["group"] == "A"
+
+    # Deleting the tournament cascades to its teams and players
+    assert run(tournaments.delete(tournament["id"]))
+    assert run(teams.get(team["id"])) is None
+    assert run(players.list()) == []
+
+
+def test_local_backend_enforces_schema_checks():
+    backend = LocalBackend()
+    with pytest.raises(Exception):
+        run(TournamentRepository(backend).create({"name": "Cup", "year": 2024, "status": "bogus"}))
+
+
+def test_local_backend_normalises_timestamps():
+    backend = LocalBackend()
+    tournament = run(TournamentRepository(backend).create({"name": "Cup", "year": 2024, "status": "ongoing"}))
+    matches = MatchRepository(backend)
+    run(matches.create({"tournament_id": tournament["id"], "start_time": "2024-02-01T18:00:00+02:00"}))
+    run(matches.create({"tournament_id": tournament["id"], "start_time": "2024-02-01T15:30:00+00:00"}))
+    assert [m["start_time"] for m in run(matches.list())] == ["2024-02-01T15:30:00+00:00", "2024-02-01T16:00:00+00:00"]
+
+
+def test_routes_run_against_local_backend(admin_client, teams):
+    response = admin_client.get("/teams/", params={"tournament_id": teams[0]["tournament_id"]})
+    assert response.status_code == 200
+    assert [t["name"] for t in response.json()] == sorted(t["name"] for t in teams)
+
+    response = admin_client.post("/players/", json={"name": "Keeper", "team_id": teams[0]["id"], "shirt_number": 1})
+    assert response.status_code == 200
+    assert admin_client.delete(f"/players/{response.json()['id']}").status_code == 204
+    assert admin_client.get(f"/players/{response.json()['id']}").status_code == 404
+
+
+def test_filters_through_a_relation_and_pages_past_max_rows(monkeypatch):
+    backend = LocalBackend()
+    tournaments, teams, matches = TournamentRepository(backend), TeamRepository(backend), MatchRepository(backend)
+    events = MatchEventRepository(backend)
+    cup, league = (run(tournaments.create({"name": name, "year": 2024, "status": "ongoing"})) for name in ("Cup", "League"))
+    for tournament, goals in ((cup, 5), (league, 2)):
+        team = run(teams.create({"name": "Reds", "tournament_id": tournament["id"]}))
+        match = run(matches.create({"tournament_id": tournament["id"], "start_time": "2024-02-01T15:00:00+00:00"}))
+        run(events.create_many([
+            {"match_id": match["id"], "team_id": team["id"], "type": "goal", "minute": minute} for minute in range(goals)
+        ]))
+
+    monkeypatch.setattr(base, "MAX_ROWS", 3)
+    rows = run(events.list_all({"match.tournament_id": cup["id"]}, columns=["minute"]))
+    assert [row["minute"] for row in rows] == [0, 1, 2, 3, 4]
+    assert run(backend.count("match_events", {"match.tournament_id": league["id"], "type": "goal"})) == 2
+    with pytest.raises(ValueError):
+        run(events.list({"events.type": "goal"}))
@@ -0,0 +1,43 @@
+from app.config import settings
+from app.schemas import MatchWithRelations
+from app.serialization import json_response, projector
+
+
+def test_projector_keeps_declared_fields_of_embedded_rows():
+    row = {
+        "id": "m1", "status": "live", "internal": "x",
+        "home_team": {"id": "t1", "name": "Reds", "secret": 1},
+        "events": [{"id": "e1", "type": "goal", "player": None, "extra": 2}],
+    }
+    assert projector(MatchWithRelations)(row) == {
+        "id": "m1", "status": "live",
+        "home_team": {"id": "t1", "name": "Reds"},
+        "events": [{"id": "e1", "type": "goal", "player": None}],
+    }
+
+
+def test_trusted_rows_skip_validation():
+    # Not a valid Match, but trusted rows are passed through as they are
+    response = json_response([{"id": "m1", "home_score": "2"}], MatchWithRelations, trusted=True)
+    # Keys come out in the model's field order, like validated rows
+    assert response.body == b'[{"home_score":"2","id":"m1"}]'
+
+
+def test_trusted_responses_match_validated_ones(admin_client, tournament, teams, monkeypatch):
+    admin_client.post("/matches/", json={
+        "tournament_id": tournament["id"],
+        "home_team_id": teams[0]["id"],
+        "away_team_id": teams[1]["id"],
+        "start_time": "2024-06-01T18:00:00Z",
+    })
+    paths = ["/matches/?include=home_team,events", "/teams/?fields=id,name", f"/standings/{tournament['id']}"]
+    validated = [admin_client.get(path) for path in paths]
+
+    monkeypatch.setattr(settings, "RESPONSE_TRUST_UPSTREAM", True)
+    for path, expected in zip(paths, validated):
+        response = admin_client.get(path)
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["etag"] == expected.headers["etag"]
+        body, expected_body = response.json(), expected.json()
+        assert [sorted(row) for row in body] == [sorted(row) for row in expected_body]
+        assert [row.get("id") for row in body] == [row.get("id") for row in expected_body]
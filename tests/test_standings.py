@@ -0,0 +1,178 @@
+import asyncio
+
+from app.database import get_backend
+from app.repositories import MatchRepository, StandingsRepository, TeamRepository, base
+from app.standings import StandingsStore, compute_standings, compute_tables
+
+
+def table(rows):
+    return {row["team_name"]: row for row in rows}
+
+
+def test_standings_follow_match_writes(admin_client, tournament, teams, play_match, table_rows):
+    red, blue, green, _ = teams
+    play_match(red, blue, 2, 1)
+    assert table(table_rows(tournament))["Red Dragons"]["points"] == 3
+
+    # Created after the table was materialized: applied as a delta
+    live = play_match(green, red, 0, 0, status="live")
+    assert table(table_rows(tournament))["Red Dragons"]["played"] == 1
+
+    admin_client.patch(f"/matches/{live['id']}", json={"status": "finished", "away_score": 3})
+    rows = table(table_rows(tournament))
+    assert rows["Red Dragons"]["points"] == 6
+    assert rows["Red Dragons"]["goals_for"] == 5
+    assert rows["Green Eagles"]["lost"] == 1
+
+    assert admin_client.delete(f"/matches/{live['id']}").status_code == 204
+    rows = table(table_rows(tournament))
+    assert rows["Red Dragons"]["points"] == 3
+    assert rows["Green Eagles"]["played"] == 0
+
+    response = admin_client.post(f"/standings/{tournament['id']}/verify")
+    assert response.json()["consistent"] is True
+
+
+def test_overlapping_match_updates_dont_double_count(admin_client, tournament, teams, play_match, table_rows, monkeypatch):
+    red, blue, _, _ = teams
+    match = play_match(red, blue, 1, 0)
+    table(table_rows(tournament))
+
+    # Both updates read the match before either wrote: the second one's
+    # previous row is the stale original
+    stale = dict(match)
+    admin_client.patch(f"/matches/{match['id']}", json={"home_score": 2})
+    original_get = MatchRepository.get
+
+    async def stale_get(self, id, *args, **kwargs):
+        return stale if str(id) == match["id"] else await original_get(self, id, *args, **kwargs)
+
+    monkeypatch.setattr(MatchRepository, "get", stale_get)
+    admin_client.patch(f"/matches/{match['id']}", json={"away_score": 3})
+    monkeypatch.undo()
+
+    rows = table(table_rows(tournament))
+    assert (rows["Red Dragons"]["played"], rows["Red Dragons"]["goals_for"], rows["Blue Tigers"]["points"]) == (1, 2, 3)
+    assert admin_client.post(f"/standings/{tournament['id']}/verify").json()["consistent"] is True
+
+
+def test_team_rename_invalidates_table(admin_client, tournament, teams, table_rows):
+    table(table_rows(tournament))
+    admin_client.patch(f"/teams/{teams[0]['id']}", json={"name": "Crimson Dragons"})
+    assert "Crimson Dragons" in table(table_rows(tournament))
+
+
+def test_rebuild_racing_a_write_is_not_materialized():
+    store = StandingsStore(max_age=0)
+    teams = [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}]
+    generation = store.generation("t1")
+    store.match_changed(None, {"tournament_id": "t1", "status": "finished", "home_team_id": "a",
+                               "away_team_id": "b", "home_score": 1, "away_score": 0})
+    store.store("t1", compute_standings(teams, []), generation)
+    assert store.get("t1") is None
+
+
+def test_rpc_aggregate_matches_python_compute(admin_client, tournament, teams, play_match):
+    red, blue, green, yellow = teams
+    play_match(red, blue, 2, 1)
+    play_match(green, yellow, 1, 1)
+    play_match(blue, green, 0, 4)
+    play_match(yellow, red, 3, 0, status="live")
+
+    async def both():
+        backend = await get_backend()
+        rows = await StandingsRepository(backend).for_tournament(tournament["id"])
+        team_rows = await TeamRepository(backend).list_for_tournament(tournament["id"])
+        matches = await MatchRepository(backend).list_finished(tournament["id"])
+        return {row["team_id"]: row for row in rows}, compute_standings(team_rows, matches)
+
+    from_rpc, from_python = asyncio.run(both())
+    assert from_rpc == from_python
+
+
+def test_missing_rpc_falls_back_to_python(admin_client, tournament, teams, play_match, table_rows, monkeypatch):
+    from app.repositories import entities, local
+
+    red, blue, _, _ = teams
+    play_match(red, blue, 2, 1)
+    # As if migrations/002_tournament_standings.sql wasn't applied
+    monkeypatch.delitem(local.FUNCTIONS, "tournament_standings")
+    monkeypatch.setattr(entities, "_missing_functions", set())
+    assert table(table_rows(tournament))["Red Dragons"]["points"] == 3
+    assert entities._missing_functions == {"tournament_standings"}
+
+
+def test_batch_standings_with_groups(admin_client, tournament, teams, play_match, table_rows, monkeypatch):
+    # One match per page: the finished matches are read in several
+    monkeypatch.setattr(base, "MAX_ROWS", 2)
+    red, blue, green, yellow = teams
+    play_match(red, blue, 2, 1)
+    play_match(green, yellow, 1, 1)
+    # Across groups: counted in the tournament table only
+    play_match(blue, green, 0, 4)
+    other = admin_client.post("/tournaments/", json={"name": "Other Cup", "year": 2024, "status": "ongoing"}).json()
+    unknown = "00000000-0000-0000-0000-000000000000"
+
+    response = admin_client.get(
+        "/standings/", params={"tournament_id": [tournament["id"], other["id"], unknown, tournament["id"]], "groups": "true"}
+    )
+    assert response.status_code == 200
+    first, second, third = response.json()
+    assert [first["tournament_id"], second["tournament_id"], third["tournament_id"]] == [tournament["id"], other["id"], unknown]
+    assert [row["team_name"] for row in first["standings"]] == ["Green Eagles", "Red Dragons", "Yellow Lions", "Blue Tigers"]
+    assert first["standings"] == table_rows(tournament)
+    groups = {group["group"]: {row["team_name"]: row for row in group["standings"]} for group in first["groups"]}
+    assert groups["A"]["Blue Tigers"]["played"] == 1
+    assert groups["B"]["Green Eagles"]["points"] == 1
+    assert second == {"tournament_id": other["id"], "standings": [], "groups": []}
+
+    # Without groups, the tables come from the store that match writes keep current
+    play_match(yellow, red, 3, 0)
+    rows = admin_client.get("/standings/", params={"tournament_id": tournament["id"]}).json()[0]
+    assert "groups" not in rows
+    assert {row["team_name"]: row["points"] for row in rows["standings"]}["Yellow Lions"] == 4
+
+
+def test_compute_tables_matches_compute_standings():
+    teams = [
+        {"id": "a", "name": "A", "tournament_id": "t1", "group": "1"},
+        {"id": "b", "name": "B", "tournament_id": "t1", "group": "1"},
+        {"id": "c", "name": "C", "tournament_id": "t1", "group": None},
+        {"id": "d", "name": "D", "tournament_id": "t2", "group": "1"},
+    ]
+    matches = [
+        {"tournament_id": "t1", "home_team_id": "a", "away_team_id": "b", "home_score": 2, "away_score": 2},
+        {"tournament_id": "t1", "home_team_id": "c", "away_team_id": "a", "home_score": 1, "away_score": None},
+        # A team of another tournament is ignored, as it is missing from that table
+        {"tournament_id": "t1", "home_team_id": "d", "away_team_id": "b", "home_score": 5, "away_score": 0},
+        {"tournament_id": "t2", "home_team_id": "d", "away_team_id": "x", "home_score": 1, "away_score": 0},
+    ]
+    tables = compute_tables(teams, matches, groups=True)
+    for tournament_id in ("t1", "t2"):
+        own = [m for m in matches if m["tournament_id"] == tournament_id]
+        expected = compute_standings([t for t in teams if t["tournament_id"] == tournament_id], own)
+        assert tables[tournament_id]["table"] == expected
+    assert tables["t1"]["groups"] == {"1": compute_standings(teams[:2], matches[:1])}
+    assert tables["t2"]["groups"]["1"]["d"]["played"] == 0
+
+
+def test_standings_history_by_matchday(admin_client, tournament, teams, play_match, table_rows):
+    red, blue, green, yellow = teams
+    play_match(red, blue, 2, 1, start="2024-02-01T15:00:00+00:00")
+    play_match(green, yellow, 0, 1, start="2024-02-01T18:00:00+00:00")
+    play_match(blue, yellow, 3, 0, start="2024-02-08T15:00:00+00:00")
+    play_match(red, green, 0, 0, status="scheduled", start="2024-02-08T18:00:00+00:00")
+
+    response = admin_client.get(f"/standings/{tournament['id']}/history")
+    assert response.status_code == 200
+    first, second = response.json()["rounds"]
+    assert (first["round"], first["date"], first["matches"]) == (1, "2024-02-01", 2)
+    assert [row["team_name"] for row in first["standings"]][:2] == ["Red Dragons", "Yellow Lions"]
+    assert (second["date"], second["matches"]) == ("2024-02-08", 1)
+    assert second["standings"] == table_rows(tournament)
+
+    # A result written later is picked up, not served from the cached history
+    play_match(green, red, 1, 0, start="2024-02-15T15:00:00+00:00")
+    assert len(admin_client.get(f"/standings/{tournament['id']}/history").json()["rounds"]) == 3
+
+    assert admin_client.get("/standings/00000000-0000-0000-0000-000000000000/history").status_code == 404
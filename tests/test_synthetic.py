@@ -0,0 +1,38 @@
+import asyncio
+from collections import Counter
+
+from app.repositories.local import LocalBackend
+from benchmarks.synthetic import TABLES, Generator, Volumes, seed
+
+
+def test_generation_is_deterministic_and_consistent():
+    volumes = Volumes(tournaments=3, teams=8, squad=14, ongoing=0.34, seed=7)
+    rows = list(Generator(volumes).rows())
+    assert rows == list(Generator(volumes).rows())
+    assert rows != list(Generator(Volumes(tournaments=3, teams=8, squad=14, seed=8)).rows())
+
+    counts = Counter(table for table, _ in rows)
+    # Two groups of four: 12 group games, then semi-finals and a final
+    assert (counts["tournaments"], counts["teams"], counts["players"], counts["matches"]) == (3, 24, 336, 45)
+
+    matches = {row["id"]: row for table, row in rows if table == "matches"}
+    events = [row for table, row in rows if table == "match_events"]
+    goals = Counter((event["match_id"], event["team_id"]) for event in events if event["type"] == "goal")
+    for match in matches.values():
+        assert match["home_score"] == goals[(match["id"], match["home_team_id"])]
+        assert match["away_score"] == goals[(match["id"], match["away_team_id"])]
+    assert {matches[event["match_id"]]["status"] for event in events} == {"finished"}
+    assert "scheduled" in {match["status"] for match in matches.values()}
+    assert all(1 <= event["minute"] <= 96 for event in events)
+    assert Counter(event["type"] for event in events)["substitution_in"] >= 3 * 2 * 30
+
+
+def test_batched_seeding_respects_foreign_keys():
+    backend = LocalBackend()
+    volumes = Volumes(tournaments=2, teams=8, squad=12)
+    # Batches smaller than a tournament, several in flight
+    seeder = asyncio.run(seed(backend, volumes, batch_size=7, concurrency=3))
+
+    expected = Counter(table for table, _ in Generator(volumes).rows())
+    for table in TABLES:
+        assert seeder.rows[table] == expected[table] == asyncio.run(backend.count(table, {}))
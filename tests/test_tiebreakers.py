@@ -0,0 +1,100 @@
+from app.standings import compute_standings
+from app.tiebreakers import Tiebreaker, count_cards
+
+TEAMS = [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}, {"id": "c", "name": "C"}]
+
+
+def result(id, home, away, home_score, away_score):
+    return {"id": id, "home_team_id": home, "away_team_id": away, "home_score": home_score, "away_score": away_score}
+
+
+def ranked(rules, matches, cards=None, teams=TEAMS):
+    return [row["team_id"] for row in Tiebreaker(rules, teams, matches, cards).rank(compute_standings(teams, matches))]
+
+
+def test_head_to_head_before_goal_difference():
+    # A and B level on points, A ahead on goal difference, B won their game
+    matches = [result("1", "a", "c", 4, 0), result("2", "b", "a", 1, 0)]
+    assert ranked(["points", "goal_difference"], matches) == ["a", "b", "c"]
+    assert ranked(["points", "head_to_head_points", "goal_difference"], matches) == ["b", "a", "c"]
+
+
+def test_head_to_head_only_counts_the_teams_still_tied():
+    # A, B and C level on 4 points. Head-to-head points take C out; between A
+    # and B only their 2-2 counts, not B's bigger win over C
+    five = [*TEAMS, {"id": "d", "name": "D"}, {"id": "e", "name": "E"}]
+    matches = [
+        result("1", "a", "b", 2, 2), result("2", "a", "c", 1, 0), result("3", "b", "c", 3, 0),
+        result("4", "c", "d", 1, 0), result("5", "c", "e", 0, 0),
+    ]
+    assert ranked(["points", "goal_difference"], matches, teams=five) == ["b", "a", "c", "e", "d"]
+    rules = ["points", "head_to_head_points", "head_to_head_goal_difference"]
+    assert ranked(rules, matches, teams=five) == ["a", "b", "c", "e", "d"]
+
+
+def test_away_goals_and_fair_play():
+    matches = [result("1", "a", "b", 1, 1)]
+    assert ranked(["points"], matches)[:2] == ["a", "b"]
+    assert ranked(["points", "away_goals"], matches)[:2] == ["b", "a"]
+    cards = count_cards(matches, [
+        {"match_id": "1", "team_id": "a", "type": "red_card"},
+        {"match_id": "1", "team_id": "b", "type": "yellow_card"},
+        {"match_id": "1", "team_id": "b", "type": "yellow_card"},
+        {"match_id": "1", "team_id": "b", "type": "goal"},
+    ])
+    assert cards == {"1": {"a": 3, "b": 2}}
+    assert ranked(["points", "fair_play"], matches, cards)[:2] == ["b", "a"]
+
+
+def test_patched_matrix_equals_a_rebuild():
+    matches = [result("1", "a", "b", 2, 1), result("2", "b", "c", 0, 0)]
+    tiebreaker = Tiebreaker(["points", "head_to_head_points"], TEAMS, matches)
+    tiebreaker.apply_match(matches[0], -1)
+    tiebreaker.apply_match(result("1", "a", "b", 0, 3))
+    rebuilt = Tiebreaker(["points", "head_to_head_points"], TEAMS, [result("1", "a", "b", 0, 3), matches[1]])
+    assert (tiebreaker.points, tiebreaker.goals, tiebreaker.away_goals) == (rebuilt.points, rebuilt.goals, rebuilt.away_goals)
+
+
+def test_tournament_tiebreakers(admin_client, tournament, teams, play_match, table_rows):
+    red, blue, green, _ = teams
+    play_match(red, green, 4, 0)
+    play_match(blue, red, 1, 0)
+    assert [row["team_name"] for row in table_rows(tournament)][:2] == ["Red Dragons", "Blue Tigers"]
+
+    response = admin_client.patch(f"/tournaments/{tournament['id']}", json={"tiebreakers": ["points", "head_to_head_points"]})
+    assert response.json()["tiebreakers"] == ["points", "head_to_head_points"]
+    assert [row["team_name"] for row in table_rows(tournament)][:2] == ["Blue Tigers", "Red Dragons"]
+
+    # Match writes patch the head-to-head results along with the table
+    rematch = play_match(red, blue, 2, 0, start="2024-03-01T15:00:00+00:00")
+    assert [row["team_name"] for row in table_rows(tournament)][:2] == ["Red Dragons", "Blue Tigers"]
+    admin_client.delete(f"/matches/{rematch['id']}")
+    assert admin_client.post(f"/standings/{tournament['id']}/verify").json()["consistent"] is True
+
+    batch = admin_client.get("/standings/", params={"tournament_id": tournament["id"], "groups": "true"}).json()[0]
+    assert batch["standings"] == table_rows(tournament)
+    group_a = [row["team_name"] for row in batch["groups"][0]["standings"]]
+    assert group_a == ["Blue Tigers", "Red Dragons"]
+    history = admin_client.get(f"/standings/{tournament['id']}/history").json()
+    assert history["rounds"][-1]["standings"] == table_rows(tournament)
+
+    assert admin_client.patch(f"/tournaments/{tournament['id']}", json={"tiebreakers": ["wins"]}).status_code == 422
+
+
+def test_fair_play_follows_card_events(admin_client, tournament, teams, play_match, table_rows):
+    red, blue, _, _ = teams
+    admin_client.patch(f"/tournaments/{tournament['id']}", json={"tiebreakers": ["points", "fair_play"]})
+    match = play_match(red, blue, 0, 0)
+    assert [row["team_name"] for row in table_rows(tournament)][:2] == ["Blue Tigers", "Red Dragons"]
+
+    card = admin_client.post("/events/", json={"match_id": match["id"], "team_id": blue["id"], "type": "yellow_card", "minute": 10})
+    assert card.status_code == 200
+    assert [row["team_name"] for row in table_rows(tournament)][:2] == ["Red Dragons", "Blue Tigers"]
+    history = admin_client.get(f"/standings/{tournament['id']}/history").json()
+    assert [row["team_name"] for row in history["rounds"][0]["standings"]][:2] == ["Red Dragons", "Blue Tigers"]
+    # Group tables are always recomputed, cards included
+    batch = admin_client.get("/standings/", params={"tournament_id": tournament["id"], "groups": "true"}).json()[0]
+    assert [row["team_name"] for row in batch["groups"][0]["standings"]] == ["Red Dragons", "Blue Tigers"]
+
+    admin_client.delete(f"/events/{card.json()['id']}")
+    assert [row["team_name"] for row in table_rows(tournament)][:2] == ["Blue Tigers", "Red Dragons"]